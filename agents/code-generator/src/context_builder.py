@@ -0,0 +1,199 @@
+import ast
+import json
+import logging
+from typing import Dict, Optional, Sequence
+
+try:
+    import tiktoken
+except ImportError:  # pinned in requirements; without it token counts are estimated
+    tiktoken = None
+
+# Fields sent elsewhere in the request (description) or rendered separately
+_RENDERED_SEPARATELY = ('name', 'description', 'dependencies', 'review_feedback')
+
+# Fields with no bearing on the generated code (complexity only routes the
+# model; previous_code belongs to a step whose code is kept, not regenerated)
+_IGNORED_FIELDS = ('estimated_time', 'estimated_hours', 'complexity', 'previous_code')
+
+
+class TokenCounter:
+    """Counts tokens with the model's tiktoken encoding, or estimates ~4 characters per token."""
+
+    def __init__(self, model: str = 'gpt-4-turbo'):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._encoding = None
+        if tiktoken is None:
+            return
+        try:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception as e:
+            self.logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, limit: int) -> str:
+        """Cut text to at most limit tokens, marking the cut with an ellipsis."""
+        if self.count(text) <= limit:
+            return text
+        if limit <= 1:
+            return ''
+        if self._encoding is not None:
+            return self._encoding.decode(self._encoding.encode(text)[:limit - 1]) + '…'
+        return text[:(limit - 1) * 4] + '…'
+
+
+def code_outline(code: str) -> Optional[str]:
+    """
+    Reduce a module to its class and function signatures
+
+    Args:
+        code (str): Generated module source
+
+    Returns:
+        Optional[str]: One line per class/def (methods indented), or None
+        when the code does not parse or defines nothing
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    lines = []
+
+    def describe(nodes, indent: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+                returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ''
+                lines.append(f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}: ...")
+            elif isinstance(node, ast.ClassDef):
+                bases = ', '.join(ast.unparse(base) for base in node.bases)
+                lines.append(f"{indent}class {node.name}({bases}):" if bases else f"{indent}class {node.name}:")
+                describe(node.body, indent + '    ')
+
+    describe(tree.body, '')
+    return '\n'.join(lines) or None
+
+
+class PromptContextBuilder:
+    """
+    Builds the context message for one implementation step within a token budget
+
+    The plan overview comes first and is built from overview_budget alone,
+    so every step of a plan opens with the same text and the requests share
+    the longest possible prefix. The step's own details and review
+    feedback come next, truncated to half of what is left. Dependency
+    outputs (full code, else their signatures) and then an example from a
+    similar reviewed step get the rest.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        model: str = 'gpt-4-turbo',
+        counter: TokenCounter = None,
+        overview_budget: int = None
+    ):
+        self.token_budget = token_budget
+        self.overview_budget = overview_budget if overview_budget is not None else token_budget // 5
+        self.counter = counter if counter is not None else TokenCounter(model)
+
+    def build(
+        self,
+        step: Dict,
+        steps: Sequence[Dict] = (),
+        outputs: Dict[str, str] = None,
+        example: str = None
+    ) -> str:
+        """
+        Build the context text for a step
+
+        Args:
+            step (Dict): Step being generated
+            steps (Sequence[Dict]): Every step of the plan
+            outputs (Dict[str, str]): Generated code of finished steps, by name
+            example (str, optional): Reviewed code of a similar step, used as a few-shot seed
+
+        Returns:
+            str: Context message content (empty when there is nothing to add)
+        """
+        outputs = outputs or {}
+        overview = self._plan_overview(steps, self.overview_budget) if len(steps) > 1 else None
+        remaining = self.token_budget - (self.counter.count(overview) if overview else 0)
+
+        details = self._step_details(step, remaining // 2)
+        remaining -= self.counter.count(details)
+
+        dependency_sections = []
+        for name in step.get('dependencies', []):
+            code = outputs.get(name)
+            if not code:
+                continue
+            section = self._fit_dependency(name, code, remaining)
+            if section is not None:
+                dependency_sections.append(section)
+                remaining -= self.counter.count(section)
+
+        example_section = self._fit_dependency('example', example, remaining) if example else None
+
+        sections = [overview] if overview else []
+        if dependency_sections:
+            sections.append('Code from dependency steps:\n' + '\n'.join(dependency_sections))
+        if example_section is not None:
+            sections.append('Reviewed code for a similar step, adapt as needed:\n' + example_section)
+        if details:
+            sections.append(details)
+        return '\n\n'.join(sections)
+
+    def _step_details(self, step: Dict, budget: int) -> str:
+        lines = [f"Step: {step['name']}"] if step.get('name') else []
+        if step.get('dependencies'):
+            lines.append(f"Depends on: {', '.join(step['dependencies'])}")
+        for key, value in step.items():
+            if key in _RENDERED_SEPARATELY or key in _IGNORED_FIELDS or value in (None, '', [], {}):
+                continue
+            lines.append(f"{key}: {self._compact(value)}")
+        details = self.counter.truncate('\n'.join(lines), budget)
+
+        # Feedback gets whatever the details leave of the budget
+        feedback = step.get('review_feedback')
+        if feedback:
+            remaining = budget - self.counter.count(details) - 1
+            feedback_line = self.counter.truncate(f"Fix these review findings: {self._compact(feedback)}", remaining)
+            if feedback_line:
+                details = f"{details}\n{feedback_line}" if details else feedback_line
+        return details
+
+    def _fit_dependency(self, name: str, code: str, budget: int) -> Optional[str]:
+        full = f"# {name}\n```python\n{code}\n```"
+        if self.counter.count(full) <= budget:
+            return full
+        outline = code_outline(code)
+        if outline is not None:
+            summary = f"# {name} (signatures only)\n```python\n{outline}\n```"
+            if self.counter.count(summary) <= budget:
+                return summary
+        return None
+
+    def _plan_overview(self, steps: Sequence[Dict], budget: int) -> Optional[str]:
+        lines = ['Plan steps:']
+        used = self.counter.count(lines[0])
+        for plan_step in steps:
+            line = f"- {plan_step.get('name')}: {plan_step.get('description', '')}"
+            cost = self.counter.count(line) + 1
+            if used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+        return '\n'.join(lines) if len(lines) > 1 else None
+
+    def _compact(self, value) -> str:
+        if isinstance(value, str):
+            return value
+        return json.dumps(value, separators=(',', ':'), sort_keys=True, default=str)
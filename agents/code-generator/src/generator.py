@@ -1,42 +1,229 @@
-import os
+import queue
+import asyncio
 import logging
-from typing import Dict, List
-from language_models import LanguageModelService
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from language_models import GenerationAborted, LanguageModelService
+from step_scheduler import StepScheduler
+from context_builder import PromptContextBuilder
+from llm_cache import LLMResponseCache
+from llm_client import LLMClient
+from async_llm_client import AsyncLLMClient
+from snippet_index import SnippetIndex
+from model_routing import ModelRouter
+from batch_jobs import BatchExecutor, BatchJob, OpenAIBatchExecutor
+from instrumentation import traced
 from dotenv import load_dotenv
-import openai
 
 # Load environment variables
 load_dotenv()
 
 class CodeGenerationAgent:
-    def __init__(self):
-        # Initialize OpenAI client
-        openai.api_key = os.getenv('OPENAI_API_KEY')
-        self.language_model = LanguageModelService()
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        cache: LLMResponseCache = None,
+        llm_client: LLMClient = None,
+        context_token_budget: int = 1500,
+        snippet_index: SnippetIndex = None,
+        reuse_threshold: float = 0.9,
+        router: ModelRouter = None,
+        async_llm_client: AsyncLLMClient = None
+    ):
+        # LLM calls go through the process-wide shared client unless one is given
+        self.language_model = LanguageModelService(
+            cache=cache,
+            client=llm_client,
+            context_builder=PromptContextBuilder(token_budget=context_token_budget),
+            router=router,
+            async_client=async_llm_client
+        )
+        self.step_scheduler = StepScheduler(max_concurrency=max_concurrency)
+        # Steps whose description matches an accepted snippet at reuse_threshold
+        # take its code without an LLM call; weaker matches seed the prompt
+        self.snippet_index = snippet_index
+        self.reuse_threshold = reuse_threshold
         self.logger = logging.getLogger(__name__)
 
+    @traced()
     def generate_code(self, plan: Dict) -> Dict:
         """
         Generate code based on implementation plan
+
+        Steps without outstanding dependencies are generated concurrently;
+        the result keeps the plan's step order. Each step's model is routed
+        by its 'complexity', else the plan's estimated_complexity. A step
+        carrying 'previous_code' keeps it without an LLM call. With a
+        snippet index the result also lists the 'reused_steps' taken from it.
+        
+        Args:
+            plan (Dict): Detailed implementation plan
+        
+        Returns:
+            Dict: Generated code with metadata
+        """
+        return self._generate(plan, self._generate_code_for_step)
+
+    def generate_code_stream(self, plan: Dict, syntax_check: bool = True, max_retries: int = 1) -> Iterator[Dict]:
+        """
+        Generate code for a plan, yielding progress as it streams in
+
+        Steps are scheduled exactly as in generate_code, so events of
+        independent steps interleave. Event types:
+        - 'chunk': {'step', 'attempt', 'content'}
+        - 'retry': {'step', 'attempt', 'reason'} - discard that attempt's chunks
+        - 'step_complete': {'step', 'attempt', 'code'} - with 'reused': True
+          and no chunks when the code came from the snippet index or the
+          step's 'previous_code'
+        - 'complete': {'result'} - the generate_code result, always last
+
+        Closing the generator early cancels the outstanding completions.
+        
+        Args:
+            plan (Dict): Detailed implementation plan
+            syntax_check (bool): Abort and retry snippets that clearly cannot parse
+            max_retries (int): Retries per step after a syntax abort
+        
+        Yields:
+            Dict: Streaming events
+        """
+        events = queue.Queue()
+        cancelled = threading.Event()
+
+        def stream_step(step: Dict, context: str) -> str:
+            code_snippet = ''
+            for event in self.stream_code_for_step(step, syntax_check, max_retries, context):
+                if cancelled.is_set():
+                    raise RuntimeError('Code generation cancelled')
+                events.put(event)
+                if event['type'] == 'step_complete':
+                    code_snippet = event['code']
+            return code_snippet
+
+        def reused_step(step: Dict, code_snippet: str) -> None:
+            events.put({'type': 'step_complete', 'step': step.get('name'), 'attempt': 0, 'code': code_snippet, 'reused': True})
+
+        def run() -> None:
+            events.put({'type': 'complete', 'result': self._generate(plan, stream_step, reused_step)})
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                yield event
+                if event['type'] == 'complete':
+                    return
+        finally:
+            cancelled.set()
+
+    def stream_code_for_step(
+        self,
+        step: Dict,
+        syntax_check: bool = True,
+        max_retries: int = 1,
+        context: str = None
+    ) -> Iterator[Dict]:
+        """
+        Stream code for a single step, retrying syntax-aborted attempts
+
+        The final attempt runs without the syntax check so a step always
+        produces code, as generate_code would.
+        
+        Args:
+            step (Dict): Implementation step details
+            syntax_check (bool): Abort and retry snippets that clearly cannot parse
+            max_retries (int): Retries after a syntax abort
+            context (str, optional): Prompt context; built from the step alone if omitted
+        
+        Yields:
+            Dict: 'chunk', 'retry' and finally 'step_complete' events
+        """
+        for attempt in range(max_retries + 1):
+            parts = []
+            try:
+                for chunk in self.language_model.stream_code_snippet(
+                    description=step.get('description', ''),
+                    context=context if context is not None else step,
+                    syntax_check=syntax_check and attempt < max_retries,
+                    complexity=step.get('complexity')
+                ):
+                    parts.append(chunk)
+                    yield {'type': 'chunk', 'step': step.get('name'), 'attempt': attempt, 'content': chunk}
+            except GenerationAborted as e:
+                self.logger.warning(f"Aborted generation for step '{step.get('name')}': {e}")
+                yield {'type': 'retry', 'step': step.get('name'), 'attempt': attempt, 'reason': str(e)}
+                continue
+
+            yield {'type': 'step_complete', 'step': step.get('name'), 'attempt': attempt, 'code': ''.join(parts).strip()}
+            return
+
+    def _generate(
+        self,
+        plan: Dict,
+        generate_step: Callable[[Dict, str], str],
+        on_reuse: Callable[[Dict, str], None] = None
+    ) -> Dict:
+        """
+        Run a step generator over the plan and assemble the result
+
+        Each step's prompt context carries the code already generated for
+        the steps it depends on, which the scheduler guarantees have finished.
+        
+        Args:
+            plan (Dict): Detailed implementation plan
+            generate_step (Callable): Produces the code snippet for one step from the step and its context
+            on_reuse (Callable, optional): Called with the step and code when a snippet is reused
+        
+        Returns:
+            Dict: Generated code with metadata
+        """
+        try:
+            outputs = {}
+            reused = set()
+
+            def run_step(step: Dict) -> str:
+                step, code_snippet, context = self._prepare_step(step, plan, outputs)
+                if code_snippet is not None:
+                    reused.add(step.get('name'))
+                    if on_reuse is not None:
+                        on_reuse(step, code_snippet)
+                else:
+                    code_snippet = generate_step(step, context)
+                outputs[step.get('name')] = code_snippet
+                return code_snippet
+
+            code_snippets = self.step_scheduler.run(plan.get('implementation_steps', []), run_step)
+            return self._generation_result(plan, code_snippets, reused)
+        except Exception as e:
+            self.logger.error(f"Code generation error: {e}")
+            return {
+                'status': 'GENERATION_FAILED',
+                'error': str(e)
+            }
+
+    @traced()
+    async def agenerate_code(self, plan: Dict, timeout: float = None) -> Dict:
+        """
+        Generate code for a plan without blocking the event loop
+
+        The asyncio counterpart of generate_code: steps are scheduled the
+        same way, as tasks instead of threads. Cancelling the awaiting task
+        cancels every outstanding LLM call.
         
         Args:
             plan (Dict): Detailed implementation plan
+            timeout (float, optional): Seconds before generation fails with a timeout
         
         Returns:
             Dict: Generated code with metadata
         """
         try:
-            generated_code = {}
-            
-            for step in plan.get('implementation_steps', []):
-                code_snippet = self._generate_code_for_step(step)
-                generated_code[step['name']] = code_snippet
-            
+            return await asyncio.wait_for(self._agenerate(plan), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Code generation timed out after {timeout}s")
             return {
-                'task_id': plan.get('task_id'),
-                'status': 'CODE_GENERATION_COMPLETE',
-                'generated_code': generated_code,
-                'language': 'python'  # Default language
+                'status': 'GENERATION_FAILED',
+                'error': f"Code generation timed out after {timeout}s"
             }
         except Exception as e:
             self.logger.error(f"Code generation error: {e}")
@@ -45,19 +232,206 @@ class CodeGenerationAgent:
                 'error': str(e)
             }
 
-    def _generate_code_for_step(self, step: Dict) -> str:
+    async def _agenerate(self, plan: Dict) -> Dict:
+        outputs = {}
+        reused = set()
+
+        async def run_step(step: Dict) -> str:
+            step, code_snippet, context = self._prepare_step(step, plan, outputs)
+            if code_snippet is not None:
+                reused.add(step.get('name'))
+            else:
+                code_snippet = await self.language_model.agenerate_code_snippet(
+                    description=step.get('description', ''),
+                    context=context,
+                    complexity=step.get('complexity')
+                )
+            outputs[step.get('name')] = code_snippet
+            return code_snippet
+
+        code_snippets = await self.step_scheduler.arun(plan.get('implementation_steps', []), run_step)
+        return self._generation_result(plan, code_snippets, reused)
+
+    def generate_code_batch(
+        self,
+        plans: List[Dict],
+        directory: str,
+        executor: BatchExecutor = None,
+        poll_interval: float = 30.0,
+        max_attempts: int = 3
+    ) -> List[Dict]:
+        """
+        Generate code for many plans offline through batch request files
+
+        A step's prompt needs the code of the steps it depends on, so the
+        plans are generated in dependency waves: one batch per wave, holding
+        that wave's steps from every plan. Progress is kept in directory;
+        after a restart, calling again with the same plans and directory
+        resumes where the job stopped.
+
+        Args:
+            plans (List[Dict]): Detailed implementation plans
+            directory (str): Job directory for request files and progress
+            executor (BatchExecutor, optional): Runs the batches; the OpenAI Batch API by default
+            poll_interval (float): Seconds between batch status checks
+            max_attempts (int): Submissions per step before its plan fails
+
+        Returns:
+            List[Dict]: generate_code results, in plan order
+        """
+        job = BatchJob(
+            directory, executor or OpenAIBatchExecutor.from_env(), plans,
+            poll_interval=poll_interval, max_attempts=max_attempts
+        )
+        outputs = [{} for _ in plans]
+        reused = [set() for _ in plans]
+        errors = [None] * len(plans)
+        waves = []
+        for index, plan in enumerate(plans):
+            try:
+                waves.append(self.step_scheduler.levels(plan.get('implementation_steps', [])))
+            except ValueError as e:
+                errors[index] = str(e)
+                waves.append([])
+
+        for wave in range(max(map(len, waves), default=0)):
+            requests_by_id = {}
+            for index, plan in enumerate(plans):
+                if errors[index] is not None or wave >= len(waves[index]):
+                    continue
+                steps = plan['implementation_steps']
+                for step_index in waves[index][wave]:
+                    step, code_snippet, context = self._prepare_step(steps[step_index], plan, outputs[index])
+                    if code_snippet is not None:
+                        reused[index].add(step['name'])
+                        outputs[index][step['name']] = code_snippet
+                    else:
+                        request = self.language_model.build_request(step.get('description', ''), context, step.get('complexity'))
+                        requests_by_id[f"{index}/{step_index}"] = request
+
+            for custom_id, answer in job.execute(requests_by_id).items():
+                index, step_index = map(int, custom_id.split('/'))
+                name = plans[index]['implementation_steps'][step_index]['name']
+                if 'error' in answer:
+                    errors[index] = errors[index] or f"Step '{name}' failed: {answer['error']}"
+                else:
+                    outputs[index][name] = answer['content'].strip()
+
+        results = []
+        for index, plan in enumerate(plans):
+            if errors[index] is not None:
+                self.logger.error(f"Code generation error for plan {plan.get('task_id')}: {errors[index]}")
+                results.append({'status': 'GENERATION_FAILED', 'error': errors[index]})
+                continue
+            steps = plan.get('implementation_steps', [])
+            results.append(self._generation_result(plan, [outputs[index][step['name']] for step in steps], reused[index]))
+        return results
+
+    def _prepare_step(self, step: Dict, plan: Dict, outputs: Dict[str, str]) -> Tuple[Dict, Optional[str], Optional[str]]:
+        """
+        Route a step and either reuse an indexed snippet or build its prompt context
+        
+        Args:
+            step (Dict): Step about to be generated
+            plan (Dict): Plan the step belongs to
+            outputs (Dict[str, str]): Code of the steps finished so far, by name
+        
+        Returns:
+            Tuple: The step with its routing complexity, the reused or kept
+            code (or None) and the prompt context (None when code is reused)
+        """
+        # Code that passed the previous review cycle is kept as it is
+        if step.get('previous_code') is not None:
+            return step, step['previous_code'], None
+
+        plan_complexity = plan.get('estimated_complexity')
+        if plan_complexity and not step.get('complexity'):
+            step = dict(step, complexity=plan_complexity)
+
+        match = self._similar_snippet(step)
+        if match is not None and match['similarity'] >= self.reuse_threshold:
+            self.logger.info(
+                f"Reusing snippet {match['id']} for step '{step.get('name')}' "
+                f"(similarity {match['similarity']:.2f})"
+            )
+            return step, match['code'], None
+
+        context = self.language_model.context_builder.build(
+            step, plan.get('implementation_steps', []), outputs,
+            example=match['code'] if match is not None else None
+        )
+        return step, None, context
+
+    def _generation_result(self, plan: Dict, code_snippets: List[str], reused: set) -> Dict:
+        steps = plan.get('implementation_steps', [])
+        generated_code = {}
+        for step, code_snippet in zip(steps, code_snippets):
+            generated_code[step['name']] = code_snippet
+
+        result = {
+            'task_id': plan.get('task_id'),
+            'status': 'CODE_GENERATION_COMPLETE',
+            'generated_code': generated_code,
+            'language': 'python'  # Default language
+        }
+        if self.snippet_index is not None:
+            result['reused_steps'] = [
+                step['name'] for step in steps
+                if step['name'] in reused and step.get('previous_code') is None
+            ]
+        return result
+
+    def _similar_snippet(self, step: Dict) -> Optional[Dict]:
+        # A step carrying review feedback is being regenerated because its
+        # code failed review, so neither reuse nor seed from the index
+        if self.snippet_index is None or step.get('review_feedback') or not step.get('description'):
+            return None
+        try:
+            return self.snippet_index.query(step['description'])
+        except Exception as e:
+            self.logger.warning(f"Snippet index lookup failed for step '{step.get('name')}': {e}")
+            return None
+
+    def remember_accepted_code(self, plan: Dict, code: Dict) -> int:
+        """
+        Index the code of a plan that passed review for later reuse
+
+        Steps that were themselves reused are skipped.
+
+        Args:
+            plan (Dict): Implementation plan the code was generated from
+            code (Dict): generate_code result that passed review
+
+        Returns:
+            int: Number of snippets indexed
+        """
+        if self.snippet_index is None:
+            return 0
+        reused = set(code.get('reused_steps', []))
+        generated_code = code.get('generated_code', {})
+        snippets = [
+            (step.get('description', ''), generated_code[step['name']])
+            for step in plan.get('implementation_steps', [])
+            if step.get('name') in generated_code and step['name'] not in reused
+        ]
+        return len(self.snippet_index.add_many(snippets))
+
+    @traced(attributes=lambda self, step, context=None: {'step': step.get('name')})
+    def _generate_code_for_step(self, step: Dict, context: str = None) -> str:
         """
         Generate code for a specific implementation step
         
         Args:
             step (Dict): Implementation step details
+            context (str, optional): Prompt context; built from the step alone if omitted
         
         Returns:
             str: Generated code snippet
         """
         return self.language_model.generate_code_snippet(
             description=step.get('description', ''),
-            context=step
+            context=context if context is not None else step,
+            complexity=step.get('complexity')
         )
 
     def validate_generated_code(self, code: Dict) -> bool:
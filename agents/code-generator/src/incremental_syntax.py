@@ -0,0 +1,85 @@
+import codeop
+import warnings
+from typing import Optional
+
+
+class IncrementalSyntaxChecker:
+    """
+    Detect clearly broken Python while a completion is still streaming
+
+    Only complete lines are checked. codeop distinguishes input that is
+    merely unfinished (an open block, bracket or triple-quoted string) from
+    input that can never become valid. An error is only reported once it
+    sits at least grace_lines behind the newest line, so a construct that
+    is still being written is not mistaken for a broken one.
+    """
+
+    def __init__(self, grace_lines: int = 2):
+        self.grace_lines = grace_lines
+        self.error: Optional[SyntaxError] = None
+        self._text = ''
+        self._checked_lines = 0
+
+    def feed(self, chunk: str) -> Optional[SyntaxError]:
+        """
+        Add streamed text and re-check any newly completed lines
+
+        Args:
+            chunk (str): Next piece of the completion
+
+        Returns:
+            Optional[SyntaxError]: The error once the code is clearly broken
+        """
+        if self.error is not None:
+            return self.error
+
+        self._text += chunk
+        lines = self._code_lines()
+        if len(lines) == self._checked_lines:
+            return None
+        self._checked_lines = len(lines)
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                codeop.compile_command('\n'.join(lines) + '\n', symbol='exec')
+        except SyntaxError as e:
+            if e.lineno is not None and e.lineno <= len(lines) - self.grace_lines:
+                self.error = e
+        except (ValueError, OverflowError):
+            pass
+        return self.error
+
+    def _code_lines(self) -> list:
+        """
+        Complete lines of code, without the prose and markdown fence around them
+
+        Unfenced text counts as code when its first line could start a
+        program, and ends at a fence if one follows. Text that opens with
+        prose ("Here is the model:") yields nothing until the fence after
+        it arrives, then the fenced block.
+        """
+        complete = self._text[:self._text.rfind('\n') + 1].splitlines()
+        fence = next((index for index, line in enumerate(complete) if line.lstrip().startswith('```')), None)
+        leading = complete if fence is None else complete[:fence]
+        first = next((line for line in leading if line.strip()), None)
+        if first is not None and not self._is_prose(first):
+            return leading
+        if fence is None:
+            return []
+
+        code_lines = []
+        for line in complete[fence + 1:]:
+            if line.lstrip().startswith('```'):
+                break
+            code_lines.append(line)
+        return code_lines
+
+    def _is_prose(self, line: str) -> bool:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                codeop.compile_command(line.strip(), symbol='exec')
+        except (SyntaxError, ValueError, OverflowError):
+            return True
+        return False
@@ -1,9 +1,35 @@
-import openai
-from typing import Dict
+import textwrap
+from typing import Dict, Iterator, Union
+from llm_cache import LLMResponseCache, make_cache_key
+from llm_client import LLMClient, get_shared_client
+from async_llm_client import AsyncLLMClient, get_loop_client
+from model_routing import ModelRouter
+from incremental_syntax import IncrementalSyntaxChecker
+from context_builder import PromptContextBuilder
+
+class GenerationAborted(Exception):
+    """Raised when a streamed snippet is cancelled because it cannot parse."""
+
+    def __init__(self, syntax_error: SyntaxError, partial_code: str):
+        super().__init__(f"Generated code is invalid: {syntax_error}")
+        self.syntax_error = syntax_error
+        self.partial_code = partial_code
 
 class LanguageModelService:
-    def __init__(self):
-        self.code_generation_prompt = """
+    def __init__(
+        self,
+        cache: LLMResponseCache = None,
+        client: LLMClient = None,
+        context_builder: PromptContextBuilder = None,
+        router: ModelRouter = None,
+        async_client: AsyncLLMClient = None
+    ):
+        self.cache = cache
+        self.client = client if client is not None else get_shared_client()
+        self._async_client = async_client
+        self.router = router if router is not None else ModelRouter.from_env()
+        self.context_builder = context_builder if context_builder is not None else PromptContextBuilder()
+        self.code_generation_prompt = textwrap.dedent("""
         You are an expert code generation assistant. 
         Generate clean, efficient, and well-structured code 
         based on the provided description and context.
@@ -13,27 +39,153 @@ class LanguageModelService:
         - Include necessary imports
         - Add minimal comments for clarity
         - Follow best practices for the target language
-        """
+        """).strip()
 
-    def generate_code_snippet(self, description: str, context: Dict = None) -> str:
+    def generate_code_snippet(self, description: str, context: Union[str, Dict] = None, complexity: str = None) -> str:
         """
         Generate a code snippet based on description and context
         
         Args:
             description (str): Detailed description of code to generate
-            context (Dict, optional): Additional context for code generation
+            context (str or Dict, optional): Built context text, or a step dict to build it from
+            complexity (str, optional): Step or task complexity the model is routed by
         
         Returns:
             str: Generated code snippet
         """
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": self.code_generation_prompt},
-                {"role": "user", "content": description},
-                {"role": "user", "content": f"Context: {context}"}
-            ],
-            max_tokens=500
-        )
-
-        return response.choices[0].message.content.strip()
+        request = self.build_request(description, context, complexity)
+
+        def create() -> str:
+            response = self.client.chat_completion(**request)
+            return response.choices[0].message.content.strip()
+
+        if self.cache is None:
+            return create()
+
+        return self.cache.get_or_create(make_cache_key(**request), create)
+
+    @property
+    def async_client(self) -> AsyncLLMClient:
+        # Without a client of our own, use the running loop's, so every
+        # asyncio.run gets a client bound to its own loop
+        if self._async_client is None:
+            return get_loop_client()
+        return self._async_client
+
+    async def agenerate_code_snippet(
+        self,
+        description: str,
+        context: Union[str, Dict] = None,
+        complexity: str = None
+    ) -> str:
+        """
+        Generate a code snippet without blocking the event loop
+        
+        Args:
+            description (str): Detailed description of code to generate
+            context (str or Dict, optional): Built context text, or a step dict to build it from
+            complexity (str, optional): Step or task complexity the model is routed by
+        
+        Returns:
+            str: Generated code snippet
+        """
+        request = self.build_request(description, context, complexity)
+        cache_key = make_cache_key(**request) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response = await self.async_client.chat_completion(**request)
+        content = response.choices[0].message.content.strip()
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    def stream_code_snippet(
+        self,
+        description: str,
+        context: Union[str, Dict] = None,
+        syntax_check: bool = False,
+        grace_lines: int = 2,
+        complexity: str = None
+    ) -> Iterator[str]:
+        """
+        Stream a code snippet as the model produces it
+        
+        Args:
+            description (str): Detailed description of code to generate
+            context (str or Dict, optional): Built context text, or a step dict to build it from
+            syntax_check (bool): Cancel the completion once it clearly cannot parse
+            grace_lines (int): Lines an error must trail the stream head by
+            complexity (str, optional): Step or task complexity the model is routed by
+        
+        Yields:
+            str: Content chunks; a cached response arrives as one chunk
+        
+        Raises:
+            GenerationAborted: If syntax_check detects broken code
+        """
+        request = self.build_request(description, context, complexity)
+        cache_key = make_cache_key(**request) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        checker = IncrementalSyntaxChecker(grace_lines) if syntax_check else None
+        stream = self.client.chat_completion(stream=True, **request)
+        parts = []
+        try:
+            for chunk in stream:
+                # The closing usage chunk of a stream carries no choices
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.get('content')
+                if not content:
+                    continue
+                parts.append(content)
+                if checker is not None and checker.feed(content) is not None:
+                    raise GenerationAborted(checker.error, ''.join(parts))
+                yield content
+        finally:
+            # Closing the stream drops the connection so the rest of a
+            # cancelled completion is never generated
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+
+        if cache_key is not None:
+            self.cache.set(cache_key, ''.join(parts).strip())
+
+    def build_request(self, description: str, context: Union[str, Dict] = None, complexity: str = None) -> Dict:
+        """
+        Build the chat completion request for a snippet
+
+        Messages run from most to least shared: the static system prompt,
+        then the context (which opens with the plan overview), then the
+        step description, so provider-side prompt caching can reuse the
+        longest prefix across the steps of a plan.
+        
+        Args:
+            description (str): Detailed description of code to generate
+            context (str or Dict, optional): Built context text, or a step dict to build it from
+            complexity (str, optional): Routing complexity; a step dict's own 'complexity' otherwise
+        
+        Returns:
+            Dict: Keyword arguments for LLMClient.chat_completion
+        """
+        if isinstance(context, dict):
+            complexity = complexity or context.get('complexity')
+            context = self.context_builder.build(context)
+
+        messages = [{"role": "system", "content": self.code_generation_prompt}]
+        if context:
+            messages.append({"role": "user", "content": f"Context:\n{context}"})
+        messages.append({"role": "user", "content": description})
+        return {
+            'model': self.router.route(complexity),
+            'messages': messages,
+            'max_tokens': 500
+        }
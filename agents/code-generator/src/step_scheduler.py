@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class StepScheduler:
+    def __init__(self, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, steps: List[Dict], worker: Callable[[Dict], Any]) -> List[Any]:
+        """
+        Run a worker over implementation steps, honouring step dependencies
+
+        Independent steps run concurrently (up to max_concurrency); a step
+        is only started once every step it depends on has finished.
+
+        Args:
+            steps (List[Dict]): Implementation steps with optional 'dependencies'
+            worker (Callable): Function producing a result for a single step
+
+        Returns:
+            List[Any]: Worker results, in the same order as steps
+        """
+        dependents = self._build_dependency_graph(steps)
+        remaining = [0] * len(steps)
+        for children in dependents:
+            for child in children:
+                remaining[child] += 1
+
+        results: List[Any] = [None] * len(steps)
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            running = {}
+            try:
+                while ready or running:
+                    while ready and len(running) < self.max_concurrency:
+                        index = ready.pop(0)
+                        # Each step runs in a copy of the caller's context so
+                        # spans opened by the worker nest under the caller's span
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, worker, steps[index])] = index
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in sorted(done, key=running.get):
+                        index = running.pop(future)
+                        results[index] = future.result()
+                        for child in dependents[index]:
+                            remaining[child] -= 1
+                            if remaining[child] == 0:
+                                ready.append(child)
+                    ready.sort()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        return results
+
+    async def arun(self, steps: List[Dict], worker: Callable[[Dict], Awaitable[Any]]) -> List[Any]:
+        """
+        Run a coroutine worker over implementation steps, honouring step dependencies
+
+        The asyncio counterpart of run: one task per step, each waiting for
+        the steps it depends on and then for one of max_concurrency slots.
+        If a step fails or the caller is cancelled, the other steps are cancelled.
+
+        Args:
+            steps (List[Dict]): Implementation steps with optional 'dependencies'
+            worker (Callable): Coroutine function producing a result for a single step
+
+        Returns:
+            List[Any]: Worker results, in the same order as steps
+        """
+        dependents = self._build_dependency_graph(steps)
+        parents: List[List[int]] = [[] for _ in steps]
+        for parent, children in enumerate(dependents):
+            for child in children:
+                parents[child].append(parent)
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def run_step(index: int) -> Any:
+            # Every task exists before any runs, so parents can be awaited by index
+            if parents[index]:
+                await asyncio.gather(*(tasks[parent] for parent in parents[index]))
+            async with slots:
+                return await worker(steps[index])
+
+        tasks.extend(asyncio.ensure_future(run_step(index)) for index in range(len(steps)))
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Let the cancelled tasks unwind before reporting the failure
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def levels(self, steps: List[Dict]) -> List[List[int]]:
+        """
+        Group steps into waves whose dependencies all lie in earlier waves
+
+        Args:
+            steps (List[Dict]): Implementation steps with optional 'dependencies'
+
+        Returns:
+            List[List[int]]: Step indices per wave, in step order within a wave
+        """
+        dependents = self._build_dependency_graph(steps)
+        level = [0] * len(steps)
+        # Parents precede children in a topological order, so one forward
+        # pass over it settles every level
+        for index in self._topological_order(dependents):
+            for child in dependents[index]:
+                level[child] = max(level[child], level[index] + 1)
+
+        waves: List[List[int]] = [[] for _ in range(max(level, default=-1) + 1)]
+        for index, wave in enumerate(level):
+            waves[wave].append(index)
+        return waves
+
+    def _topological_order(self, dependents: List[List[int]]) -> List[int]:
+        in_degree = [0] * len(dependents)
+        for children in dependents:
+            for child in children:
+                in_degree[child] += 1
+
+        order = [index for index, degree in enumerate(in_degree) if degree == 0]
+        for index in order:
+            for child in dependents[index]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    order.append(child)
+        return order
+
+    def _build_dependency_graph(self, steps: List[Dict]) -> List[List[int]]:
+        """
+        Resolve step dependencies to step indices and reject cycles
+
+        Args:
+            steps (List[Dict]): Implementation steps
+
+        Returns:
+            List[List[int]]: For each step, the indices of steps depending on it
+        """
+        indices_by_name: Dict[str, List[int]] = {}
+        for index, step in enumerate(steps):
+            indices_by_name.setdefault(step.get('name'), []).append(index)
+
+        dependents: List[List[int]] = [[] for _ in steps]
+        for index, step in enumerate(steps):
+            for dependency in step.get('dependencies') or []:
+                if dependency not in indices_by_name:
+                    self.logger.warning(
+                        f"Step '{step.get('name')}' depends on unknown step '{dependency}'; ignoring"
+                    )
+                    continue
+                for parent in indices_by_name[dependency]:
+                    if parent == index:
+                        raise ValueError(f"Step '{step.get('name')}' depends on itself")
+                    if index not in dependents[parent]:
+                        dependents[parent].append(index)
+
+        self._check_acyclic(steps, dependents)
+        return dependents
+
+    def _check_acyclic(self, steps: List[Dict], dependents: List[List[int]]) -> None:
+        """
+        Raise ValueError if the dependency graph contains a cycle
+
+        Steps on or behind a cycle never reach in-degree zero, so the
+        topological order leaves them out.
+
+        Args:
+            steps (List[Dict]): Implementation steps
+            dependents (List[List[int]]): Adjacency list from parent to children
+        """
+        order = self._topological_order(dependents)
+        if len(order) != len(steps):
+            ordered = set(order)
+            cyclic = [step.get('name') for index, step in enumerate(steps) if index not in ordered]
+            raise ValueError(f"Circular step dependencies detected: {', '.join(map(str, cyclic))}")
@@ -0,0 +1,285 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+HOURS_PER_UNIT = {'minute': 1 / 60, 'hour': 1.0, 'day': 8.0, 'week': 40.0, 'month': 160.0}
+UNIT_ALIASES = {
+    'minute': 'minute', 'minutes': 'minute', 'min': 'minute', 'mins': 'minute', 'm': 'minute',
+    'hour': 'hour', 'hours': 'hour', 'hr': 'hour', 'hrs': 'hour', 'h': 'hour',
+    'day': 'day', 'days': 'day', 'd': 'day',
+    'week': 'week', 'weeks': 'week', 'wk': 'week', 'wks': 'week', 'w': 'week',
+    'month': 'month', 'months': 'month', 'mo': 'month',
+}
+# Used when a step's estimate is missing or unreadable; matches the planner's default
+DEFAULT_ESTIMATE = (1.0, 2.0)
+
+_NUMBER = r'(\d+(?:\.\d+)?|half(?:\s+an?)?|an?)'
+_UNIT = '|'.join(sorted(UNIT_ALIASES, key=len, reverse=True))
+_DURATION = re.compile(rf'\b{_NUMBER}(?:\s*(?:-|–|to)\s*{_NUMBER})?\s*({_UNIT})?\b', re.IGNORECASE)
+_DEPENDENCY_SEPARATOR = re.compile(r'\s*(?:,|;|\band\b)\s*', re.IGNORECASE)
+
+
+def _number(text: str) -> float:
+    text = text.lower()
+    if text.startswith('half'):
+        return 0.5
+    if text in ('a', 'an'):
+        return 1.0
+    return float(text)
+
+
+def parse_estimated_time(value: Any) -> Optional[Tuple[float, float]]:
+    """
+    Parse a free-text duration into an hour range
+
+    Understands ranges ('1-2 hours', '3 to 5 days'), compound durations
+    ('1 hour 30 minutes'), abbreviations ('2h', '45 min') and 'a'/'half a'.
+    Alternatives ('2 hours, maybe 3') span a range. A bare number takes the
+    unit before it, else hours; a day is 8 working hours and a week 5 days.
+
+    Args:
+        value (Any): estimated_time from a step, text or a number of hours
+
+    Returns:
+        Optional[Tuple[float, float]]: (min, max) hours, or None if nothing was recognised
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return (float(value), float(value)) if value >= 0 else None
+    if not isinstance(value, str):
+        return None
+
+    # Durations with falling units add up ('1 hour 30 minutes'); any other
+    # duration is an alternative estimate ('2 hours, maybe 3') and widens the range
+    estimates: List[List[float]] = []
+    previous_unit = None
+    for match in _DURATION.finditer(value):
+        first, second, unit = match.groups()
+        if unit is None and not first[0].isdigit():
+            continue
+        unit = UNIT_ALIASES[unit.lower()] if unit else None
+        start = _number(first)
+        end = _number(second) if second else start
+        if unit is not None and previous_unit is not None and HOURS_PER_UNIT[unit] < HOURS_PER_UNIT[previous_unit]:
+            estimate = estimates[-1]
+        else:
+            estimate = [0.0, 0.0]
+            estimates.append(estimate)
+            unit = unit or previous_unit
+        hours = HOURS_PER_UNIT[unit] if unit else 1.0
+        estimate[0] += min(start, end) * hours
+        estimate[1] += max(start, end) * hours
+        previous_unit = unit
+    if not estimates:
+        return None
+    return (round(min(low for low, _ in estimates), 4), round(max(high for _, high in estimates), 4))
+
+
+def normalize_step_name(name: str) -> str:
+    """Fold case, punctuation and spacing so 'User Model' matches 'user_model'."""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+class PlanGraph:
+    """
+    Dependency graph over a plan's implementation steps
+
+    Dependency names are resolved to step names - exactly, else after
+    normalize_step_name - and every unresolvable reference, duplicate step
+    name and cycle is collected in problems. steps holds copies of the
+    input steps with canonical dependency names and an 'estimated_hours'
+    range; a valid graph can then be scheduled into levels of steps that
+    may run together.
+    """
+
+    def __init__(self, steps: List[Dict]):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.problems: List[str] = []
+        self.steps = [dict(step) for step in steps]
+        self.names = [step.get('name') for step in self.steps]
+        self.dependencies: Dict[str, List[str]] = {}
+        self.estimates: Dict[str, Tuple[float, float]] = {}
+        self._resolve()
+        if not self.problems:
+            self._check_acyclic()
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.problems
+
+    def _resolve(self) -> None:
+        exact = set()
+        normalized: Dict[str, str] = {}
+        for name in self.names:
+            if not isinstance(name, str) or not name:
+                continue
+            if name in exact:
+                self.problems.append(f"Duplicate step name '{name}'")
+            exact.add(name)
+            normalized.setdefault(normalize_step_name(name), name)
+
+        for step in self.steps:
+            name = step.get('name')
+            resolved = []
+            for reference in self._references(step.get('dependencies')):
+                # A list written as one string is only split when the whole
+                # string is not itself a step name ('Search, Sort')
+                target = self._lookup(reference, exact, normalized)
+                parts = [reference] if target is not None else [
+                    part for part in _DEPENDENCY_SEPARATOR.split(reference) if part
+                ]
+                for part in parts:
+                    target = self._lookup(part, exact, normalized)
+                    if target is None:
+                        self.problems.append(f"Step '{name}' depends on unknown step '{part}'")
+                        resolved.append(part)
+                    elif target not in resolved:
+                        resolved.append(target)
+            step['dependencies'] = resolved
+            self.dependencies[name] = [dependency for dependency in resolved if dependency in exact]
+
+            estimate = parse_estimated_time(step.get('estimated_time'))
+            if estimate is None and step.get('estimated_time') not in (None, ''):
+                self.logger.warning(
+                    f"Step '{name}' has no readable estimated_time ({step.get('estimated_time')!r}); "
+                    f"assuming {DEFAULT_ESTIMATE[0]:g}-{DEFAULT_ESTIMATE[1]:g} hours"
+                )
+            if estimate is None:
+                estimate = DEFAULT_ESTIMATE
+            self.estimates[name] = estimate
+            step['estimated_hours'] = {'min': estimate[0], 'max': estimate[1]}
+
+    def _references(self, dependencies: Any) -> List[str]:
+        if not dependencies:
+            return []
+        if isinstance(dependencies, (str, dict)):
+            dependencies = [dependencies]
+        references = []
+        for dependency in dependencies:
+            if isinstance(dependency, dict):
+                dependency = dependency.get('name')
+            if isinstance(dependency, str) and dependency.strip():
+                references.append(dependency.strip())
+        return references
+
+    def _lookup(self, reference: str, exact: set, normalized: Dict[str, str]) -> Optional[str]:
+        return reference if reference in exact else normalized.get(normalize_step_name(reference))
+
+    def _check_acyclic(self) -> None:
+        # Iterative depth-first search, so deep plans cannot hit the recursion limit
+        state = {name: 0 for name in self.dependencies}  # 0 new, 1 on stack, 2 done
+        for root in self.dependencies:
+            if state[root]:
+                continue
+            path = [root]
+            iterators = [iter(self.dependencies[root])]
+            state[root] = 1
+            while iterators:
+                dependency = next(iterators[-1], None)
+                if dependency is None:
+                    state[path.pop()] = 2
+                    iterators.pop()
+                elif state[dependency] == 1:
+                    cycle = path[path.index(dependency):] + [dependency]
+                    self.problems.append(f"Circular dependency: {' -> '.join(cycle)}")
+                    return
+                elif state[dependency] == 0:
+                    state[dependency] = 1
+                    path.append(dependency)
+                    iterators.append(iter(self.dependencies[dependency]))
+
+    def levels(self) -> List[List[str]]:
+        """
+        Group steps into topological levels
+
+        Every step's dependencies are in earlier levels, so the steps of one
+        level can be generated together.
+
+        Returns:
+            List[List[str]]: Step names per level, each level in plan order
+        """
+        self._require_valid()
+        level_of: Dict[str, int] = {}
+        levels: List[List[str]] = []
+        for name in self._topological_order():
+            level = 1 + max((level_of[dependency] for dependency in self.dependencies[name]), default=-1)
+            level_of[name] = level
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(name)
+        order = {name: index for index, name in enumerate(self.names)}
+        return [sorted(level, key=order.get) for level in levels]
+
+    def critical_path(self) -> Tuple[List[str], Tuple[float, float]]:
+        """
+        Find the longest chain of dependent steps
+
+        Returns:
+            Tuple: Step names along the path (by maximum estimates) and the
+            (min, max) hours of the longest chain under minimum and maximum
+            estimates respectively
+        """
+        self._require_valid()
+        finish_min: Dict[str, float] = {}
+        finish_max: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self._topological_order():
+            low, high = self.estimates[name]
+            dependencies = self.dependencies[name]
+            finish_min[name] = low + max((finish_min[dependency] for dependency in dependencies), default=0.0)
+            slowest = max(dependencies, key=finish_max.get, default=None)
+            previous[name] = slowest
+            finish_max[name] = high + (finish_max[slowest] if slowest is not None else 0.0)
+
+        if not finish_max:
+            return [], (0.0, 0.0)
+        path = [max(finish_max, key=finish_max.get)]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return path, (round(max(finish_min.values()), 4), round(max(finish_max.values()), 4))
+
+    def schedule(self) -> Dict[str, Any]:
+        """
+        Summarise the plan for scheduling
+
+        Returns:
+            Dict: execution_levels, max_parallelism (the widest level),
+            critical_path and its critical_path_hours, and total_hours -
+            the sum of all estimates, i.e. the fully serial duration
+        """
+        levels = self.levels()
+        path, (path_min, path_max) = self.critical_path()
+        return {
+            'execution_levels': levels,
+            'max_parallelism': max((len(level) for level in levels), default=0),
+            'critical_path': path,
+            'critical_path_hours': {'min': path_min, 'max': path_max},
+            'total_hours': {
+                'min': round(sum(low for low, _ in self.estimates.values()), 4),
+                'max': round(sum(high for _, high in self.estimates.values()), 4)
+            }
+        }
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: len(dependencies) for name, dependencies in self.dependencies.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.dependencies}
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                dependents[dependency].append(name)
+
+        ready = [name for name in self.dependencies if remaining[name] == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return order
+
+    def _require_valid(self) -> None:
+        if self.problems:
+            raise ValueError('; '.join(self.problems))
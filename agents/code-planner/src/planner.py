@@ -1,21 +1,53 @@
-import os
+import asyncio
 import logging
-from typing import Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from strategy_generator import StrategyGenerator
+from plan_graph import PlanGraph
+from llm_cache import LLMResponseCache
+from llm_client import LLMClient
+from async_llm_client import AsyncLLMClient
+from model_routing import ModelRouter
+from batch_jobs import BatchExecutor, BatchJob, OpenAIBatchExecutor
+from instrumentation import traced
 from dotenv import load_dotenv
-import openai
 
 load_dotenv()
 
+_NO_TASK = object()
+
 class CodePlannerAgent:
-    def __init__(self):
-        openai.api_key = os.getenv('OPENAI_API_KEY')
-        self.strategy_generator = StrategyGenerator()
+    def __init__(
+        self,
+        cache: LLMResponseCache = None,
+        max_concurrency: int = 8,
+        llm_client: LLMClient = None,
+        router: ModelRouter = None,
+        async_llm_client: AsyncLLMClient = None
+    ):
+        self.strategy_generator = StrategyGenerator(
+            cache=cache,
+            client=llm_client,
+            router=router,
+            async_client=async_llm_client
+        )
         self.logger = logging.getLogger(__name__)
+        self.max_concurrency = max_concurrency
+        # Shared by every bulk call on this agent, so concurrent imports
+        # together never exceed max_concurrency in-flight LLM calls
+        self._planning_slots = threading.BoundedSemaphore(max_concurrency)
 
+    @traced()
     def initialize_plan(self, task: Dict) -> Dict:
         """
         Generate a comprehensive implementation plan for a given task
+
+        Step dependencies are resolved to step names and estimates parsed
+        into hour ranges. When the dependency graph is sound the plan also
+        carries execution_levels, max_parallelism, critical_path,
+        critical_path_hours and total_hours; otherwise it lists
+        dependency_errors, and validate_plan rejects it.
         
         Args:
             task (Dict): Task details including title and description
@@ -26,15 +58,37 @@ class CodePlannerAgent:
         try:
             # Generate initial strategy
             strategy = self.strategy_generator.generate_strategy(task)
-            
-            # Decompose into implementation steps
-            implementation_steps = self._decompose_strategy(strategy)
-            
+            return self._plan_from_strategy(task, strategy)
+        except Exception as e:
+            self.logger.error(f"Planning error: {e}")
+            return {
+                'status': 'PLANNING_FAILED',
+                'error': str(e)
+            }
+
+    @traced()
+    async def ainitialize_plan(self, task: Dict, timeout: float = None) -> Dict:
+        """
+        Generate an implementation plan without blocking the event loop
+
+        The asyncio counterpart of initialize_plan. Cancelling the awaiting
+        task cancels the LLM call.
+        
+        Args:
+            task (Dict): Task details including title and description
+            timeout (float, optional): Seconds before planning fails with a timeout
+        
+        Returns:
+            Dict: Detailed implementation plan
+        """
+        try:
+            strategy = await asyncio.wait_for(self.strategy_generator.agenerate_strategy(task), timeout)
+            return self._plan_from_strategy(task, strategy)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Planning timed out after {timeout}s")
             return {
-                'task_id': task.get('id'),
-                'status': 'PLANNING_COMPLETE',
-                'implementation_steps': implementation_steps,
-                'estimated_complexity': strategy.get('complexity', 'MEDIUM')
+                'status': 'PLANNING_FAILED',
+                'error': f"Planning timed out after {timeout}s"
             }
         except Exception as e:
             self.logger.error(f"Planning error: {e}")
@@ -43,6 +97,128 @@ class CodePlannerAgent:
                 'error': str(e)
             }
 
+    def _plan_from_strategy(self, task: Dict, strategy: Dict) -> Dict:
+        # Decompose into implementation steps
+        graph = PlanGraph(self._decompose_strategy(strategy))
+        
+        plan = {
+            'task_id': task.get('id'),
+            'status': 'PLANNING_COMPLETE',
+            'implementation_steps': graph.steps,
+            'estimated_complexity': strategy.get('complexity', 'MEDIUM')
+        }
+        if graph.is_valid:
+            plan.update(graph.schedule())
+        else:
+            plan['dependency_errors'] = graph.problems
+        return plan
+
+    def initialize_plans(self, tasks: Iterable[Dict]) -> Iterator[Tuple[Any, Dict]]:
+        """
+        Plan many tasks concurrently, yielding each plan as it completes
+        
+        Tasks are pulled lazily from the iterable, so large imports are not
+        materialised up front. A failing task yields a PLANNING_FAILED result
+        and does not affect the rest of the batch.
+        
+        Args:
+            tasks (Iterable[Dict]): Task details including id, title and description
+        
+        Returns:
+            Iterator[Tuple[Any, Dict]]: (task id, initialize_plan result) in completion order
+        """
+        task_iterator = iter(tasks)
+        in_flight = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            while True:
+                while len(in_flight) < self.max_concurrency:
+                    task = next(task_iterator, _NO_TASK)
+                    if task is _NO_TASK:
+                        break
+                    in_flight[executor.submit(self._plan_isolated, task)] = task
+
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    yield self._task_id(task), future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def initialize_plans_batch(
+        self,
+        tasks: List[Dict],
+        directory: str,
+        executor: BatchExecutor = None,
+        poll_interval: float = 30.0,
+        max_attempts: int = 3
+    ) -> List[Dict]:
+        """
+        Plan many tasks offline through one batch request file
+
+        Progress is kept in directory; after a restart, calling again with
+        the same tasks and directory resumes where the job stopped.
+
+        Args:
+            tasks (List[Dict]): Task details including id, title and description
+            directory (str): Job directory for request files and progress
+            executor (BatchExecutor, optional): Runs the batches; the OpenAI Batch API by default
+            poll_interval (float): Seconds between batch status checks
+            max_attempts (int): Submissions per task before it fails
+
+        Returns:
+            List[Dict]: initialize_plan results, in task order
+        """
+        job = BatchJob(
+            directory, executor or OpenAIBatchExecutor.from_env(), tasks,
+            poll_interval=poll_interval, max_attempts=max_attempts
+        )
+        answers = job.execute({
+            str(index): self.strategy_generator.build_request(task) for index, task in enumerate(tasks)
+        })
+
+        plans = []
+        for index, task in enumerate(tasks):
+            answer = answers[str(index)]
+            try:
+                if 'error' in answer:
+                    raise RuntimeError(answer['error'])
+                strategy = self.strategy_generator.parse_strategy(answer['content'])
+                plans.append(self._plan_from_strategy(task, strategy))
+            except Exception as e:
+                self.logger.error(f"Planning error for task {self._task_id(task)}: {e}")
+                plans.append({
+                    'status': 'PLANNING_FAILED',
+                    'error': str(e)
+                })
+        return plans
+
+    def _plan_isolated(self, task: Dict) -> Dict:
+        """
+        Plan one task of a bulk run, converting any error into a failed result
+        
+        Args:
+            task (Dict): Task details
+        
+        Returns:
+            Dict: initialize_plan result
+        """
+        with self._planning_slots:
+            try:
+                return self.initialize_plan(task)
+            except Exception as e:
+                self.logger.error(f"Planning error for task {self._task_id(task)}: {e}")
+                return {
+                    'status': 'PLANNING_FAILED',
+                    'error': str(e)
+                }
+
+    def _task_id(self, task: Any) -> Any:
+        return task.get('id') if isinstance(task, dict) else None
+
     def _decompose_strategy(self, strategy: Dict) -> List[Dict]:
         """
         Break down strategy into granular implementation steps
@@ -68,6 +244,9 @@ class CodePlannerAgent:
     def validate_plan(self, plan: Dict) -> bool:
         """
         Validate the generated implementation plan
+
+        Every step needs a name and description, and the dependency graph
+        must have no unknown references, duplicate names or cycles.
         
         Args:
             plan (Dict): Implementation plan to validate
@@ -78,8 +257,14 @@ class CodePlannerAgent:
         if not plan or len(plan.get('implementation_steps', [])) == 0:
             return False
         
-        return all(
+        if not all(
             step.get('name') and 
             step.get('description') 
             for step in plan['implementation_steps']
-        )
+        ):
+            return False
+
+        graph = PlanGraph(plan['implementation_steps'])
+        for problem in graph.problems:
+            self.logger.warning(f"Invalid plan {plan.get('task_id')}: {problem}")
+        return graph.is_valid
@@ -1,9 +1,22 @@
 import json
-import openai
 from typing import Dict
+from llm_cache import LLMResponseCache, make_cache_key
+from llm_client import LLMClient, get_shared_client
+from async_llm_client import AsyncLLMClient, get_loop_client
+from model_routing import ModelRouter
 
 class StrategyGenerator:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: LLMResponseCache = None,
+        client: LLMClient = None,
+        router: ModelRouter = None,
+        async_client: AsyncLLMClient = None
+    ):
+        self.cache = cache
+        self.client = client if client is not None else get_shared_client()
+        self._async_client = async_client
+        self.router = router if router is not None else ModelRouter.from_env()
         self.system_prompt = """
         You are an expert software architecture strategy generator. 
         Your task is to break down software development tasks into 
@@ -19,6 +32,8 @@ class StrategyGenerator:
     def generate_strategy(self, task: Dict) -> Dict:
         """
         Generate a comprehensive implementation strategy
+
+        The model is routed by the task's own 'complexity', when it has one.
         
         Args:
             task (Dict): Task details including title and description
@@ -26,16 +41,80 @@ class StrategyGenerator:
         Returns:
             Dict: Detailed implementation strategy
         """
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
+        request = self.build_request(task)
+
+        def create() -> str:
+            response = self.client.chat_completion(**request)
+            content = response.choices[0].message.content
+            json.loads(content)  # never cache an unparseable strategy
+            return content
+
+        if self.cache is None:
+            content = create()
+        else:
+            content = self.cache.get_or_create(make_cache_key(**request), create)
+
+        return self.parse_strategy(content)
+
+    @property
+    def async_client(self) -> AsyncLLMClient:
+        # Without a client of our own, use the running loop's, so every
+        # asyncio.run gets a client bound to its own loop
+        if self._async_client is None:
+            return get_loop_client()
+        return self._async_client
+
+    async def agenerate_strategy(self, task: Dict) -> Dict:
+        """
+        Generate an implementation strategy without blocking the event loop
+        
+        Args:
+            task (Dict): Task details including title and description
+        
+        Returns:
+            Dict: Detailed implementation strategy
+        """
+        request = self.build_request(task)
+        cache_key = make_cache_key(**request) if self.cache is not None else None
+        content = self.cache.get(cache_key) if cache_key is not None else None
+        if content is None:
+            response = await self.async_client.chat_completion(**request)
+            content = response.choices[0].message.content
+            json.loads(content)  # never cache an unparseable strategy
+            if cache_key is not None:
+                self.cache.set(cache_key, content)
+        return self.parse_strategy(content)
+
+    def build_request(self, task: Dict) -> Dict:
+        """
+        Build the chat completion request for a task's strategy
+        
+        Args:
+            task (Dict): Task details including title and description
+        
+        Returns:
+            Dict: Keyword arguments for LLMClient.chat_completion
+        """
+        return {
+            'model': self.router.route(task.get('complexity')),
+            'messages': [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": json.dumps(task)}
             ],
-            response_format={"type": "json_object"}
-        )
+            'response_format': {"type": "json_object"}
+        }
 
-        strategy = json.loads(response.choices[0].message.content)
+    def parse_strategy(self, content: str) -> Dict:
+        """
+        Parse a strategy completion
+        
+        Args:
+            content (str): JSON message content of the completion
+        
+        Returns:
+            Dict: Components, complexity and recommended technologies
+        """
+        strategy = json.loads(content)
         
         return {
             'components': strategy.get('components', {}),
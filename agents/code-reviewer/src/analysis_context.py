@@ -0,0 +1,143 @@
+import io
+import ast
+import hashlib
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import List, Optional
+from structure_visitor import StructureVisitor
+from performance_visitor import PerformanceVisitor
+
+
+def content_hash(code: str) -> str:
+    """
+    Hash snippet text for cache lookups and change detection
+
+    Args:
+        code (str): Source code
+
+    Returns:
+        str: Hex SHA-256 digest of the code
+    """
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+class AnalysisContext:
+    """
+    Lazily parsed view of one snippet, shared by every analyzer
+
+    The AST, token stream, structure pass and performance pass are each
+    computed at most once.
+    Analyzers must treat them as read-only since the context is cached.
+    """
+
+    def __init__(self, code: str, digest: str = None):
+        self.code = code
+        self.content_hash = digest or content_hash(code)
+        self._lines = None
+        self._tree = None
+        self._syntax_error = None
+        self._tokens = None
+        self._token_error = None
+        self._structure = None
+        self._performance = None
+        self._lock = threading.Lock()
+
+    @property
+    def lines(self) -> List[str]:
+        if self._lines is None:
+            self._lines = self.code.splitlines()
+        return self._lines
+
+    @property
+    def tree(self) -> ast.Module:
+        """Parsed module; raises SyntaxError if the code does not parse."""
+        with self._lock:
+            if self._tree is None and self._syntax_error is None:
+                try:
+                    self._tree = ast.parse(self.code)
+                except SyntaxError as e:
+                    self._syntax_error = e
+        if self._syntax_error is not None:
+            raise SyntaxError(*self._syntax_error.args)
+        return self._tree
+
+    @property
+    def syntax_error(self) -> Optional[SyntaxError]:
+        try:
+            self.tree
+        except SyntaxError:
+            return self._syntax_error
+        return None
+
+    @property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """Token stream; truncated at the first tokenize error."""
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = []
+                try:
+                    for token in tokenize.generate_tokens(io.StringIO(self.code).readline):
+                        self._tokens.append(token)
+                except (tokenize.TokenError, SyntaxError) as e:
+                    self._token_error = e
+        return self._tokens
+
+    @property
+    def structure(self) -> StructureVisitor:
+        """Completed structure pass over the tree; raises SyntaxError like tree."""
+        tree = self.tree
+        with self._lock:
+            if self._structure is None:
+                visitor = StructureVisitor()
+                visitor.visit(tree)
+                self._structure = visitor
+        return self._structure
+
+    @property
+    def performance(self) -> PerformanceVisitor:
+        """Completed performance pass over the tree; raises SyntaxError like tree."""
+        tree = self.tree
+        with self._lock:
+            if self._performance is None:
+                visitor = PerformanceVisitor()
+                visitor.visit(tree)
+                self._performance = visitor
+        return self._performance
+
+
+class AnalysisContextCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._contexts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> AnalysisContext:
+        """
+        Return the shared context for a snippet, creating it on first use
+
+        Args:
+            code (str): Source code
+
+        Returns:
+            AnalysisContext: Context keyed by the code's content hash
+        """
+        digest = content_hash(code)
+        with self._lock:
+            context = self._contexts.get(digest)
+            if context is not None:
+                self._contexts.move_to_end(digest)
+                return context
+
+            context = AnalysisContext(code, digest)
+            self._contexts[digest] = context
+            while len(self._contexts) > self.max_entries:
+                self._contexts.popitem(last=False)
+            return context
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+
+    def __len__(self) -> int:
+        return len(self._contexts)
@@ -1,11 +1,30 @@
-import re
 import ast
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator
+from structure_visitor import StructureVisitor
+from analysis_context import AnalysisContext, AnalysisContextCache
+from security_rules import SecurityRuleScanner
+from review_merge import worst_complexity
+from style_checker import StyleChecker
 
 class CodeAnalysisEngine:
-    def __init__(self):
+    def __init__(self, context_cache_size: int = 256, max_line_length: int = 99):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.contexts = AnalysisContextCache(max_entries=context_cache_size)
+        self.security_scanner = SecurityRuleScanner()
+        self.style_checker = StyleChecker(max_line_length=max_line_length)
+
+    def get_context(self, code: str) -> AnalysisContext:
+        """
+        Get the shared parse-once context for a snippet
+        
+        Args:
+            code (str): Source code
+        
+        Returns:
+            AnalysisContext: Cached AST, tokens and structure pass
+        """
+        return self.contexts.get(code)
     
     def analyze_code_structure(self, code: str) -> Dict[str, Any]:
         """
@@ -18,13 +37,13 @@ class CodeAnalysisEngine:
             Dict containing structural analysis results
         """
         try:
-            tree = ast.parse(code)
+            visitor = self.get_context(code).structure
 
             structure_report = {
-                'function_count': len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]),
-                'class_count': len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]),
-                'complexity_metrics': self._calculate_cyclomatic_complexity(tree),
-                'potential_issues': self._identify_code_smells(tree)
+                'function_count': visitor.function_count,
+                'class_count': visitor.class_count,
+                'complexity_metrics': self._complexity_metrics(visitor),
+                'potential_issues': self._code_smells(visitor)
             }
             
             return structure_report
@@ -42,17 +61,9 @@ class CodeAnalysisEngine:
         Returns:
             Dict with complexity metrics
         """
-        complexity_metrics = {
-            'total_complexity': 1,
-            'branch_points': 0
-        }
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.While, ast.For, ast.Try, ast.ExceptHandler)):
-                complexity_metrics['total_complexity'] += 1
-                complexity_metrics['branch_points'] += 1
-        
-        return complexity_metrics
+        visitor = StructureVisitor()
+        visitor.visit(tree)
+        return self._complexity_metrics(visitor)
     
     def _identify_code_smells(self, tree: ast.AST) -> List[str]:
         """
@@ -64,18 +75,9 @@ class CodeAnalysisEngine:
         Returns:
             List of potential code smell descriptions
         """
-        code_smells = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if len(node.body) > 20:
-                    code_smells.append(f"Long method detected: {node.name}")
-
-        nested_depth = self._check_nested_complexity(tree)
-        if nested_depth > 3:
-            code_smells.append(f"High nested complexity: {nested_depth} levels")
-        
-        return code_smells
+        visitor = StructureVisitor()
+        visitor.visit(tree)
+        return self._code_smells(visitor)
     
     def _check_nested_complexity(self, tree: ast.AST, max_depth: int = 3) -> int:
         """
@@ -88,15 +90,122 @@ class CodeAnalysisEngine:
         Returns:
             Maximum nesting depth found
         """
-        def _depth_traverse(node, current_depth=0):
-            max_found = current_depth
-            for child in ast.iter_child_nodes(node):
-                if isinstance(child, (ast.If, ast.For, ast.While)):
-                    max_found = max(max_found, _depth_traverse(child, current_depth + 1))
-            return max_found
+        visitor = StructureVisitor()
+        visitor.visit(tree)
+        return visitor.max_nesting_depth
+
+    def _complexity_metrics(self, visitor: StructureVisitor) -> Dict[str, float]:
+        """
+        Build cyclomatic complexity metrics from a completed structure pass
         
-        return _depth_traverse(tree)
+        Args:
+            visitor (StructureVisitor): Visitor that has walked the tree
+        
+        Returns:
+            Dict with complexity metrics
+        """
+        return {
+            'total_complexity': 1 + visitor.branch_points,
+            'branch_points': visitor.branch_points
+        }
+
+    def _code_smells(self, visitor: StructureVisitor) -> List[str]:
+        """
+        Build code smell descriptions from a completed structure pass
+        
+        Args:
+            visitor (StructureVisitor): Visitor that has walked the tree
+        
+        Returns:
+            List of potential code smell descriptions
+        """
+        code_smells = [f"Long method detected: {name}" for name in visitor.long_methods]
+
+        if visitor.max_nesting_depth > 3:
+            code_smells.append(f"High nested complexity: {visitor.max_nesting_depth} levels")
+        
+        return code_smells
     
+    def analyze_performance(self, generated_code: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Estimate time complexity and locate slow patterns in generated files
+        
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+        
+        Returns:
+            Dict with the worst 'time_complexity', per-function estimates with
+            locations, pattern 'issues' and files that failed to parse
+        """
+        functions, issues, parse_errors = [], [], []
+        for filename, code in generated_code.items():
+            try:
+                visitor = self.get_context(code).performance
+            except SyntaxError as e:
+                self.logger.error(f"Syntax error in performance analysis of {filename}: {str(e)}")
+                parse_errors.append({'file': filename, 'error': str(e)})
+                continue
+            functions.extend({'file': filename, **record} for record in visitor.functions)
+            issues.extend({'file': filename, **issue} for issue in visitor.issues)
+
+        return {
+            'time_complexity': worst_complexity([record['time_complexity'] for record in functions]),
+            'functions': functions,
+            'issues': issues,
+            'parse_errors': parse_errors
+        }
+
+    def check_code_style(self, generated_code: Dict[str, str]) -> List[str]:
+        """
+        Check every file of a review against the built-in style rules
+        
+        Runs in-process on the shared contexts: line length (E501), naming
+        (N801-N806), unused imports (F401), bare excepts (E722) and mutable
+        default arguments (B006).
+        
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+        
+        Returns:
+            List[str]: 'file:line:column: CODE message' suggestions, in file order
+        """
+        return [
+            suggestion
+            for suggestions in self.check_code_style_by_file(generated_code).values()
+            for suggestion in suggestions
+        ]
+
+    def check_code_style_by_file(self, generated_code: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Check every file of a review, keeping each file's suggestions apart
+        
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+        
+        Returns:
+            Dict[str, List[str]]: check_code_style suggestions per file, in file order
+        """
+        return {
+            filename: [
+                f"{filename}:{finding['line']}:{finding['column'] + 1}: {finding['code']} {finding['message']}"
+                for finding in self.style_findings(code, filename)
+            ]
+            for filename, code in generated_code.items()
+        }
+
+    def style_findings(self, code: str, filename: str = '') -> List[Dict[str, Any]]:
+        """
+        Locate style rule violations in a snippet
+        
+        Args:
+            code (str): Source code to check
+            filename (str): File name, used to allow re-exports in __init__.py
+        
+        Returns:
+            List of findings with line, column, code and message
+        """
+        return self.style_checker.check(self.get_context(code), filename)
+
     def security_vulnerability_scan(self, code: str) -> Dict[str, List[str]]:
         """
         Perform security vulnerability scanning
@@ -107,19 +216,36 @@ class CodeAnalysisEngine:
         Returns:
             Dict of security vulnerability categories and findings
         """
-        vulnerabilities = {
-            'input_validation': [],
-            'potential_injection_risks': [],
-            'authentication_issues': []
-        }
+        vulnerabilities = {category: [] for category in self.security_scanner.categories}
+        matched_rules = {finding['rule'] for finding in self.security_findings(code)}
 
-        if re.search(r'input\(', code) or re.search(r'eval\(', code):
-            vulnerabilities['input_validation'].append('Potential unsafe input handling')
+        for rule in self.security_scanner.rules:
+            messages = vulnerabilities[rule['category']]
+            if rule['id'] in matched_rules and rule['message'] not in messages:
+                messages.append(rule['message'])
+        
+        return vulnerabilities
 
-        if re.search(r'execute.*sql', code, re.IGNORECASE):
-            vulnerabilities['potential_injection_risks'].append('Potential SQL injection risk')
+    def security_findings(self, code: str) -> List[Dict[str, Any]]:
+        """
+        Locate security rule matches in a snippet
+        
+        Args:
+            code (str): Source code to scan
+        
+        Returns:
+            List of findings with rule, category, severity, message, line and column
+        """
+        return list(self.security_scanner.iter_findings(self.get_context(code).lines))
 
-        if re.search(r'password.*=.*plain', code, re.IGNORECASE):
-            vulnerabilities['authentication_issues'].append('Potential plaintext password storage')
+    def iter_security_findings(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream security findings from a large input, one line at a time
         
-        return vulnerabilities
+        Args:
+            lines (Iterable[str]): Source lines, e.g. an open file
+        
+        Returns:
+            Iterator over findings, as in security_findings
+        """
+        return self.security_scanner.iter_findings(lines)
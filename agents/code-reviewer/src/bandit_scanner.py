@@ -0,0 +1,80 @@
+import io
+import logging
+import threading
+from typing import Dict, List
+from bandit.core import config as bandit_config
+from bandit.core import manager as bandit_manager
+from bandit.core import meta_ast as bandit_meta_ast
+from bandit.core import metrics as bandit_metrics
+
+
+class BatchedBanditScanner:
+    """
+    Run Bandit over many in-memory snippets with one long-lived manager
+
+    Config, profile and plugin loading happen once per scanner rather than
+    once per snippet; only the per-run result state is reset between scans.
+    """
+
+    def __init__(self, profile: Dict = None):
+        self.profile = profile
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._manager = None
+        self._lock = threading.Lock()
+
+    def scan(self, snippets: Dict[str, str]) -> List[Dict]:
+        """
+        Scan snippets in a single Bandit run
+
+        Args:
+            snippets (Dict[str, str]): Filename to source mapping
+
+        Returns:
+            List[Dict]: Issues as {'file', 'issue', 'severity'}, in file order
+        """
+        # Bandit derives a module name from the file path and warns when it
+        # has no directory part; a './' prefix gives snippets a resolvable one
+        filenames_by_path = {f"./{filename}": filename for filename in snippets}
+
+        with self._lock:
+            manager = self._get_manager()
+            self._reset(manager, list(filenames_by_path))
+
+            for path, filename in filenames_by_path.items():
+                snippet = snippets[filename]
+                manager._parse_file(path, io.BytesIO(snippet.encode('utf-8')), manager.files_list)
+
+            for path, reason in manager.skipped:
+                self.logger.debug(f"Bandit skipped {filenames_by_path[path]}: {reason}")
+
+            issues_by_file: Dict[str, List] = {}
+            for issue in manager.get_issue_list():
+                issues_by_file.setdefault(filenames_by_path[issue.fname], []).append(issue)
+
+        return [
+            {
+                'file': filename,
+                'issue': issue.text,
+                'severity': issue.severity
+            }
+            for filename in snippets
+            for issue in issues_by_file.get(filename, [])
+        ]
+
+    def _get_manager(self) -> bandit_manager.BanditManager:
+        if self._manager is None:
+            self._manager = bandit_manager.BanditManager(
+                bandit_config.BanditConfig(),
+                'file',
+                quiet=True,
+                profile=self.profile
+            )
+        return self._manager
+
+    def _reset(self, manager: bandit_manager.BanditManager, filenames: List[str]) -> None:
+        manager.files_list = filenames
+        manager.results = []
+        manager.scores = []
+        manager.skipped = []
+        manager.metrics = bandit_metrics.Metrics()
+        manager.b_ma = bandit_meta_ast.BanditMetaAst()
@@ -0,0 +1,72 @@
+import math
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+_worker_agent = None
+
+
+def _init_review_worker(agent_class: type = None) -> None:
+    """Build one serial review agent per worker process."""
+    global _worker_agent
+    if agent_class is None:
+        from reviewer import CodeReviewAgent
+        agent_class = CodeReviewAgent
+    _worker_agent = agent_class()
+
+
+def review_in_worker(code: Dict, previous_review: Dict = None, incremental: bool = False) -> Dict:
+    """Run a whole review inside a worker process, e.g. one of areview_code's process pool."""
+    if _worker_agent is None:
+        _init_review_worker()
+    return _worker_agent.review_code(code, previous_review=previous_review, incremental=incremental)
+
+
+def _review_chunk(files: List[Tuple[str, str]]) -> List[Tuple[List[Dict], Dict, List[str]]]:
+    """Review a chunk of (filename, snippet) pairs inside a worker process."""
+    return [_worker_agent.review_file(filename, snippet) for filename, snippet in files]
+
+
+class ParallelReviewRunner:
+    def __init__(self, max_workers: int, chunk_size: int = None, agent_class: type = None):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        # Sent to workers by reference, so a module-level agent subclass keeps
+        # its overrides under spawn as well as fork
+        self.agent_class = agent_class
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._executor = None
+
+    def review_files(self, generated_code: Dict[str, str]) -> List[Tuple[List[Dict], Dict, List[str]]]:
+        """
+        Review files across the process pool
+
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+
+        Returns:
+            List[Tuple]: (security, performance, style) per file, in input order
+        """
+        files = list(generated_code.items())
+        chunk_size = self.chunk_size or max(1, math.ceil(len(files) / (self.max_workers * 4)))
+        chunks = [files[start:start + chunk_size] for start in range(0, len(files), chunk_size)]
+
+        results = []
+        for chunk_result in self._get_executor().map(_review_chunk, chunks):
+            results.extend(chunk_result)
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Worker start-up (imports, Bandit profiles) is paid once and reused across reviews
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_review_worker,
+                initargs=(self.agent_class,)
+            )
+        return self._executor
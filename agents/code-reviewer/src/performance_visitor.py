@@ -0,0 +1,471 @@
+import ast
+from typing import Dict, List, Optional, Set, Tuple
+
+# Calls that iterate their single argument, so the loop walks that collection
+ITERATION_WRAPPERS = ('enumerate', 'reversed', 'sorted', 'list', 'tuple', 'iter')
+MUTATING_METHODS = frozenset((
+    'append', 'extend', 'insert', 'pop', 'remove', 'clear', 'add', 'discard',
+    'update', 'popitem', 'setdefault', 'sort', 'reverse',
+))
+MEMOIZING_DECORATORS = ('cache', 'lru_cache', 'cached', 'memoize', 'memoized')
+COMPOUND_STATEMENTS = (
+    ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.If, ast.For, ast.AsyncFor,
+    ast.While, ast.With, ast.AsyncWith, ast.Try,
+) + ((ast.Match,) if hasattr(ast, 'Match') else ())
+
+
+def dotted_name(node: ast.AST) -> Optional[str]:
+    """Render a Name or Attribute chain as 'a.b.c'; None for anything else."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def iteration_key(node: ast.AST) -> Optional[str]:
+    """
+    Name the collection a loop walks, seeing through range(len(x)),
+    enumerate(x), x.items() and similar wrappers
+    """
+    while isinstance(node, ast.Call) and len(node.args) <= 1:
+        func = node.func
+        if isinstance(func, ast.Name) and func.id == 'range' and node.args:
+            argument = node.args[0]
+            if not (isinstance(argument, ast.Call) and isinstance(argument.func, ast.Name) and argument.func.id == 'len'):
+                return None
+            node = argument.args[0] if argument.args else None
+        elif isinstance(func, ast.Name) and func.id in ITERATION_WRAPPERS and node.args:
+            node = node.args[0]
+        elif isinstance(func, ast.Attribute) and func.attr in ('items', 'keys', 'values') and not node.args:
+            node = func.value
+        else:
+            return None
+    return dotted_name(node)
+
+
+def format_complexity(degree: int, logarithmic: bool = False) -> str:
+    """Big-O string for n^degree, times log n when logarithmic."""
+    log = 'log n'
+    if degree == 0:
+        return f"O({log})" if logarithmic else 'O(1)'
+    power = 'n' if degree == 1 else f"n^{degree}"
+    return f"O({power} {log})" if logarithmic else f"O({power})"
+
+
+def _is_constant_iterable(node: ast.AST) -> bool:
+    if isinstance(node, ast.Constant):
+        return True
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return all(isinstance(element, ast.Constant) for element in node.elts)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range':
+        return all(isinstance(argument, ast.Constant) for argument in node.args)
+    return False
+
+
+def _value_kind(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, (ast.List, ast.ListComp)):
+        return 'list'
+    if isinstance(node, ast.JoinedStr) or (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+        return 'str'
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ('list', 'str'):
+        return node.func.id
+    return None
+
+
+def _annotation_kind(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    name = dotted_name(node) if node is not None else None
+    if name is None:
+        return None
+    name = name.rsplit('.', 1)[-1]
+    if name in ('list', 'List'):
+        return 'list'
+    return 'str' if name == 'str' else None
+
+
+def _bound_names(target: ast.AST) -> List[str]:
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [name for element in target.elts for name in _bound_names(element)]
+    if isinstance(target, ast.Starred):
+        return _bound_names(target.value)
+    name = dotted_name(target)
+    return [name] if name is not None else []
+
+
+class _Loop:
+    __slots__ = ('key', 'counted', 'targets', 'changed', 'candidates')
+
+    def __init__(self, key: Optional[str], counted: bool):
+        self.key = key
+        self.counted = counted
+        self.targets: Set[str] = set()
+        self.changed: Set[str] = set()
+        # (rule, subject) -> (node, subject, message); reported at loop exit
+        # unless the subject was rebound or mutated inside the loop
+        self.candidates: Dict[Tuple[str, str], Tuple[ast.AST, str, str]] = {}
+
+
+class _Frame:
+    __slots__ = (
+        'name', 'qualname', 'node', 'method', 'memoized', 'loops', 'loop_keys', 'depth',
+        'max_depth', 'max_cost', 'list_names', 'str_names', 'recursive_calls',
+        'chained_recursion', 'branching_recursion', 'conditional',
+    )
+
+    def __init__(self, name: str, qualname: str, node: ast.AST, method: bool = False, memoized: bool = False):
+        self.name = name
+        self.qualname = qualname
+        self.node = node
+        self.method = method
+        self.memoized = memoized
+        self.loops: List[_Loop] = []
+        self.loop_keys: Dict[str, int] = {}
+        self.depth = 0
+        self.max_depth = 0
+        self.max_cost = (0, False)
+        self.list_names: Set[str] = set()
+        self.str_names: Set[str] = set()
+        self.recursive_calls = 0
+        self.chained_recursion = False
+        self.branching_recursion = False
+        self.conditional = False
+
+    def recurse(self) -> None:
+        self.recursive_calls += 1
+        # Outside any loop each call goes one level deeper; inside a loop the
+        # calls fan out over the loop's items, like a tree traversal
+        if not self.loops:
+            self.chained_recursion = True
+
+    def cost(self, degree: int, logarithmic: bool = False) -> None:
+        if (degree, logarithmic) > self.max_cost:
+            self.max_cost = (degree, logarithmic)
+
+    def bind(self, name: str, kind: Optional[str]) -> None:
+        self.list_names.discard(name)
+        self.str_names.discard(name)
+        if kind == 'list':
+            self.list_names.add(name)
+        elif kind == 'str':
+            self.str_names.add(name)
+
+
+class PerformanceVisitor(ast.NodeVisitor):
+    """
+    Estimate per-function time complexity and flag slow patterns in one traversal
+
+    Complexity is the deepest nesting of loops over non-constant iterables,
+    one deeper where a loop body does O(n) work itself (list membership,
+    string concatenation), with sorting adding a log factor. A function that
+    calls itself outside a loop adds one more factor, or is O(2^n) when one
+    statement makes several unmemoized self-calls. Function records and issues are kept in
+    source order of function end and detection respectively.
+    """
+
+    def __init__(self):
+        self.functions: List[Dict] = []
+        self.issues: List[Dict] = []
+        self._frame = _Frame('<module>', '<module>', None)
+        self._scopes: List[str] = []
+        self._in_class_body = False
+
+    def visit(self, node: ast.AST):
+        if isinstance(node, ast.stmt) and not isinstance(node, COMPOUND_STATEMENTS):
+            frame = self._frame
+            before = frame.recursive_calls
+            super().visit(node)
+            if frame.recursive_calls - before > 1:
+                frame.branching_recursion = True
+            return None
+        return super().visit(node)
+
+    def visit_Module(self, node: ast.Module):
+        self._frame.node = node
+        self.generic_visit(node)
+        self._finish_frame(self._frame)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        in_class_body = self._in_class_body
+        self._scopes.append(node.name)
+        self._in_class_body = True
+        for statement in node.body:
+            self.visit(statement)
+        self._in_class_body = in_class_body
+        self._scopes.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        # Decorators and defaults run in the enclosing scope, at definition time
+        for child in node.decorator_list:
+            self.visit(child)
+        for default in node.args.defaults + [default for default in node.args.kw_defaults if default is not None]:
+            self.visit(default)
+
+        memoized = any(
+            (dotted_name(decorator.func if isinstance(decorator, ast.Call) else decorator) or '').rsplit('.', 1)[-1]
+            in MEMOIZING_DECORATORS
+            for decorator in node.decorator_list
+        )
+        frame = _Frame(node.name, '.'.join(self._scopes + [node.name]), node, self._in_class_body, memoized)
+        arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+        for argument in arguments:
+            frame.bind(argument.arg, _annotation_kind(argument.annotation))
+
+        enclosing, in_class_body = self._frame, self._in_class_body
+        self._frame, self._in_class_body = frame, False
+        self._scopes.append(node.name)
+        for statement in node.body:
+            self.visit(statement)
+        self._scopes.pop()
+        self._frame, self._in_class_body = enclosing, in_class_body
+        self._finish_frame(frame)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_For(self, node: ast.For):
+        self.visit(node.iter)
+        self._enter_loop(node.iter, node.target)
+        self.visit(node.target)
+        for statement in node.body:
+            self.visit(statement)
+        self._exit_loop()
+        for statement in node.orelse:
+            self.visit(statement)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node: ast.While):
+        # The test is re-evaluated on every iteration, so it belongs inside the loop
+        self._enter_loop(None, None)
+        self.visit(node.test)
+        for statement in node.body:
+            self.visit(statement)
+        self._exit_loop()
+        for statement in node.orelse:
+            self.visit(statement)
+
+    def _visit_comprehension(self, node: ast.AST, elements: List[ast.AST]):
+        for generator in node.generators:
+            self.visit(generator.iter)
+            self._enter_loop(generator.iter, generator.target)
+            self.visit(generator.target)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in elements:
+            self.visit(element)
+        for _ in node.generators:
+            self._exit_loop()
+
+    def visit_ListComp(self, node: ast.ListComp):
+        self._visit_comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node: ast.DictComp):
+        self._visit_comprehension(node, [node.key, node.value])
+
+    def _visit_conditional(self, node: ast.AST):
+        self._frame.conditional = True
+        self.generic_visit(node)
+
+    visit_If = visit_IfExp = visit_BoolOp = visit_Try = visit_Match = _visit_conditional
+
+    def visit_Assign(self, node: ast.Assign):
+        self.visit(node.value)
+        kind = _value_kind(node.value)
+        for target in node.targets:
+            self.visit(target)
+            self._rebind(target, kind)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+        self._rebind(node.target, _annotation_kind(node.annotation) or _value_kind(node.value))
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        self.visit(node.value)
+        self._rebind(node.target, _value_kind(node.value))
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.visit(node.value)
+        self.visit(node.target)
+        frame = self._frame
+        name = dotted_name(node.target)
+        if isinstance(node.target, ast.Subscript):
+            self._changed(dotted_name(node.target.value))
+        if name is None:
+            return
+        self._changed(name)
+        concatenates_string = isinstance(node.op, ast.Add) and (
+            name in frame.str_names or _value_kind(node.value) == 'str'
+        )
+        if concatenates_string:
+            frame.str_names.add(name)
+            frame.cost(frame.depth + 1)
+            if frame.loops:
+                self._report(
+                    node, 'string_concatenation', 'medium',
+                    f"String '{name}' is built with += inside a loop; collect the parts in a list and ''.join() them"
+                )
+
+    def visit_Delete(self, node: ast.Delete):
+        for target in node.targets:
+            self._rebind(target, None)
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare):
+        frame = self._frame
+        for operator, comparator in zip(node.ops, node.comparators):
+            if isinstance(operator, (ast.In, ast.NotIn)) and self._is_list(comparator):
+                frame.cost(frame.depth + 1)
+                if frame.loops:
+                    self._report(
+                        node, 'list_membership', 'medium',
+                        f"Membership test on list '{ast.unparse(comparator)}' inside a loop is O(n) per "
+                        f"check; build a set once before the loop"
+                    )
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        frame = self._frame
+        func = node.func
+        if isinstance(func, ast.Name):
+            if func.id == 'sorted':
+                frame.cost(frame.depth + 1, True)
+            elif func.id == 'len' and len(node.args) == 1 and frame.loops:
+                subject = dotted_name(node.args[0])
+                if subject is not None:
+                    self._candidate(
+                        node, 'repeated_len', subject,
+                        f"len({subject}) is recomputed on every iteration; hoist it out of the loop"
+                    )
+            if func.id == frame.name and not frame.method:
+                frame.recurse()
+        elif isinstance(func, ast.Attribute):
+            receiver = dotted_name(func.value)
+            if func.attr == 'sort':
+                frame.cost(frame.depth + 1, True)
+            if func.attr in MUTATING_METHODS:
+                self._changed(receiver)
+            if frame.method and receiver in ('self', 'cls') and func.attr == frame.name:
+                frame.recurse()
+            if frame.loops and receiver is not None and '.' in receiver:
+                self._candidate(
+                    node, 'repeated_attribute_lookup', receiver,
+                    f"{receiver}.{func.attr} is looked up on every iteration; bind it to a local before the loop"
+                )
+        self.generic_visit(node)
+
+    def _is_list(self, node: ast.AST) -> bool:
+        if isinstance(node, ast.ListComp):
+            return True
+        if isinstance(node, ast.List):
+            # A list of constants is compiled to a tuple constant
+            return not all(isinstance(element, ast.Constant) for element in node.elts)
+        return dotted_name(node) in self._frame.list_names
+
+    def _enter_loop(self, iterable: Optional[ast.AST], target: Optional[ast.AST]):
+        frame = self._frame
+        frame.conditional = True
+        key = iteration_key(iterable) if iterable is not None else None
+        if key is not None and frame.loop_keys.get(key):
+            self._report(
+                target, 'nested_iteration', 'high',
+                f"Nested loop iterates over '{key}' again inside a loop over '{key}' (O(n^2)); "
+                f"index it by key with a dict or set instead"
+            )
+        counted = iterable is None or not _is_constant_iterable(iterable)
+        loop = _Loop(key, counted)
+        if target is not None:
+            loop.targets.update(_bound_names(target))
+        frame.loops.append(loop)
+        if key is not None:
+            frame.loop_keys[key] = frame.loop_keys.get(key, 0) + 1
+        if counted:
+            frame.depth += 1
+            frame.max_depth = max(frame.max_depth, frame.depth)
+            frame.cost(frame.depth)
+
+    def _exit_loop(self):
+        frame = self._frame
+        loop = frame.loops.pop()
+        if loop.key is not None:
+            frame.loop_keys[loop.key] -= 1
+        if loop.counted:
+            frame.depth -= 1
+        for (rule, _), (node, subject, message) in loop.candidates.items():
+            if not self._varies(subject, loop.changed):
+                self._report(node, rule, 'low', message)
+        if frame.loops:
+            frame.loops[-1].changed.update(loop.changed)
+
+    def _candidate(self, node: ast.AST, rule: str, subject: str, message: str):
+        loop = self._frame.loops[-1]
+        if any(self._varies(subject, active.targets) for active in self._frame.loops):
+            return
+        loop.candidates.setdefault((rule, subject), (node, subject, message))
+
+    def _varies(self, subject: str, names: Set[str]) -> bool:
+        prefix = subject
+        while True:
+            if prefix in names:
+                return True
+            if '.' not in prefix:
+                return False
+            prefix = prefix.rsplit('.', 1)[0]
+
+    def _rebind(self, target: ast.AST, kind: Optional[str]):
+        if isinstance(target, ast.Subscript):
+            self._changed(dotted_name(target.value))
+            return
+        names = _bound_names(target)
+        for name in names:
+            self._frame.bind(name, kind if len(names) == 1 else None)
+            self._changed(name)
+
+    def _changed(self, name: Optional[str]):
+        if name is not None and self._frame.loops:
+            self._frame.loops[-1].changed.add(name)
+
+    def _report(self, node: ast.AST, rule: str, severity: str, message: str, function: str = None):
+        self.issues.append({
+            'rule': rule,
+            'severity': severity,
+            'function': function or self._frame.qualname,
+            'line': node.lineno,
+            'column': node.col_offset,
+            'message': message
+        })
+
+    def _finish_frame(self, frame: _Frame):
+        degree, logarithmic = frame.max_cost
+        if frame.recursive_calls:
+            if not frame.conditional:
+                self._report(
+                    frame.node, 'unbounded_recursion', 'high',
+                    f"{frame.qualname} calls itself with no base case; the recursion never terminates",
+                    frame.qualname
+                )
+            if frame.branching_recursion and not frame.memoized:
+                complexity = 'O(2^n)'
+            else:
+                complexity = format_complexity(degree + frame.chained_recursion, logarithmic)
+        elif frame.qualname == '<module>' and frame.max_cost == (0, False):
+            return
+        else:
+            complexity = format_complexity(degree, logarithmic)
+
+        self.functions.append({
+            'function': frame.qualname,
+            'line': getattr(frame.node, 'lineno', 1),
+            'end_line': getattr(frame.node, 'end_lineno', None),
+            'time_complexity': complexity,
+            'loop_depth': frame.max_depth
+        })
@@ -0,0 +1,339 @@
+"""
+Repository-scale structure and security analysis with streaming JSONL output.
+
+    python agents/code-reviewer/src/repository_scan.py path/to/repo --output scan.jsonl \\
+        --checkpoint scan.checkpoint.json --resume --workers 8
+
+Each output line is one file's record; files over max_file_bytes get a
+record with 'skipped' instead of an analysis. With --resume, files whose
+size and mtime match the checkpoint are skipped and new records are
+appended, so a later record for a path supersedes an earlier one.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import fnmatch
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_INCLUDE = ('*.py',)
+DEFAULT_IGNORE = (
+    '.git', '.hg', '.svn', '.tox', '.venv', 'venv', 'env', 'node_modules',
+    '__pycache__', 'build', 'dist', '*.egg-info', 'site-packages',
+)
+
+_worker_engine = None
+
+
+def _init_scan_worker() -> None:
+    """Build one analysis engine per worker process."""
+    global _worker_engine
+    from analysis_engine import CodeAnalysisEngine
+    # Repository files are seen once, so only the file in hand needs a cached context
+    _worker_engine = CodeAnalysisEngine(context_cache_size=1)
+
+
+def read_source(path: str) -> str:
+    """
+    Read a source file through a memory map
+
+    The mapping is decoded in place, so no intermediate bytes copy of the
+    file is made.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: File contents, with undecodable bytes replaced
+    """
+    with open(path, 'rb') as source_file:
+        if os.fstat(source_file.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return str(view, 'utf-8', 'replace')
+
+
+def drop_partial_line(path: str, block_size: int = 65536) -> None:
+    """
+    Cut a file back to its last newline
+
+    A run killed mid-write leaves half a record at the end of the output;
+    appending after it would join the next record onto that line. Only
+    the tail of the file is read, however large it is.
+
+    Args:
+        path (str): File to repair; a missing file is left alone
+        block_size (int): Bytes read per step backwards from the end
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r+b') as handle:
+        end = handle.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            handle.seek(start)
+            newline = handle.read(position - start).rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            handle.truncate(position)
+
+
+def _scan_file(root: str, entry: Dict) -> Dict:
+    record = dict(entry)
+    try:
+        code = read_source(os.path.join(root, entry['path']))
+        record['lines'] = code.count('\n') + (1 if code and not code.endswith('\n') else 0)
+        record['structure'] = _worker_engine.analyze_code_structure(code)
+        record['security_findings'] = _worker_engine.security_findings(code)
+    except Exception as e:
+        record['error'] = str(e)
+    finally:
+        _worker_engine.contexts.clear()
+    return record
+
+
+def _scan_chunk(root: str, entries: List[Dict]) -> List[Dict]:
+    """Scan a chunk of files inside a worker process."""
+    return [_scan_file(root, entry) for entry in entries]
+
+
+class ScanCheckpoint:
+    """
+    Size and mtime of every file already analyzed into the output
+
+    Saved atomically, and only after the output has been flushed, so the
+    checkpoint never claims a file whose record was lost. Failed and
+    skipped files are left out, so a resumed scan tries them again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.skipped = 0
+
+    def load(self) -> 'ScanCheckpoint':
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as checkpoint_file:
+                self.files = {path: tuple(stat) for path, stat in json.load(checkpoint_file)['files'].items()}
+        return self
+
+    def is_current(self, entry: Dict) -> bool:
+        return self.files.get(entry['path']) == (entry['size'], entry['mtime_ns'])
+
+    def record(self, entry: Dict) -> None:
+        self.files[entry['path']] = (entry['size'], entry['mtime_ns'])
+
+    def save(self) -> None:
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'files': self.files}, checkpoint_file, separators=(',', ':'))
+        os.replace(temporary_path, self.path)
+
+
+class RepositoryScanner:
+    def __init__(
+        self,
+        max_workers: int = None,
+        chunk_size: int = 64,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        ignore: Sequence[str] = DEFAULT_IGNORE,
+        max_file_bytes: int = 2 * 1024 * 1024
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.include = tuple(include)
+        self.ignore = tuple(ignore)
+        self.max_file_bytes = max_file_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def iter_files(self, root: str) -> Iterator[Dict]:
+        """
+        Walk a directory tree lazily, pruning ignored directories
+
+        Ignore and include globs match either the path relative to root
+        or the bare file/directory name.
+
+        Args:
+            root (str): Repository root
+
+        Returns:
+            Iterator[Dict]: {'path', 'size', 'mtime_ns'} per matching file, path relative to root
+        """
+        pending = ['']
+        while pending:
+            relative_dir = pending.pop()
+            try:
+                with os.scandir(os.path.join(root, relative_dir)) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                self.logger.warning(f"Cannot read directory {relative_dir or root}: {e}")
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if self._matches(relative_path, entry.name, self.ignore):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(relative_path)
+                elif entry.is_file(follow_symlinks=False) and self._matches(relative_path, entry.name, self.include):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield {'path': relative_path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            pending.extend(reversed(subdirectories))
+
+    def scan(self, root: str, checkpoint: ScanCheckpoint = None) -> Iterator[Dict]:
+        """
+        Analyze every matching file under root, yielding records as they complete
+
+        Files are sent to the process pool in chunks, with at most two
+        chunks per worker in flight, so memory stays flat however large
+        the repository is. Files over max_file_bytes are not read; their
+        records carry 'skipped' with the reason.
+
+        Args:
+            root (str): Repository root
+            checkpoint (ScanCheckpoint, optional): Files to skip when unchanged
+
+        Returns:
+            Iterator[Dict]: Per-file records with path, size, mtime_ns, lines,
+            structure and security_findings (or error, or skipped), in completion order
+        """
+        oversized: List[Dict] = []
+        chunks = self._chunks(root, checkpoint, oversized)
+        if self.max_workers == 1:
+            _init_scan_worker()
+            for chunk in chunks:
+                yield from oversized
+                oversized.clear()
+                yield from _scan_chunk(root, chunk)
+            yield from oversized
+            return
+
+        executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_scan_worker)
+        in_flight = set()
+        try:
+            for chunk in chunks:
+                yield from oversized
+                oversized.clear()
+                in_flight.add(executor.submit(_scan_chunk, root, chunk))
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            yield from oversized
+            for future in in_flight:
+                yield from future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def scan_to_jsonl(
+        self,
+        root: str,
+        output_path: str,
+        checkpoint_path: str = None,
+        resume: bool = False,
+        checkpoint_interval: int = 500
+    ) -> Dict[str, int]:
+        """
+        Scan a repository, streaming one JSON line per file to output_path
+
+        Args:
+            root (str): Repository root
+            output_path (str): JSONL output file
+            checkpoint_path (str, optional): Checkpoint file to update as files complete
+            resume (bool): Append to the output, skipping files unchanged since the checkpoint
+            checkpoint_interval (int): Files between checkpoint saves
+
+        Returns:
+            Dict[str, int]: scanned, failed, oversized and skipped (unchanged) file
+            counts, and elapsed seconds
+        """
+        checkpoint = ScanCheckpoint(checkpoint_path) if checkpoint_path else None
+        if checkpoint is not None and resume:
+            checkpoint.load()
+
+        started = time.perf_counter()
+        summary = {'scanned': 0, 'failed': 0, 'oversized': 0}
+        written = 0
+        if resume:
+            drop_partial_line(output_path)
+        with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output:
+            for record in self.scan(root, checkpoint if resume else None):
+                output.write(json.dumps(record, separators=(',', ':')) + '\n')
+                written += 1
+                if 'error' in record:
+                    summary['failed'] += 1
+                elif 'skipped' in record:
+                    summary['oversized'] += 1
+                else:
+                    summary['scanned'] += 1
+                    if checkpoint is not None:
+                        checkpoint.record(record)
+                if checkpoint is not None and written % checkpoint_interval == 0:
+                    output.flush()
+                    checkpoint.save()
+            output.flush()
+        if checkpoint is not None:
+            checkpoint.save()
+
+        summary['skipped'] = checkpoint.skipped if checkpoint is not None and resume else 0
+        summary['elapsed_s'] = time.perf_counter() - started
+        self.logger.info(
+            f"Scanned {summary['scanned']} files ({summary['failed']} failed, {summary['oversized']} too large, "
+            f"{summary['skipped']} unchanged) in {summary['elapsed_s']:.1f}s"
+        )
+        return summary
+
+    def _chunks(self, root: str, checkpoint: Optional[ScanCheckpoint], oversized: List[Dict]) -> Iterator[List[Dict]]:
+        chunk = []
+        for entry in self.iter_files(root):
+            if checkpoint is not None and checkpoint.is_current(entry):
+                checkpoint.skipped += 1
+                continue
+            if entry['size'] > self.max_file_bytes:
+                self.logger.info(f"Skipping {entry['path']}: {entry['size']} bytes exceeds max_file_bytes")
+                oversized.append(dict(entry, skipped=f"{entry['size']} bytes exceeds max_file_bytes ({self.max_file_bytes})"))
+                continue
+            chunk.append(entry)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _matches(self, relative_path: str, name: str, patterns: Iterable[str]) -> bool:
+        return any(fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Scan a repository with the code analysis engine')
+    parser.add_argument('root', help='Repository root')
+    parser.add_argument('--output', required=True, help='JSONL output file')
+    parser.add_argument('--checkpoint', help='Checkpoint file for resumable scans')
+    parser.add_argument('--resume', action='store_true', help='Skip files unchanged since the checkpoint')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--include', nargs='+', default=list(DEFAULT_INCLUDE), help='File globs to scan')
+    parser.add_argument('--ignore', nargs='+', default=[], help='Extra globs to ignore')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    scanner = RepositoryScanner(
+        max_workers=args.workers,
+        include=args.include,
+        ignore=DEFAULT_IGNORE + tuple(args.ignore)
+    )
+    scanner.scan_to_jsonl(args.root, args.output, args.checkpoint, args.resume)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Tuple
+
+_POLYNOMIAL = re.compile(r'^O\(n\^(\d+)( log n)?\)$')
+_COMPLEXITY_RANKS = {
+    'O(1)': 0,
+    'O(log n)': 1,
+    'O(n)': 2,
+    'O(n log n)': 3,
+    'O(2^n)': 1000,
+}
+
+
+def complexity_rank(complexity: str) -> int:
+    """
+    Order big-O strings from cheapest to most expensive
+
+    Args:
+        complexity (str): Big-O notation such as 'O(n)', 'O(n^2)' or 'O(n^2 log n)'
+
+    Returns:
+        int: Sort rank; unrecognised strings rank lowest
+    """
+    if complexity in _COMPLEXITY_RANKS:
+        return _COMPLEXITY_RANKS[complexity]
+    match = _POLYNOMIAL.match(complexity or '')
+    if match:
+        return 2 * int(match.group(1)) + bool(match.group(2))
+    return -1
+
+
+def worst_complexity(complexities: List[str], default: str = 'O(1)') -> str:
+    """
+    Pick the most expensive of several big-O strings
+
+    Args:
+        complexities (List[str]): Candidate complexities
+        default (str): Returned when there are no candidates
+
+    Returns:
+        str: The highest-ranked complexity
+    """
+    candidates = [complexity for complexity in complexities if complexity]
+    return max(candidates, key=complexity_rank) if candidates else default
+
+
+def merge_performance_reports(reports: List[Dict]) -> Dict:
+    """
+    Combine per-file performance reports into one review-level report
+
+    Lists are concatenated in file order, nested dicts are merged,
+    '*_complexity' keys keep the worst value and other scalars keep
+    the first value seen.
+
+    Args:
+        reports (List[Dict]): Performance reports, one per file
+
+    Returns:
+        Dict: Merged performance report
+    """
+    merged: Dict = {}
+    for report in reports:
+        for key, value in (report or {}).items():
+            if key.endswith('_complexity'):
+                merged[key] = worst_complexity([merged.get(key), value])
+            elif isinstance(value, list):
+                merged[key] = merged.get(key, []) + value
+            elif isinstance(value, dict):
+                merged[key] = {**merged.get(key, {}), **value}
+            else:
+                merged.setdefault(key, value)
+    return merged
+
+
+def merge_file_reviews(file_reviews: List[Tuple[List[Dict], Dict, List[str]]]) -> Tuple[List[Dict], Dict, List[str]]:
+    """
+    Merge per-file (security, performance, style) results in file order
+
+    Args:
+        file_reviews (List[Tuple]): One (security, performance, style) triple per file
+
+    Returns:
+        Tuple: Combined security issues, performance report and style suggestions
+    """
+    security_issues: List[Dict] = []
+    style_suggestions: List[str] = []
+    performance_reports: List[Dict] = []
+    for security, performance, style in file_reviews:
+        security_issues.extend(security)
+        performance_reports.append(performance)
+        style_suggestions.extend(style)
+    return security_issues, merge_performance_reports(performance_reports), style_suggestions
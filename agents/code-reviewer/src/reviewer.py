@@ -1,33 +1,79 @@
-import os
+import asyncio
 import logging
-from typing import Dict, List
+import functools
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from analysis_engine import CodeAnalysisEngine
+from analysis_context import content_hash
+from bandit_scanner import BatchedBanditScanner
+from parallel_review import ParallelReviewRunner, review_in_worker
+from review_merge import merge_file_reviews, complexity_rank, worst_complexity
+from instrumentation import traced
 from dotenv import load_dotenv
-import openai
-import bandit
 
 load_dotenv()
 
+def _file_count(agent, code: Dict) -> Dict:
+    return {'files': len(code.get('generated_code', {}))}
+
 class CodeReviewAgent:
-    def __init__(self):
-        openai.api_key = os.getenv('OPENAI_API_KEY')
+    def __init__(
+        self,
+        max_workers: int = 1,
+        chunk_size: int = None,
+        parallel_threshold: int = 8,
+        executor: Executor = None
+    ):
         self.analysis_engine = CodeAnalysisEngine()
+        self.security_scanner = BatchedBanditScanner()
         self.logger = logging.getLogger(__name__)
+        self.parallel_threshold = parallel_threshold
+        self.parallel_runner = (
+            ParallelReviewRunner(max_workers=max_workers, chunk_size=chunk_size, agent_class=type(self))
+            if max_workers > 1 else None
+        )
+        # Runs areview_code's analysis; None uses the event loop's default executor
+        self.executor = executor
 
-    def review_code(self, code: Dict) -> Dict:
+    @traced()
+    def review_code(self, code: Dict, previous_review: Dict = None, incremental: bool = False) -> Dict:
         """
         Comprehensive code review process
+
+        With max_workers > 1, reviews of at least parallel_threshold files
+        are spread across a process pool; smaller reviews run serially.
+
+        In incremental mode (or whenever previous_review is given) the result
+        also carries per-file 'file_reviews' with content hashes. Passing that
+        result back as previous_review on the next cycle re-analyzes only the
+        files whose content changed.
         
         Args:
             code (Dict): Generated code to review
+            previous_review (Dict, optional): Previous cycle's review result
+            incremental (bool): Record per-file results for later cycles
         
         Returns:
             Dict: Detailed code review results
         """
         try:
-            security_analysis = self._run_security_checks(code)
-            performance_analysis = self._evaluate_performance(code)
-            style_analysis = self._check_code_style(code)
+            generated_code = code.get('generated_code', {})
+            file_reviews = None
+            if incremental or previous_review is not None:
+                file_reviews = self._review_incrementally(generated_code, previous_review or {})
+                security_analysis, performance_analysis, style_analysis = merge_file_reviews([
+                    (review['security_issues'], review['performance'], review['style_suggestions'])
+                    for review in file_reviews.values()
+                ])
+            elif self.parallel_runner is not None and len(generated_code) >= self.parallel_threshold:
+                security_analysis, performance_analysis, style_analysis = merge_file_reviews(
+                    self.parallel_runner.review_files(generated_code)
+                )
+            else:
+                security_analysis = self._run_security_checks(code)
+                performance_analysis = self._evaluate_performance(code)
+                style_analysis = self._check_code_style(code)
             
             review_result = {
                 'task_id': code.get('task_id'),
@@ -41,6 +87,8 @@ class CodeReviewAgent:
                 'performance_recommendations': performance_analysis,
                 'style_suggestions': style_analysis
             }
+            if file_reviews is not None:
+                review_result['file_reviews'] = file_reviews
             
             return review_result
         except Exception as e:
@@ -50,9 +98,158 @@ class CodeReviewAgent:
                 'error': str(e)
             }
 
+    @traced()
+    async def areview_code(
+        self,
+        code: Dict,
+        previous_review: Dict = None,
+        incremental: bool = False,
+        timeout: float = None
+    ) -> Dict:
+        """
+        Review code from a coroutine without blocking the event loop
+
+        The analysis is CPU-bound, so review_code runs on the agent's
+        executor. A process pool gets a picklable job that reviews with a
+        per-process agent, which takes the analysis off the GIL. A timeout
+        or cancellation stops waiting for the review; an analysis already
+        running finishes in the background.
+        
+        Args:
+            code (Dict): Generated code to review
+            previous_review (Dict, optional): Previous cycle's review result
+            incremental (bool): Record per-file results for later cycles
+            timeout (float, optional): Seconds before the review fails with a timeout
+        
+        Returns:
+            Dict: Detailed code review results
+        """
+        if self.executor is None or isinstance(self.executor, ThreadPoolExecutor):
+            # The copied context keeps review spans under the caller's span
+            review = functools.partial(
+                contextvars.copy_context().run, self.review_code, code,
+                previous_review=previous_review, incremental=incremental
+            )
+        else:
+            # Contexts and this agent's pools cannot be pickled
+            review = functools.partial(review_in_worker, code, previous_review, incremental)
+        try:
+            return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(self.executor, review), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Code review timed out after {timeout}s")
+            return {
+                'status': 'REVIEW_FAILED',
+                'error': f"Code review timed out after {timeout}s"
+            }
+        except Exception as e:
+            self.logger.error(f"Code review error: {e}")
+            return {
+                'status': 'REVIEW_FAILED',
+                'error': str(e)
+            }
+
+    def review_file(self, filename: str, snippet: str) -> Tuple[List[Dict], Dict, List[str]]:
+        """
+        Run security, performance and style analysis for a single file
+        
+        Args:
+            filename (str): Name of the file under review
+            snippet (str): File contents
+        
+        Returns:
+            Tuple: Security issues, performance report and style suggestions
+        """
+        single_file = {'generated_code': {filename: snippet}}
+        return (
+            self._run_security_checks(single_file),
+            self._evaluate_performance(single_file),
+            self._check_code_style(single_file)
+        )
+
+    def _review_incrementally(self, generated_code: Dict[str, str], previous_review: Dict) -> Dict[str, Dict]:
+        """
+        Review changed files and reuse stored findings for unchanged ones
+        
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+            previous_review (Dict): Previous review result with 'file_reviews'
+        
+        Returns:
+            Dict[str, Dict]: Per-file review records, in generated_code order
+        """
+        previous_files = previous_review.get('file_reviews', {})
+        hashes = {filename: content_hash(snippet) for filename, snippet in generated_code.items()}
+        changed = {
+            filename: snippet for filename, snippet in generated_code.items()
+            if previous_files.get(filename, {}).get('content_hash') != hashes[filename]
+        }
+        self.logger.info(f"Incremental review: re-analyzing {len(changed)} of {len(generated_code)} files")
+
+        if self.parallel_runner is not None and len(changed) >= self.parallel_threshold:
+            fresh_results = self.parallel_runner.review_files(changed)
+        else:
+            fresh_results = self._review_files(changed)
+        fresh_reviews = dict(zip(changed, fresh_results))
+
+        file_reviews = {}
+        for filename in generated_code:
+            if filename not in fresh_reviews:
+                file_reviews[filename] = previous_files[filename]
+                continue
+            security, performance, style = fresh_reviews[filename]
+            file_reviews[filename] = {
+                'content_hash': hashes[filename],
+                'security_issues': security,
+                'performance': performance,
+                'style_suggestions': style
+            }
+        return file_reviews
+
+    def _review_files(self, generated_code: Dict[str, str]) -> List[Tuple[List[Dict], Dict, List[str]]]:
+        """
+        Review several files with one pass of each analysis, split back per file
+
+        Security runs as a single batched Bandit scan rather than one per file.
+        
+        Args:
+            generated_code (Dict[str, str]): Filename to snippet mapping
+        
+        Returns:
+            List[Tuple]: (security, performance, style) per file, in input order
+        """
+        if not generated_code:
+            return []
+        code = {'generated_code': generated_code}
+        security = self._run_security_checks(code)
+        performance = self._evaluate_performance(code)
+        style = self._check_code_style_by_file(code)
+
+        results = []
+        for filename in generated_code:
+            functions = [record for record in performance['functions'] if record['file'] == filename]
+            results.append((
+                [issue for issue in security if issue.get('file') == filename],
+                {
+                    'time_complexity': worst_complexity([record['time_complexity'] for record in functions]),
+                    'functions': functions,
+                    'issues': [issue for issue in performance['issues'] if issue['file'] == filename],
+                    'parse_errors': [error for error in performance['parse_errors'] if error['file'] == filename]
+                },
+                style.get(filename, [])
+            ))
+        return results
+
+    def close(self) -> None:
+        """Shut down the review process pool, if one was started."""
+        if self.parallel_runner is not None:
+            self.parallel_runner.shutdown()
+
+    @traced(attributes=_file_count)
     def _run_security_checks(self, code: Dict) -> List[Dict]:
         """
         Perform security vulnerability checks
+
+        All snippets are scanned in one batched Bandit run.
         
         Args:
             code (Dict): Code to analyze
@@ -60,19 +257,9 @@ class CodeReviewAgent:
         Returns:
             List[Dict]: Detected security issues
         """
-        issues = []
-        for filename, snippet in code.get('generated_code', {}).items():
-            bandit_results = bandit.run_tests([snippet])
-            issues.extend([
-                {
-                    'file': filename,
-                    'issue': issue.text,
-                    'severity': issue.severity
-                } for issue in bandit_results
-            ])
-        
-        return issues
+        return self.security_scanner.scan(code.get('generated_code', {}))
 
+    @traced(attributes=_file_count)
     def _evaluate_performance(self, code: Dict) -> Dict:
         """
         Analyze code performance characteristics
@@ -87,6 +274,7 @@ class CodeReviewAgent:
             code.get('generated_code', {})
         )
 
+    @traced(attributes=_file_count)
     def _check_code_style(self, code: Dict) -> List[str]:
         """
         Check code against style guidelines
@@ -101,6 +289,21 @@ class CodeReviewAgent:
             code.get('generated_code', {})
         )
 
+    @traced(attributes=_file_count)
+    def _check_code_style_by_file(self, code: Dict) -> Dict[str, List[str]]:
+        """
+        Check code against style guidelines, keeping each file's suggestions apart
+        
+        Args:
+            code (Dict): Code to analyze
+        
+        Returns:
+            Dict[str, List[str]]: Style improvement suggestions per file
+        """
+        return self.analysis_engine.check_code_style_by_file(
+            code.get('generated_code', {})
+        )
+
     def _calculate_quality_score(
         self, 
         security_issues: List[Dict],
@@ -123,6 +326,7 @@ class CodeReviewAgent:
         base_score -= 0.1 * len(security_issues)
         base_score -= 0.05 * len(style_suggestions)
 
-        base_score -= 0.1 if performance.get('time_complexity', 'O(n)') == 'O(n^2)' else 0
+        quadratic_or_worse = complexity_rank(performance.get('time_complexity', 'O(n)')) >= complexity_rank('O(n^2)')
+        base_score -= 0.1 if quadratic_or_worse else 0
         
         return max(0, min(base_score, 1.0))
@@ -0,0 +1,146 @@
+import re
+from typing import Dict, Iterable, Iterator, List
+
+# Each rule matches when its fragments appear in order on a single line,
+# e.g. ('execute', 'sql') is the line-level equivalent of /execute.*sql/.
+# Fragments are literals: that is what keeps the scan linear in the input,
+# with no regex backtracking however long a line gets.
+SECURITY_RULES = [
+    {
+        'id': 'unsafe_input',
+        'category': 'input_validation',
+        'fragments': ('input(',),
+        'severity': 'MEDIUM',
+        'message': 'Potential unsafe input handling'
+    },
+    {
+        'id': 'unsafe_eval',
+        'category': 'input_validation',
+        'fragments': ('eval(',),
+        'severity': 'HIGH',
+        'message': 'Potential unsafe input handling'
+    },
+    {
+        'id': 'sql_injection',
+        'category': 'potential_injection_risks',
+        'fragments': ('execute', 'sql'),
+        'ignore_case': True,
+        'severity': 'HIGH',
+        'message': 'Potential SQL injection risk'
+    },
+    {
+        'id': 'plaintext_password',
+        'category': 'authentication_issues',
+        'fragments': ('password', '=', 'plain'),
+        'ignore_case': True,
+        'severity': 'MEDIUM',
+        'message': 'Potential plaintext password storage'
+    },
+]
+
+
+class SecurityRuleScanner:
+    """
+    Scan code for every rule in a rule table in a single pass
+
+    All fragments of all rules are compiled into one combined matcher;
+    adding rules adds alternatives to that matcher, not passes over the code.
+    """
+
+    def __init__(self, rules: List[Dict] = None):
+        self.rules = rules if rules is not None else SECURITY_RULES
+        self.categories = list(dict.fromkeys(rule['category'] for rule in self.rules))
+        self._compile()
+
+    def scan(self, code: str) -> List[Dict]:
+        """
+        Scan source text
+
+        Args:
+            code (str): Source code
+
+        Returns:
+            List[Dict]: Findings, see iter_findings
+        """
+        return list(self.iter_findings(code.splitlines()))
+
+    def iter_findings(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """
+        Stream findings from an iterable of lines, such as an open file
+
+        Each rule is reported at most once per line.
+
+        Args:
+            lines (Iterable[str]): Source lines
+
+        Yields:
+            Dict: Finding with rule id, category, severity, message,
+                  line (1-based) and column (0-based, like ast col_offset)
+        """
+        for line_number, line in enumerate(lines, start=1):
+            for rule_index, column in self._scan_line(line):
+                rule = self.rules[rule_index]
+                yield {
+                    'rule': rule['id'],
+                    'category': rule['category'],
+                    'severity': rule['severity'],
+                    'message': rule['message'],
+                    'line': line_number,
+                    'column': column
+                }
+
+    def _compile(self) -> None:
+        fragment_keys = {}
+        self._fragments = []
+        self._fragment_rules: List[List[tuple]] = []
+        for rule_index, rule in enumerate(self.rules):
+            ignore_case = rule.get('ignore_case', False)
+            for position, fragment in enumerate(rule['fragments']):
+                key = (fragment.lower() if ignore_case else fragment, ignore_case)
+                if key not in fragment_keys:
+                    fragment_keys[key] = len(self._fragments)
+                    self._fragments.append(key)
+                    self._fragment_rules.append([])
+                self._fragment_rules[fragment_keys[key]].append((rule_index, position))
+
+        alternatives = []
+        self._fragment_patterns = []
+        for index, (fragment, ignore_case) in enumerate(self._fragments):
+            pattern = f"(?i:{re.escape(fragment)})" if ignore_case else re.escape(fragment)
+            alternatives.append(f"(?P<f{index}>{pattern})")
+            self._fragment_patterns.append(re.compile(pattern))
+
+        # Zero-width lookahead so overlapping fragments are all seen
+        self._matcher = re.compile(f"(?=(?:{'|'.join(alternatives)}))")
+        self._group_index = {f"f{index}": index for index in range(len(self._fragments))}
+
+        # Fragments that could also start wherever another one matched
+        self._same_start = {}
+        for index, (fragment, _) in enumerate(self._fragments):
+            self._same_start.setdefault(fragment[0].lower(), []).append(index)
+
+    def _scan_line(self, line: str) -> List[tuple]:
+        """Return (rule_index, column) for each rule whose fragments occur in order."""
+        next_fragment = [0] * len(self.rules)
+        next_start = [0] * len(self.rules)
+        first_column = [0] * len(self.rules)
+        matched = []
+
+        for match in self._matcher.finditer(line):
+            position = match.start()
+            hit = self._group_index[match.lastgroup]
+            for index in self._same_start[line[position].lower()]:
+                if index != hit and not self._fragment_patterns[index].match(line, position):
+                    continue
+                end = position + len(self._fragments[index][0])
+                for rule_index, fragment_position in self._fragment_rules[index]:
+                    if next_fragment[rule_index] != fragment_position or position < next_start[rule_index]:
+                        continue
+                    if fragment_position == 0:
+                        first_column[rule_index] = position
+                    next_fragment[rule_index] += 1
+                    next_start[rule_index] = end
+                    if next_fragment[rule_index] == len(self.rules[rule_index]['fragments']):
+                        matched.append((rule_index, first_column[rule_index]))
+
+        return matched
@@ -0,0 +1,61 @@
+import ast
+from typing import List
+
+BRANCH_NODES = (ast.If, ast.While, ast.For, ast.Try, ast.ExceptHandler)
+NESTING_NODES = (ast.If, ast.For, ast.While)
+
+
+class StructureVisitor(ast.NodeVisitor):
+    """
+    Collect every structural metric used by CodeAnalysisEngine in one traversal
+
+    Nesting depth follows the engine's historical definition: the longest
+    chain of If/For/While nodes, each a direct child of the previous one,
+    starting at the module level.
+    """
+
+    def __init__(self, long_method_threshold: int = 20):
+        self.long_method_threshold = long_method_threshold
+        self.function_count = 0
+        self.class_count = 0
+        self.branch_points = 0
+        self.max_nesting_depth = 0
+        self._long_methods = []
+        self._depth = 0
+        self._chain_depth = 0
+
+    @property
+    def long_methods(self) -> List[str]:
+        """Names of long functions, in ast.walk (breadth-first) order."""
+        return [name for _, _, name in sorted(self._long_methods)]
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.function_count += 1
+        if len(node.body) > self.long_method_threshold:
+            self._long_methods.append((self._depth, len(self._long_methods), node.name))
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.class_count += 1
+        self.generic_visit(node)
+
+    def _visit_branch(self, node: ast.AST):
+        self.branch_points += 1
+        self.generic_visit(node)
+
+    visit_If = visit_While = visit_For = visit_Try = visit_ExceptHandler = _visit_branch
+
+    def generic_visit(self, node: ast.AST):
+        chain_depth = self._chain_depth
+        self._depth += 1
+        for child in ast.iter_child_nodes(node):
+            if chain_depth is not None and isinstance(child, NESTING_NODES):
+                self._chain_depth = chain_depth + 1
+                if self._chain_depth > self.max_nesting_depth:
+                    self.max_nesting_depth = self._chain_depth
+            else:
+                self._chain_depth = None
+            self.visit(child)
+        self._chain_depth = chain_depth
+        self._depth -= 1
+
@@ -0,0 +1,201 @@
+import re
+import ast
+import tokenize
+from typing import Dict, List, Set, Tuple
+from analysis_context import AnalysisContext
+
+CLASS_NAME = re.compile(r'^_*[A-Z][A-Za-z0-9]*$')
+LOWER_NAME = re.compile(r'^_*[a-z][a-z0-9_]*_*$')
+CONSTANT_NAME = re.compile(r'^_*[A-Z][A-Z0-9_]*$')
+
+# Names fixed by the frameworks that call them
+FRAMEWORK_METHODS = frozenset((
+    'setUp', 'tearDown', 'setUpClass', 'tearDownClass', 'setUpModule', 'tearDownModule',
+    'asyncSetUp', 'asyncTearDown', 'setUpTestData',
+))
+FRAMEWORK_PREFIXES = ('visit_', 'depart_')
+
+MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+MUTABLE_CALLS = frozenset(('list', 'dict', 'set', 'bytearray', 'defaultdict', 'OrderedDict', 'Counter', 'deque'))
+
+NOQA = re.compile(r'#\s*noqa\b', re.IGNORECASE)
+
+
+class StyleVisitor(ast.NodeVisitor):
+    """
+    Collect naming, unused-import, bare-except and mutable-default findings in one traversal
+
+    Findings are (line, column, code, message) tuples; unused imports are
+    only known once the whole tree has been seen, see unused_imports.
+    """
+
+    def __init__(self):
+        self.findings: List[Tuple[int, int, str, str]] = []
+        self._imports: Dict[str, ast.AST] = {}
+        self._used: Set[str] = set()
+        self._exported: Set[str] = set()
+        self._function_depth = 0
+
+    def unused_imports(self) -> List[Tuple[int, int, str, str]]:
+        return [
+            (node.lineno, node.col_offset, 'F401', f"'{name}' imported but unused")
+            for name, node in self._imports.items()
+            if name not in self._used and name not in self._exported
+        ]
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self._imports[alias.asname or alias.name.split('.')[0]] = node
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module == '__future__':
+            return
+        for alias in node.names:
+            if alias.name != '*':
+                self._imports[alias.asname or alias.name] = node
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            self._used.add(node.id)
+        elif self._function_depth and isinstance(node.ctx, ast.Store) and not self._is_lower(node.id):
+            if not CONSTANT_NAME.match(node.id):
+                self.findings.append((node.lineno, node.col_offset, 'N806', f"variable '{node.id}' in function should be lowercase"))
+
+    def visit_Assign(self, node: ast.Assign):
+        # Names listed in __all__ are re-exports, not unused imports
+        if any(isinstance(target, ast.Name) and target.id == '__all__' for target in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                self._exported.update(
+                    element.value for element in node.value.elts
+                    if isinstance(element, ast.Constant) and isinstance(element.value, str)
+                )
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        if not CLASS_NAME.match(node.name):
+            self.findings.append((node.lineno, node.col_offset, 'N801', f"class name '{node.name}' should use CapWords"))
+        function_depth = self._function_depth
+        self._function_depth = 0
+        self.generic_visit(node)
+        self._function_depth = function_depth
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        if not (self._is_lower(node.name) or self._is_framework_method(node.name)):
+            self.findings.append((node.lineno, node.col_offset, 'N802', f"function name '{node.name}' should be lowercase"))
+
+        arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs + [
+            argument for argument in (node.args.vararg, node.args.kwarg) if argument is not None
+        ]
+        for argument in arguments:
+            if not self._is_lower(argument.arg):
+                self.findings.append((argument.lineno, argument.col_offset, 'N803', f"argument name '{argument.arg}' should be lowercase"))
+
+        for default in node.args.defaults + node.args.kw_defaults:
+            if default is not None and self._is_mutable(default):
+                self.findings.append((
+                    default.lineno, default.col_offset, 'B006',
+                    f"mutable default argument in '{node.name}'; use None and create the value inside the function"
+                ))
+
+        for child in node.decorator_list + node.args.defaults + [default for default in node.args.kw_defaults if default is not None]:
+            self.visit(child)
+        for annotation in [argument.annotation for argument in arguments] + [node.returns]:
+            if annotation is not None:
+                self.visit(annotation)
+        self._function_depth += 1
+        for statement in node.body:
+            self.visit(statement)
+        self._function_depth -= 1
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.type is None:
+            self.findings.append((node.lineno, node.col_offset, 'E722', "do not use bare 'except'"))
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        # String annotations ("List[int]", "Optional[Dict]") can reference imports
+        if not isinstance(node.value, str) or not node.value.strip() or '\n' in node.value:
+            return
+        try:
+            annotation = ast.parse(node.value.strip(), mode='eval')
+        except (SyntaxError, ValueError):
+            return
+        self._used.update(name.id for name in ast.walk(annotation) if isinstance(name, ast.Name))
+
+    def _is_lower(self, name: str) -> bool:
+        return bool(LOWER_NAME.match(name)) or (name.startswith('__') and name.endswith('__')) or name == '_'
+
+    def _is_framework_method(self, name: str) -> bool:
+        return name in FRAMEWORK_METHODS or name.startswith(FRAMEWORK_PREFIXES)
+
+    def _is_mutable(self, node: ast.AST) -> bool:
+        if isinstance(node, MUTABLE_LITERALS):
+            return True
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in MUTABLE_CALLS
+
+
+class StyleChecker:
+    """
+    In-process style checks over a shared AnalysisContext
+
+    Line lengths and '# noqa' comments come from the context's token stream,
+    everything else from one StyleVisitor pass over its parsed tree, so a
+    snippet that was already analyzed is not parsed or tokenized again.
+    """
+
+    def __init__(self, max_line_length: int = 99):
+        self.max_line_length = max_line_length
+
+    def check(self, context: AnalysisContext, filename: str = '') -> List[Dict]:
+        """
+        Run every style check on one snippet
+
+        Args:
+            context (AnalysisContext): Parsed snippet
+            filename (str): File name; '__init__.py' files may re-export imports
+
+        Returns:
+            List[Dict]: Findings with line, column, code and message, in line order
+        """
+        findings, noqa_lines = self._token_checks(context)
+
+        try:
+            tree = context.tree
+        except SyntaxError as e:
+            findings.append((e.lineno or 1, max((e.offset or 1) - 1, 0), 'E999', f"SyntaxError: {e.msg}"))
+        else:
+            visitor = StyleVisitor()
+            visitor.visit(tree)
+            findings.extend(visitor.findings)
+            if not filename.endswith('__init__.py'):
+                findings.extend(visitor.unused_imports())
+
+        return [
+            {'line': line, 'column': column, 'code': code, 'message': message}
+            for line, column, code, message in sorted(findings)
+            if line not in noqa_lines
+        ]
+
+    def _token_checks(self, context: AnalysisContext) -> Tuple[List[Tuple[int, int, str, str]], Set[int]]:
+        findings = []
+        noqa_lines = set()
+        last_row = 0
+        for token in context.tokens:
+            if token.type == tokenize.COMMENT and NOQA.search(token.string):
+                noqa_lines.add(token.start[0])
+            if token.end[0] <= last_row or token.type == tokenize.ENDMARKER:
+                continue
+            # token.line holds every physical line the token spans
+            for row, physical_line in enumerate(token.line.splitlines(), token.start[0]):
+                if row <= last_row:
+                    continue
+                length = len(physical_line)
+                if length > self.max_line_length:
+                    findings.append((
+                        row, self.max_line_length, 'E501',
+                        f"line too long ({length} > {self.max_line_length} characters)"
+                    ))
+                last_row = row
+        return findings, noqa_lines
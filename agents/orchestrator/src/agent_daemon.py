@@ -0,0 +1,375 @@
+"""
+Long-lived worker that keeps the planner, generator and reviewer warm and
+serves jobs over a JSON-lines protocol on stdin/stdout or a local socket.
+
+Each request is one JSON object per line:
+
+    {"id": 1, "method": "initialize_plan", "params": {"task": {...}}}
+    {"id": 2, "method": "generate_code", "params": {"plan": {...}}}
+    {"id": 3, "method": "review_code", "params": {"code": {...}, "incremental": true}}
+    {"id": 4, "method": "health"}
+    {"id": 5, "method": "drain"}
+
+and gets one response line, possibly out of order when jobs run
+concurrently: {"id": 1, "ok": true, "result": {...}} or
+{"id": 1, "ok": false, "error": "..."}.
+
+    python agents/orchestrator/src/agent_daemon.py                          # stdin/stdout
+    python agents/orchestrator/src/agent_daemon.py --socket /tmp/agents.sock
+    python agents/orchestrator/src/agent_daemon.py --port 7070 --health-port 7071
+"""
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import os
+import sys
+import json
+import signal
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, TextIO
+from planner import CodePlannerAgent
+from generator import CodeGenerationAgent
+from reviewer import CodeReviewAgent
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+AGENT_METHODS = {
+    'initialize_plan': 'planner',
+    'generate_code': 'generator',
+    'review_code': 'reviewer',
+}
+
+
+class AgentWorkerDaemon:
+    def __init__(self, max_jobs: int = 4):
+        started = time.perf_counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_jobs = max_jobs
+        self.planner = CodePlannerAgent()
+        self.generator = CodeGenerationAgent()
+        # Review agents hold a stateful Bandit manager, so each job thread keeps its own
+        self._reviewers = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs, initializer=self._warm_reviewer)
+        self.draining = False
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self._condition = threading.Condition()
+        self._start_job_threads()
+        self.started_at = time.time()
+        self.startup_seconds = IMPORT_SECONDS + time.perf_counter() - started
+
+    def submit(self, message: Dict, respond: Callable[[Dict], None]) -> None:
+        """
+        Accept one protocol message; respond is called exactly once with the reply
+
+        Health and drain are answered inline, agent jobs run on the job pool.
+
+        Args:
+            message (Dict): Request with id, method and params
+            respond (Callable): Writes the response message
+        """
+        request_id = message.get('id')
+        method = message.get('method')
+
+        if method == 'health':
+            return respond({'id': request_id, 'ok': True, 'result': self.health()})
+        if method == 'drain':
+            with self._condition:
+                self.draining = True
+            threading.Thread(target=self.drain, daemon=True).start()
+            return respond({'id': request_id, 'ok': True, 'result': {'status': 'draining'}})
+        if method not in AGENT_METHODS:
+            return respond({'id': request_id, 'ok': False, 'error': f"Unknown method '{method}'"})
+
+        with self._condition:
+            if self.draining:
+                return respond({'id': request_id, 'ok': False, 'error': 'Worker is draining'})
+            self.in_flight += 1
+
+        self.executor.submit(self._run_job, request_id, method, message.get('params') or {}, respond)
+
+    def health(self) -> Dict:
+        """
+        Report liveness, load and startup cost
+
+        Returns:
+            Dict: status, pid, in_flight, completed, failed, uptime_s,
+            import_seconds, startup_seconds and modules (sys.modules size)
+        """
+        with self._condition:
+            in_flight, completed, failed = self.in_flight, self.completed, self.failed
+        return {
+            'status': 'draining' if self.draining else 'ok',
+            'pid': os.getpid(),
+            'max_jobs': self.max_jobs,
+            'in_flight': in_flight,
+            'completed': completed,
+            'failed': failed,
+            'uptime_s': time.time() - self.started_at,
+            'import_seconds': IMPORT_SECONDS,
+            'startup_seconds': self.startup_seconds,
+            'modules': len(sys.modules)
+        }
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Stop accepting jobs and wait for the in-flight ones to finish
+
+        Args:
+            timeout (float, optional): Seconds to wait
+
+        Returns:
+            bool: Whether every in-flight job finished
+        """
+        with self._condition:
+            self.draining = True
+            finished = self._condition.wait_for(lambda: self.in_flight == 0, timeout)
+        if finished:
+            self.executor.shutdown(wait=True)
+        return finished
+
+    def wait_until_drained(self) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self.draining and self.in_flight == 0)
+
+    def _run_job(self, request_id, method: str, params: Dict, respond: Callable[[Dict], None]) -> None:
+        ok = False
+        try:
+            agent = self._reviewer() if AGENT_METHODS[method] == 'reviewer' else getattr(self, AGENT_METHODS[method])
+            response = {'id': request_id, 'ok': True, 'result': getattr(agent, method)(**params)}
+            ok = True
+        except Exception as e:
+            self.logger.error(f"Job {request_id} ({method}) failed: {e}")
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+
+        try:
+            respond(response)
+        except Exception as e:
+            self.logger.warning(f"Could not deliver response for job {request_id}: {e}")
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._condition.notify_all()
+
+    def _reviewer(self) -> CodeReviewAgent:
+        if not hasattr(self._reviewers, 'agent'):
+            self._reviewers.agent = CodeReviewAgent()
+        return self._reviewers.agent
+
+    def _warm_reviewer(self) -> None:
+        self._reviewer()
+
+    def _start_job_threads(self) -> None:
+        # The pool only spawns threads on demand; holding max_jobs tasks at a
+        # barrier starts every thread (and builds its reviewer) before the first job
+        barrier = threading.Barrier(self.max_jobs)
+        for future in [self.executor.submit(barrier.wait, 60) for _ in range(self.max_jobs)]:
+            future.result()
+
+
+class _ResponseWriter:
+    """Serialises response lines from concurrent jobs onto one stream."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, message: Dict) -> None:
+        line = json.dumps(message, default=str) + '\n'
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+def _handle_line(daemon: AgentWorkerDaemon, line: str, respond: Callable[[Dict], None]) -> None:
+    if not line.strip():
+        return
+    try:
+        message = json.loads(line)
+    except json.JSONDecodeError as e:
+        respond({'id': None, 'ok': False, 'error': f"Invalid JSON: {e}"})
+        return
+    if not isinstance(message, dict):
+        respond({'id': None, 'ok': False, 'error': 'Request must be a JSON object'})
+        return
+    daemon.submit(message, respond)
+
+
+def serve_stdio(daemon: AgentWorkerDaemon, stdin: TextIO = None, stdout: TextIO = None) -> None:
+    """
+    Serve requests from stdin until EOF or drain, then finish in-flight jobs
+
+    Args:
+        daemon (AgentWorkerDaemon): Warm worker
+        stdin (TextIO): Request stream
+        stdout (TextIO): Response stream
+    """
+    respond = _ResponseWriter(stdout or sys.stdout)
+    respond({'event': 'ready', **daemon.health()})
+    for line in stdin or sys.stdin:
+        _handle_line(daemon, line, respond)
+        if daemon.draining:
+            break
+    daemon.drain()
+
+
+def serve_socket(daemon: AgentWorkerDaemon, socket_path: str = None, port: int = None) -> socketserver.BaseServer:
+    """
+    Build a threaded server speaking the protocol on a Unix socket or localhost TCP port
+
+    Each connection may pipeline many requests; its handler returns once
+    the client closes and every response for it has been written.
+
+    Args:
+        daemon (AgentWorkerDaemon): Warm worker
+        socket_path (str): Unix socket path
+        port (int): TCP port on 127.0.0.1, used when no socket_path is given
+
+    Returns:
+        socketserver.BaseServer: Call serve_forever() to start it
+    """
+    class ConnectionHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            pending = [0]
+            condition = threading.Condition()
+            writer = _ResponseWriter(_SocketTextWriter(self.wfile))
+
+            def respond(message: Dict) -> None:
+                try:
+                    writer(message)
+                finally:
+                    with condition:
+                        pending[0] -= 1
+                        condition.notify_all()
+
+            for raw_line in self.rfile:
+                with condition:
+                    pending[0] += 1
+                _handle_line(daemon, raw_line.decode('utf-8'), respond)
+                if not raw_line.strip():
+                    with condition:
+                        pending[0] -= 1
+
+            with condition:
+                condition.wait_for(lambda: pending[0] <= 0)
+
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server_class = socketserver.ThreadingUnixStreamServer
+        address = socket_path
+    else:
+        server_class = socketserver.ThreadingTCPServer
+        address = ('127.0.0.1', port or 0)
+    server_class.daemon_threads = True
+    server_class.allow_reuse_address = True
+    return server_class(address, ConnectionHandler)
+
+
+class _SocketTextWriter:
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> None:
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+
+def serve_health(daemon: AgentWorkerDaemon, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve daemon.health() as JSON at GET /health from a background thread
+
+    Returns 503 while draining so load balancers stop routing to the worker.
+
+    Args:
+        daemon (AgentWorkerDaemon): Warm worker
+        port (int): Port to listen on (0 picks a free one)
+        host (str): Interface to bind
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/health':
+                self.send_error(404)
+                return
+            health = daemon.health()
+            payload = json.dumps(health).encode('utf-8')
+            self.send_response(503 if health['status'] == 'draining' else 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Warm agent worker speaking JSON lines')
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument('--socket', help='Unix socket path')
+    transport.add_argument('--port', type=int, help='TCP port on 127.0.0.1')
+    parser.add_argument('--max-jobs', type=int, default=4, help='Jobs run concurrently')
+    parser.add_argument('--health-port', type=int, help='Serve GET /health on this port')
+    args = parser.parse_args()
+
+    # stdout carries protocol responses in stdio mode, so logs go to stderr
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    daemon = AgentWorkerDaemon(max_jobs=args.max_jobs)
+    if args.health_port is not None:
+        serve_health(daemon, args.health_port)
+
+    if args.socket is None and args.port is None:
+        def drain_and_exit(signum, frame):
+            daemon.drain()
+            raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, drain_and_exit)
+        serve_stdio(daemon)
+        return 0
+
+    server = serve_socket(daemon, socket_path=args.socket, port=args.port)
+
+    def drain_and_stop() -> None:
+        daemon.wait_until_drained()
+        server.shutdown()
+
+    threading.Thread(target=drain_and_stop, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=daemon.drain, daemon=True).start())
+    logging.getLogger(__name__).info(
+        f"Agent worker ready on {args.socket or server.server_address} "
+        f"(startup {daemon.startup_seconds:.2f}s)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        daemon.drain()
+    finally:
+        server.server_close()
+        if args.socket is not None and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import copy
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from planner import CodePlannerAgent
+from generator import CodeGenerationAgent
+from reviewer import CodeReviewAgent
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_CLOSED = object()
+
+FAILED_STATUSES = {'plan': 'PLANNING_FAILED', 'generate': 'GENERATION_FAILED', 'review': 'REVIEW_FAILED'}
+
+
+class StageQueue:
+    """
+    Bounded hand-off queue between two pipeline stages
+
+    put() blocks while the queue is full, which is what pushes back on the
+    upstream stage. put_rework() bypasses the bound and jumps the line, so
+    review -> generation loop-backs can never deadlock against forward
+    traffic that is waiting for the reviewers.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item: Any) -> bool:
+        with self._condition:
+            while len(self._items) >= self.maxsize and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return False
+            self._items.append(item)
+            self._condition.notify_all()
+            return True
+
+    def put_rework(self, item: Any) -> bool:
+        with self._condition:
+            if self._closed:
+                return False
+            self._items.appendleft(item)
+            self._condition.notify_all()
+            return True
+
+    def get(self) -> Any:
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            if not self._items:
+                return _CLOSED
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._items.clear()
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class PipelineOrchestrator:
+    """
+    Runs many tasks through planner -> generator -> reviewer with the stages
+    overlapped: each stage has its own worker pool and bounded input queue,
+    so while one task is being reviewed others can be generating and planning.
+    """
+
+    def __init__(
+        self,
+        planner: CodePlannerAgent = None,
+        generator: CodeGenerationAgent = None,
+        reviewer_factory: Callable[[], CodeReviewAgent] = CodeReviewAgent,
+        plan_workers: int = 2,
+        generate_workers: int = 4,
+        review_workers: int = 2,
+        queue_size: int = 8,
+        max_cycles: int = 3,
+        quality_threshold: float = 0.7
+    ):
+        self.planner = planner if planner is not None else CodePlannerAgent()
+        self.generator = generator if generator is not None else CodeGenerationAgent()
+        # Review agents hold a stateful Bandit manager, so each review worker builds its own
+        self.reviewer_factory = reviewer_factory
+        self.workers = {'plan': plan_workers, 'generate': generate_workers, 'review': review_workers}
+        self.queue_size = queue_size
+        self.max_cycles = max_cycles
+        self.quality_threshold = quality_threshold
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def run(self, tasks: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Process tasks through all stages, yielding each outcome as it completes
+
+        Tasks are pulled lazily; when the planning queue is full, intake
+        waits. A review scoring below quality_threshold sends the task back
+        to generation with the review attached to every step, until
+        max_cycles generate/review cycles have run. Closing the iterator
+        early stops all stages once their current item finishes.
+
+        Args:
+            tasks (Iterable[Dict]): Task details including id, title and description
+
+        Returns:
+            Iterator[Dict]: Task outcomes in completion order with task_id,
+            status (REVIEW_PASSED, REQUIRES_MODIFICATION, PLANNING_FAILED,
+            GENERATION_FAILED or REVIEW_FAILED), cycles, plan, code and review
+        """
+        queues = {stage: StageQueue(self.queue_size) for stage in self.workers}
+        outcomes: queue.Queue = queue.Queue()
+        threads = [threading.Thread(target=self._feed, args=(tasks, queues['plan'], outcomes), daemon=True)]
+        for stage, count in self.workers.items():
+            for _ in range(count):
+                threads.append(threading.Thread(
+                    target=self._stage_worker, args=(stage, queues, outcomes), daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            admitted = None
+            finished = 0
+            while admitted is None or finished < admitted:
+                kind, value = outcomes.get()
+                if kind == 'admitted':
+                    admitted = value
+                elif kind == 'error':
+                    raise value
+                else:
+                    finished += 1
+                    yield value
+        finally:
+            for stage_queue in queues.values():
+                stage_queue.close()
+
+    def run_all(self, tasks: Iterable[Dict]) -> List[Dict]:
+        """
+        Process tasks and return every outcome
+
+        Args:
+            tasks (Iterable[Dict]): Task details
+
+        Returns:
+            List[Dict]: Task outcomes in completion order
+        """
+        return list(self.run(tasks))
+
+    def _feed(self, tasks: Iterable[Dict], plan_queue: StageQueue, outcomes: queue.Queue) -> None:
+        admitted = 0
+        try:
+            for task in tasks:
+                task_id = task.get('id') if isinstance(task, dict) else None
+                if not plan_queue.put({'task': task, 'task_id': task_id, 'cycles': 0}):
+                    return
+                admitted += 1
+        except Exception as e:
+            self.logger.error(f"Task intake error: {e}")
+            outcomes.put(('error', e))
+            return
+        outcomes.put(('admitted', admitted))
+
+    def _stage_worker(self, stage: str, queues: Dict[str, StageQueue], outcomes: queue.Queue) -> None:
+        reviewer = self.reviewer_factory() if stage == 'review' else None
+        try:
+            while True:
+                item = queues[stage].get()
+                if item is _CLOSED:
+                    return
+                try:
+                    if stage == 'plan':
+                        self._plan(item, queues, outcomes)
+                    elif stage == 'generate':
+                        self._generate(item, queues, outcomes)
+                    else:
+                        self._review(reviewer, item, queues, outcomes)
+                except Exception as e:
+                    self.logger.error(f"Pipeline {stage} error for task {item['task_id']}: {e}")
+                    outcomes.put(('outcome', self._outcome(item, FAILED_STATUSES[stage], error=str(e))))
+        finally:
+            if reviewer is not None:
+                reviewer.close()
+
+    def _plan(self, item: Dict, queues: Dict[str, StageQueue], outcomes: queue.Queue) -> None:
+        plan = self.planner.initialize_plan(item['task'])
+        item['plan'] = plan
+        if plan.get('status') != 'PLANNING_COMPLETE':
+            outcomes.put(('outcome', self._outcome(item, 'PLANNING_FAILED', error=plan.get('error'))))
+            return
+        queues['generate'].put(item)
+
+    def _generate(self, item: Dict, queues: Dict[str, StageQueue], outcomes: queue.Queue) -> None:
+        plan = item['plan']
+        if item.get('review') is not None:
+            plan = self._plan_with_feedback(plan, item['review'], item.get('code'))
+        item['cycles'] += 1
+        code = self.generator.generate_code(plan)
+        item['code'] = code
+        if code.get('status') != 'CODE_GENERATION_COMPLETE':
+            outcomes.put(('outcome', self._outcome(item, 'GENERATION_FAILED', error=code.get('error'))))
+            return
+        queues['review'].put(item)
+
+    def _review(self, reviewer: CodeReviewAgent, item: Dict, queues: Dict[str, StageQueue], outcomes: queue.Queue) -> None:
+        # Later cycles pass the previous review so unchanged files are not re-analyzed
+        review = reviewer.review_code(item['code'], previous_review=item.get('review'), incremental=True)
+        item['review'] = review
+        if review.get('status') != 'REVIEW_COMPLETE':
+            outcomes.put(('outcome', self._outcome(item, 'REVIEW_FAILED', error=review.get('error'))))
+            return
+
+        if review.get('quality_score', 0) >= self.quality_threshold:
+            self._remember_accepted(item)
+            outcomes.put(('outcome', self._outcome(item, 'REVIEW_PASSED')))
+        elif item['cycles'] >= self.max_cycles:
+            outcomes.put(('outcome', self._outcome(item, 'REQUIRES_MODIFICATION')))
+        else:
+            self.logger.info(f"Task {item['task_id']} requires modification, starting cycle {item['cycles'] + 1}")
+            queues['generate'].put_rework(item)
+
+    def _remember_accepted(self, item: Dict) -> None:
+        # Accepted code seeds the generator's snippet index, when it has one
+        remember = getattr(self.generator, 'remember_accepted_code', None)
+        if remember is None:
+            return
+        try:
+            remember(item['plan'], item['code'])
+        except Exception as e:
+            self.logger.warning(f"Could not index accepted code of task {item['task_id']}: {e}")
+
+    def _plan_with_feedback(self, plan: Dict, review: Dict, code: Dict) -> Dict:
+        """
+        Attach each step's review findings so regeneration can address them
+
+        Findings are matched to steps by file name. Steps without findings
+        keep their code ('previous_code'), so the generator does not redo
+        them and the incremental review skips them; if no step has any
+        findings, every step is regenerated with the review score.
+
+        Args:
+            plan (Dict): Implementation plan
+            review (Dict): Review result of the previous cycle
+            code (Dict): Generation result the review was for
+
+        Returns:
+            Dict: Copy of the plan with 'review_feedback' or 'previous_code' on each step
+        """
+        plan = copy.deepcopy(plan)
+        steps = plan.get('implementation_steps', [])
+        feedback = {step.get('name'): self._step_feedback(review, step.get('name')) for step in steps}
+        flagged = {name for name, findings in feedback.items() if self._has_findings(findings)}
+        previous_code = code.get('generated_code', {}) if code else {}
+        for step in steps:
+            name = step.get('name')
+            if flagged and name not in flagged and name in previous_code:
+                step['previous_code'] = previous_code[name]
+            else:
+                step['review_feedback'] = feedback[name]
+        return plan
+
+    def _step_feedback(self, review: Dict, name: str) -> Dict:
+        performance = review.get('performance_recommendations', {})
+        file_review = review.get('file_reviews', {}).get(name)
+        if file_review is not None:
+            style = file_review.get('style_suggestions', [])
+        else:
+            # Without per-file reviews, suggestions are 'file:line:column: message' strings
+            style = [suggestion for suggestion in review.get('style_suggestions', []) if suggestion.startswith(f"{name}:")]
+        return {
+            'quality_score': review.get('quality_score'),
+            'security_issues': [issue for issue in review.get('security_issues', []) if issue.get('file') == name],
+            'performance_recommendations': {
+                key: [finding for finding in performance.get(key, []) if finding.get('file') == name]
+                for key in ('functions', 'issues', 'parse_errors')
+            },
+            'style_suggestions': style
+        }
+
+    def _has_findings(self, feedback: Dict) -> bool:
+        performance = feedback['performance_recommendations']
+        return bool(
+            feedback['security_issues'] or feedback['style_suggestions']
+            or performance['issues'] or performance['parse_errors']
+        )
+
+    def _outcome(self, item: Dict, status: str, error: str = None) -> Dict:
+        outcome = {
+            'task_id': item['task_id'],
+            'status': status,
+            'cycles': item['cycles'],
+            'plan': item.get('plan'),
+            'code': item.get('code'),
+            'review': item.get('review')
+        }
+        if error is not None:
+            outcome['error'] = error
+        return outcome
@@ -0,0 +1,248 @@
+import os
+import math
+import asyncio
+import threading
+import weakref
+from typing import Dict
+import httpx
+from llm_client import AIMDLimit, LLMClientBase, LLMClientError, ResponseObject, TokenBucket, to_response_object
+from instrumentation import traced
+
+# httpx's connection pool slows down sharply past a few dozen connections,
+# so large pools are split into shards of this many connections
+POOL_SHARD_SIZE = 16
+
+
+class AsyncTokenBucket(TokenBucket):
+    """TokenBucket whose acquire waits on the event loop instead of blocking a thread."""
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+class AsyncConcurrencyLimiter(AIMDLimit):
+    """AIMDLimit whose callers are coroutines parked on a condition, not threads."""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        super().__init__(initial=initial, minimum=minimum, maximum=maximum, decrease_factor=decrease_factor)
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(self._has_slot)
+            self.in_flight += 1
+
+    async def release(self, overloaded: bool = False) -> None:
+        async with self._condition:
+            self._finish(overloaded)
+            self._condition.notify_all()
+
+
+class AsyncLLMClient(LLMClientBase):
+    """
+    Asynchronous chat completion client on one httpx connection pool
+
+    The coroutine counterpart of LLMClient - the same rate limits, adaptive
+    concurrency and jittered retries on 429/5xx - so an async service holds
+    one coroutine, not one thread, per in-flight call. Calls can be
+    cancelled at any await and take an optional per-call timeout.
+
+    Connections are spread over several small httpx pools, each request
+    going to the least busy one. Create the client inside the event loop
+    that uses it; the pools are bound to that loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        pool_size: int = None,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        initial_concurrency: int = 8,
+        max_concurrency: int = 64,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 120.0
+    ):
+        super().__init__(api_key, base_url, max_retries, backoff_base, backoff_max, timeout)
+        self.request_bucket = AsyncTokenBucket(requests_per_minute / 60) if requests_per_minute else None
+        self.token_bucket = AsyncTokenBucket(tokens_per_minute / 60) if tokens_per_minute else None
+        self.limiter = AsyncConcurrencyLimiter(initial=initial_concurrency, maximum=max_concurrency)
+
+        # The limiter caps in-flight requests, so the pool never needs more connections than that
+        pool_size = pool_size if pool_size is not None else max_concurrency
+        shard_size = min(pool_size, POOL_SHARD_SIZE)
+        self.sessions = [
+            httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=shard_size, max_keepalive_connections=shard_size),
+                timeout=timeout
+            )
+            for _ in range(math.ceil(pool_size / shard_size))
+        ]
+        self._session_load = [0] * len(self.sessions)
+
+    @classmethod
+    def from_env(cls) -> 'AsyncLLMClient':
+        """
+        Build a client configured like get_shared_client
+
+        Environment: OPENAI_API_KEY, OPENAI_BASE_URL, LLM_REQUESTS_PER_MINUTE,
+        LLM_TOKENS_PER_MINUTE, LLM_MAX_CONCURRENCY.
+
+        Returns:
+            AsyncLLMClient: The configured client
+        """
+        return cls(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            base_url=os.getenv('OPENAI_BASE_URL'),
+            requests_per_minute=float(os.getenv('LLM_REQUESTS_PER_MINUTE', 0)) or None,
+            tokens_per_minute=float(os.getenv('LLM_TOKENS_PER_MINUTE', 0)) or None,
+            max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 64))
+        )
+
+    @traced(attributes=lambda self, timeout=None, **request: {'model': request.get('model'), 'stream': False})
+    async def chat_completion(self, timeout: float = None, **request) -> ResponseObject:
+        """
+        Create a chat completion
+
+        Args:
+            timeout (float, optional): Seconds for the whole call, retries included
+            **request: Chat completion parameters (model, messages, max_tokens, ...)
+
+        Returns:
+            ResponseObject: The completion
+
+        Raises:
+            LLMClientError: On a non-retryable error or once retries are exhausted
+            asyncio.TimeoutError: When timeout elapses first
+        """
+        if timeout is None:
+            return await self._chat_completion(request)
+        return await asyncio.wait_for(self._chat_completion(request), timeout)
+
+    async def _chat_completion(self, request: Dict) -> ResponseObject:
+        estimated_tokens = self._estimate_tokens(request)
+
+        for attempt in range(self.max_retries + 1):
+            if self.request_bucket is not None:
+                await self.request_bucket.acquire()
+            if self.token_bucket is not None:
+                await self.token_bucket.acquire(estimated_tokens)
+            await self.limiter.acquire()
+            self._count('requests')
+
+            retry_after = None
+            overloaded = False
+            shard = min(range(len(self.sessions)), key=self._session_load.__getitem__)
+            self._session_load[shard] += 1
+            try:
+                response = await self.sessions[shard].post(
+                    f"{self.base_url}/chat/completions",
+                    json=request,
+                    headers=self._headers()
+                )
+            except httpx.TransportError as e:
+                overloaded = True
+                error = LLMClientError(f"LLM request failed: {e}")
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    overloaded = True
+                    self._count('throttled' if response.status_code == 429 else 'server_errors')
+                    retry_after = self._retry_after(response)
+                    error = LLMClientError(
+                        f"LLM request failed with status {response.status_code}", response.status_code
+                    )
+                elif response.status_code >= 400:
+                    raise LLMClientError(
+                        f"LLM request rejected with status {response.status_code}: {response.text}",
+                        response.status_code
+                    )
+                else:
+                    body = to_response_object(response.json())
+                    self._record_usage(request.get('model'), estimated_tokens, body)
+                    return body
+            finally:
+                self._session_load[shard] -= 1
+                # Shielded so a cancelled call still frees its slot
+                await asyncio.shield(self.limiter.release(overloaded=overloaded))
+
+            if attempt == self.max_retries:
+                raise error
+            await asyncio.sleep(self._retry_delay(attempt, error, retry_after))
+
+    async def aclose(self) -> None:
+        """Close every connection pool; the client cannot be used afterwards."""
+        for session in self.sessions:
+            if not session.is_closed:
+                await session.aclose()
+
+    async def __aenter__(self) -> 'AsyncLLMClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+_loop_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]' = weakref.WeakKeyDictionary()
+_loop_clients_lock = threading.Lock()
+
+
+async def _close_at_shutdown(client: AsyncLLMClient):
+    # Parked at the yield until the loop's shutdown_asyncgens(), which
+    # asyncio.run calls once its main coroutine returns, closes it
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _start(closer) -> None:
+    try:
+        await closer.__anext__()
+    except StopAsyncIteration:
+        # aclose_loop_client closed it before it got here
+        pass
+
+
+def get_loop_client() -> AsyncLLMClient:
+    """
+    Return the running event loop's client, configured from the environment on first use
+
+    An AsyncLLMClient's pools and limiter are bound to one loop, so each loop
+    gets its own. The client is closed when the loop shuts down its async
+    generators, as asyncio.run does; a loop run some other way should
+    await aclose_loop_client() before it stops. Call from a coroutine.
+
+    Returns:
+        AsyncLLMClient: The client for the running loop
+    """
+    loop = asyncio.get_running_loop()
+    with _loop_clients_lock:
+        entry = _loop_clients.get(loop)
+        if entry is None:
+            client = AsyncLLMClient.from_env()
+            closer = _close_at_shutdown(client)
+            loop.create_task(_start(closer))
+            # The loop tracks its async generators weakly, so keep the closer alive here
+            entry = _loop_clients[loop] = (client, closer)
+        return entry[0]
+
+
+async def aclose_loop_client() -> None:
+    """Close the running loop's client, if get_loop_client created one."""
+    with _loop_clients_lock:
+        entry = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        client, closer = entry
+        await closer.aclose()
+        await client.aclose()
@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List
+import requests
+from llm_client import DEFAULT_BASE_URL, LLMClient, LLMClientError, get_shared_client
+from instrumentation import get_instrumentation
+
+CHAT_COMPLETIONS_URL = '/v1/chat/completions'
+TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def _write_json(path: str, value: Any) -> None:
+    # Write-then-rename, so a crash never leaves a half-written state file
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as handle:
+        json.dump(value, handle)
+    os.replace(temporary, path)
+
+
+def _read_jsonl(path: str) -> List[Dict]:
+    """Parse a JSONL file, stopping at a line truncated by a crash."""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as handle:
+        for line in handle:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
+
+
+class BatchExecutor(ABC):
+    """
+    Runs a JSONL file of requests in OpenAI batch format
+
+    Each input line is {'custom_id', 'method', 'url', 'body'}; each output
+    line is {'custom_id', 'response': {'status_code', 'body'}, 'error'}.
+    """
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Start a batch for a request file and return its batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        """Report a batch, at least its 'status' (see TERMINAL_STATUSES)."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        """Yield the output lines of a finished batch."""
+
+
+class LocalBatchExecutor(BatchExecutor):
+    """
+    Runs batches in-process through an LLMClient, e.g. against a local stand-in server
+
+    Batch metadata and output are files in directory, and output lines are
+    appended as requests finish. A batch left in progress by a previous
+    process resumes, skipping the requests it already answered, the next
+    time its status is polled.
+    """
+
+    def __init__(self, directory: str, client: LLMClient = None, max_workers: int = 8):
+        self.directory = directory
+        self.client = client if client is not None else get_shared_client()
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._workers: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:16]}"
+        _write_json(self._path(batch_id, 'json'), {
+            'id': batch_id,
+            'status': 'in_progress',
+            'input_path': os.path.abspath(input_path),
+            'output_path': self._path(batch_id, 'output.jsonl'),
+            'created_at': time.time()
+        })
+        self._start(batch_id)
+        return batch_id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        with open(self._path(batch_id, 'json')) as handle:
+            batch = json.load(handle)
+        if batch['status'] == 'in_progress':
+            self._start(batch_id)
+        return batch
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        return iter(_read_jsonl(self._path(batch_id, 'output.jsonl')))
+
+    def _start(self, batch_id: str) -> None:
+        with self._lock:
+            worker = self._workers.get(batch_id)
+            if worker is not None and worker.is_alive():
+                return
+            worker = threading.Thread(target=self._run, args=(batch_id,), daemon=True)
+            self._workers[batch_id] = worker
+            worker.start()
+
+    def _run(self, batch_id: str) -> None:
+        with open(self._path(batch_id, 'json')) as handle:
+            batch = json.load(handle)
+        output_path = batch['output_path']
+
+        # Drop a line truncated by a crash before appending after it
+        answered = _read_jsonl(output_path)
+        with open(output_path, 'w') as output:
+            output.writelines(json.dumps(line) + '\n' for line in answered)
+        done = {line['custom_id'] for line in answered}
+        pending = [line for line in _read_jsonl(batch['input_path']) if line['custom_id'] not in done]
+        if done:
+            self.logger.info(f"Resuming batch {batch_id}: {len(done)} answered, {len(pending)} remaining")
+
+        write_lock = threading.Lock()
+        with open(output_path, 'a') as output:
+            def answer(line: Dict) -> None:
+                result = self._answer(line)
+                with write_lock:
+                    output.write(json.dumps(result) + '\n')
+                    output.flush()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(answer, pending))
+
+        lines = _read_jsonl(output_path)
+        failed = sum(line['response']['status_code'] != 200 for line in lines)
+        batch.update(
+            status='completed',
+            completed_at=time.time(),
+            request_counts={'total': len(lines), 'completed': len(lines) - failed, 'failed': failed}
+        )
+        _write_json(self._path(batch_id, 'json'), batch)
+
+    def _answer(self, line: Dict) -> Dict:
+        try:
+            body = self.client.chat_completion(**line['body'])
+            status_code = 200
+        except Exception as e:
+            # Any failure becomes a failed line; a dead worker would leave the batch in progress forever
+            body = {'error': {'message': str(e)}}
+            status_code = (e.status_code if isinstance(e, LLMClientError) else None) or 500
+        return {
+            'id': f"batch_req_{uuid.uuid4().hex[:16]}",
+            'custom_id': line['custom_id'],
+            'response': {'status_code': status_code, 'body': body},
+            'error': None
+        }
+
+    def _path(self, batch_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{suffix}")
+
+
+class OpenAIBatchExecutor(BatchExecutor):
+    """Runs batches on the OpenAI Batch API: upload the file, create the batch, download its output."""
+
+    def __init__(self, api_key: str = None, base_url: str = None, completion_window: str = '24h', timeout: float = 120.0):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.completion_window = completion_window
+        self.timeout = timeout
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+
+    @classmethod
+    def from_env(cls) -> 'OpenAIBatchExecutor':
+        """Build an executor from OPENAI_API_KEY and OPENAI_BASE_URL."""
+        return cls(api_key=os.getenv('OPENAI_API_KEY'), base_url=os.getenv('OPENAI_BASE_URL'))
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, 'rb') as handle:
+            uploaded = self._request('POST', '/files', data={'purpose': 'batch'}, files={'file': (os.path.basename(input_path), handle)})
+        batch = self._request('POST', '/batches', json={
+            'input_file_id': uploaded['id'],
+            'endpoint': CHAT_COMPLETIONS_URL,
+            'completion_window': self.completion_window
+        })
+        return batch['id']
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        return self._request('GET', f"/batches/{batch_id}")
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        batch = self.status(batch_id)
+        # Failed requests are in the error file
+        for file_id in (batch.get('output_file_id'), batch.get('error_file_id')):
+            if not file_id:
+                continue
+            response = self.session.get(f"{self.base_url}/files/{file_id}/content", timeout=self.timeout)
+            self._raise_for_status(response)
+            for line in response.text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        self._raise_for_status(response)
+        return response.json()
+
+    def _raise_for_status(self, response: requests.Response) -> None:
+        if response.status_code >= 400:
+            raise LLMClientError(
+                f"Batch API request failed with status {response.status_code}: {response.text}",
+                response.status_code
+            )
+
+
+class BatchJob:
+    """
+    Resumable sequence of batches over one set of inputs, persisted in a directory
+
+    execute() sends the requests not answered yet as one batch, polls it to
+    completion and resubmits failed requests up to max_attempts times. The
+    answers and the batch in flight are saved after every step, so a
+    restarted process that calls execute() again with the same requests
+    polls the batch already submitted instead of paying for it twice, and
+    gets earlier answers without resubmitting them. A directory belongs to
+    one set of inputs (tasks, plans, ...); reusing it for others is an error.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        executor: BatchExecutor,
+        inputs: Any,
+        poll_interval: float = 30.0,
+        max_attempts: int = 3
+    ):
+        self.directory = directory
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(self.__class__.__name__)
+        os.makedirs(directory, exist_ok=True)
+
+        # Custom ids only mean something for the inputs they were made from
+        fingerprint = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+        self._state_path = os.path.join(directory, 'job.json')
+        if os.path.exists(self._state_path):
+            with open(self._state_path) as handle:
+                self.state = json.load(handle)
+            if self.state['fingerprint'] != fingerprint:
+                raise ValueError(f"Batch directory {directory} belongs to a job over different inputs")
+        else:
+            self.state = {'fingerprint': fingerprint, 'batches': 0, 'active': None, 'answers': {}, 'errors': {}, 'attempts': {}}
+            self._save()
+
+    def execute(self, requests_by_id: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Answer chat completion requests through batches
+
+        Args:
+            requests_by_id (Dict[str, Dict]): Request bodies by custom id, unique within the job
+
+        Returns:
+            Dict[str, Dict]: {'content': str} or {'error': str} per custom id
+        """
+        if self.state['active'] is not None:
+            self._finish(self.state['active']['batch_id'], self.state['active']['custom_ids'])
+
+        while True:
+            pending = {
+                custom_id: body for custom_id, body in requests_by_id.items()
+                if custom_id not in self.state['answers']
+                and self.state['attempts'].get(custom_id, 0) < self.max_attempts
+            }
+            if not pending:
+                break
+            batch_id = self._submit(pending)
+            self._finish(batch_id, list(pending))
+
+        return {
+            custom_id: (
+                {'content': self.state['answers'][custom_id]} if custom_id in self.state['answers']
+                else {'error': self.state['errors'].get(custom_id, 'Request was not answered')}
+            )
+            for custom_id in requests_by_id
+        }
+
+    def _submit(self, pending: Dict[str, Dict]) -> str:
+        self.state['batches'] += 1
+        input_path = os.path.join(self.directory, f"requests-{self.state['batches']:04d}.jsonl")
+        with open(input_path, 'w') as handle:
+            for custom_id, body in pending.items():
+                handle.write(json.dumps({'custom_id': custom_id, 'method': 'POST', 'url': CHAT_COMPLETIONS_URL, 'body': body}) + '\n')
+
+        batch_id = self.executor.submit(input_path)
+        for custom_id in pending:
+            self.state['attempts'][custom_id] = self.state['attempts'].get(custom_id, 0) + 1
+        self.state['active'] = {'batch_id': batch_id, 'custom_ids': list(pending)}
+        self._save()
+        self.logger.info(f"Submitted batch {batch_id} with {len(pending)} requests")
+        return batch_id
+
+    def _finish(self, batch_id: str, custom_ids: List[str]) -> None:
+        while True:
+            batch = self.executor.status(batch_id)
+            if batch['status'] in TERMINAL_STATUSES:
+                break
+            time.sleep(self.poll_interval)
+
+        instrumentation = get_instrumentation()
+        for line in self.executor.results(batch_id):
+            custom_id = line['custom_id']
+            response = line.get('response') or {}
+            body = response.get('body') or {}
+            if response.get('status_code') == 200:
+                self.state['answers'][custom_id] = body['choices'][0]['message']['content']
+                self.state['errors'].pop(custom_id, None)
+                instrumentation.record_llm_usage(body.get('model'), body.get('usage'))
+            else:
+                error = line.get('error') or body.get('error') or {}
+                self.state['errors'][custom_id] = error.get('message') or f"Request failed with status {response.get('status_code')}"
+
+        for custom_id in custom_ids:
+            if custom_id not in self.state['answers'] and custom_id not in self.state['errors']:
+                self.state['errors'][custom_id] = f"Batch {batch_id} ended {batch['status']} without answering"
+        self.state['active'] = None
+        self._save()
+
+    def _save(self) -> None:
+        _write_json(self._state_path, self.state)
@@ -0,0 +1,396 @@
+import sys
+import json
+import time
+import uuid
+import bisect
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+# USD per 1K (prompt, completion) tokens, used for the llm_cost_usd_total counter
+MODEL_PRICES = {
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.005, 0.015),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional['Span'] = None, attributes: Dict[str, Any] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration = None
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, value: float) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': 'span',
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration_s': self.duration,
+            'error': self.error,
+            'attributes': self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while instrumentation is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add(self, key: str, value: float) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class MetricsSink:
+    """Receives finished spans and metric increments from Instrumentation."""
+
+    def on_span(self, span: Span) -> None:
+        pass
+
+    def on_metric(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        pass
+
+
+class Instrumentation:
+    """
+    Span and metric dispatcher shared by all agents in a process
+
+    Disabled by default; while disabled, traced methods only pay for one
+    attribute check.
+    """
+
+    def __init__(self, prices: Dict[str, Tuple[float, float]] = None):
+        self.enabled = False
+        self.sinks: List[MetricsSink] = []
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def enable(self, *sinks: MetricsSink) -> None:
+        """
+        Start emitting spans and metrics to the given sinks
+
+        Args:
+            *sinks (MetricsSink): Exporters, e.g. PrometheusExporter or JSONLogSink
+        """
+        self.sinks = list(sinks)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.sinks = []
+
+    def span(self, name: str, **attributes) -> '_SpanScope':
+        """
+        Time a block as a span nested under the current one
+
+        Args:
+            name (str): Span name, e.g. 'CodeReviewAgent.review_code'
+            **attributes: Initial span attributes
+
+        Returns:
+            Context manager yielding the Span (a no-op span when disabled)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _SpanScope(self, name, attributes)
+
+    def current_span(self):
+        span = _current_span.get() if self.enabled else None
+        return span if span is not None else _NOOP_SPAN
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increment a counter in every sink
+
+        Args:
+            name (str): Counter name, e.g. 'llm_cache_hits_total'
+            value (float): Amount to add
+            **labels: Counter labels
+        """
+        if not self.enabled:
+            return
+        for sink in self.sinks:
+            self._deliver(sink.on_metric, name, value, labels)
+
+    def record_llm_usage(self, model: str, usage: Optional[Dict]) -> None:
+        """
+        Record token counts and estimated cost of one completion
+
+        Counts go to the llm_*_total counters and onto the current span.
+
+        Args:
+            model (str): Requested model
+            usage (Dict): The response's 'usage' block
+        """
+        if not self.enabled or not usage:
+            return
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        completion_tokens = usage.get('completion_tokens', 0)
+        span = self.current_span()
+        span.add('prompt_tokens', prompt_tokens)
+        span.add('completion_tokens', completion_tokens)
+        self.count('llm_prompt_tokens_total', prompt_tokens, model=model)
+        self.count('llm_completion_tokens_total', completion_tokens, model=model)
+
+        if model in self.prices:
+            prompt_price, completion_price = self.prices[model]
+            cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+            span.add('cost_usd', cost)
+            self.count('llm_cost_usd_total', cost, model=model)
+
+    def finish(self, span: Span) -> None:
+        for sink in self.sinks:
+            self._deliver(sink.on_span, span)
+
+    def _deliver(self, handler: Callable, *args) -> None:
+        # A broken exporter must never fail the agent call it is observing
+        try:
+            handler(*args)
+        except Exception as e:
+            self.logger.warning(f"Instrumentation sink failed: {e}")
+
+
+class _SpanScope:
+    def __init__(self, instrumentation: Instrumentation, name: str, attributes: Dict[str, Any]):
+        self.instrumentation = instrumentation
+        self.span = Span(name, _current_span.get(), attributes)
+        self._token = None
+        self._start = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        self._start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.span.duration = time.perf_counter() - self._start
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.instrumentation.finish(self.span)
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Return the process-wide instrumentation
+
+    Returns:
+        Instrumentation: The shared instance, disabled until enable() is called
+    """
+    return _instrumentation
+
+
+def traced(name: str = None, attributes: Callable[..., Dict[str, Any]] = None):
+    """
+    Wrap a function in a span
+
+    A dict result with a 'status' key records that status on the span, so
+    failures the agents report in-band (e.g. REVIEW_FAILED) stay visible.
+    Coroutine functions are timed until they finish, not until they return
+    a coroutine.
+
+    Args:
+        name (str): Span name, defaults to the function's qualified name
+        attributes (Callable): Builds span attributes from the call arguments
+
+    Returns:
+        Decorator
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not _instrumentation.enabled:
+                    return await function(*args, **kwargs)
+                initial = attributes(*args, **kwargs) if attributes is not None else {}
+                with _instrumentation.span(span_name, **initial) as span:
+                    result = await function(*args, **kwargs)
+                    if isinstance(result, dict) and 'status' in result:
+                        span.set_attribute('status', result['status'])
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _instrumentation.enabled:
+                return function(*args, **kwargs)
+            initial = attributes(*args, **kwargs) if attributes is not None else {}
+            with _instrumentation.span(span_name, **initial) as span:
+                result = function(*args, **kwargs)
+                if isinstance(result, dict) and 'status' in result:
+                    span.set_attribute('status', result['status'])
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        key + '="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class PrometheusExporter(MetricsSink):
+    """
+    Aggregates spans into a duration histogram and metrics into counters,
+    rendered in the Prometheus text exposition format
+    """
+
+    def __init__(self, namespace: str = 'agent_workflow', buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[tuple, List] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def on_span(self, span: Span) -> None:
+        key = _label_key({'span': span.name, 'error': 'true' if span.error else 'false'})
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, span.duration)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += span.duration
+            histogram[2] += 1
+
+    def on_metric(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format
+
+        Returns:
+            str: Exposition text
+        """
+        metric = f"{self.namespace}_span_duration_seconds"
+        lines = [f"# HELP {metric} Duration of instrumented agent calls", f"# TYPE {metric} histogram"]
+        with self._lock:
+            for labels, (bucket_counts, total, count) in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+            for name, series in sorted(self._counters.items()):
+                counter = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {counter} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{counter}{_format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve render() at /metrics from a background thread
+
+        Args:
+            port (int): Port to listen on (0 picks a free one)
+            host (str): Interface to bind; local only unless e.g. '0.0.0.0' is passed
+
+        Returns:
+            ThreadingHTTPServer: The running server; call shutdown() to stop it
+        """
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                payload = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+class JSONLogSink(MetricsSink):
+    """Writes each finished span and metric increment as one JSON line."""
+
+    def __init__(self, stream: TextIO = None, path: str = None):
+        self._file = open(path, 'a', encoding='utf-8') if path is not None else None
+        self.stream = self._file or stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def on_span(self, span: Span) -> None:
+        self._write(span.to_dict())
+
+    def on_metric(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        self._write({'type': 'metric', 'name': name, 'value': value, 'labels': labels, 'time': time.time()})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def _write(self, record: Dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
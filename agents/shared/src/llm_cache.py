@@ -0,0 +1,330 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from instrumentation import get_instrumentation
+
+
+def make_cache_key(model: str, messages: List[Dict], **params) -> str:
+    """
+    Build a content-addressed key for an LLM request
+
+    The system prompt is part of messages, so changing it changes the key.
+
+    Args:
+        model (str): Model name
+        messages (List[Dict]): Chat messages, including the system prompt
+        **params: Generation parameters (max_tokens, response_format, ...)
+
+    Returns:
+        str: Hex SHA-256 digest of the canonicalised request
+    """
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'params': params},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage interface for LLMResponseCache."""
+
+    evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the live value for key, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store value under key, expiring after ttl seconds if given."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of entries that have not expired."""
+
+
+class InMemoryLRUBackend(CacheBackend):
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._size += len(value)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(expires_at is None or expires_at > now for _, expires_at in self._entries.values())
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    SQLite-backed store that several worker processes can share
+
+    Entry count and total size are kept in a one-row totals table by
+    triggers, so checking the limits on set never scans the cache, and
+    eviction reads only the least recently used rows it removes.
+    """
+
+    # Rows are removed in batches of at least this many when over max_bytes
+    EVICTION_BATCH = 32
+
+    def __init__(self, path: str, max_entries: int = 100000, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        # One transaction, so the totals are seeded from exactly the rows the triggers will track
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, '
+                'expires_at REAL, accessed_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)')
+            connection.execute('CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires_at)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache_totals ('
+                'id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, size INTEGER NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS llm_cache_inserted AFTER INSERT ON llm_cache BEGIN '
+                'UPDATE llm_cache_totals SET entries = entries + 1, size = size + NEW.size; END'
+            )
+            connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS llm_cache_deleted AFTER DELETE ON llm_cache BEGIN '
+                'UPDATE llm_cache_totals SET entries = entries - 1, size = size - OLD.size; END'
+            )
+            connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS llm_cache_resized AFTER UPDATE OF size ON llm_cache BEGIN '
+                'UPDATE llm_cache_totals SET size = size - OLD.size + NEW.size; END'
+            )
+            connection.execute(
+                'INSERT OR IGNORE INTO llm_cache_totals (id, entries, size) '
+                'SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache'
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def get(self, key: str) -> Optional[str]:
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            'SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        with connection:
+            if expires_at is not None and expires_at <= now:
+                connection.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                return None
+            connection.execute('UPDATE llm_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        connection = self._connection()
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with connection:
+            # An upsert, not INSERT OR REPLACE: replace deletes skip the delete trigger
+            connection.execute(
+                'INSERT INTO llm_cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+                'expires_at = excluded.expires_at, accessed_at = excluded.accessed_at',
+                (key, value, len(value), expires_at, now)
+            )
+            self._evict(connection, now)
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute('DELETE FROM llm_cache')
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM llm_cache WHERE expires_at IS NULL OR expires_at > ?', (time.time(),)
+        ).fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        expired = connection.execute(
+            'DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+
+        while True:
+            count, size = connection.execute('SELECT entries, size FROM llm_cache_totals').fetchone()
+            excess = count - self.max_entries
+            over_bytes = self.max_bytes is not None and size > self.max_bytes
+            if excess <= 0 and not over_bytes:
+                return
+
+            limit = max(excess, self.EVICTION_BATCH if over_bytes else 1)
+            rows = connection.execute(
+                'SELECT key, size FROM llm_cache ORDER BY accessed_at LIMIT ?', (limit,)
+            ).fetchall()
+            stale_keys = []
+            for key, entry_size in rows:
+                if count <= self.max_entries and (self.max_bytes is None or size <= self.max_bytes):
+                    break
+                stale_keys.append((key,))
+                count -= 1
+                size -= entry_size
+            if not stale_keys:
+                return
+
+            connection.executemany('DELETE FROM llm_cache WHERE key = ?', stale_keys)
+            self.evictions += len(stale_keys)
+
+
+class LLMResponseCache:
+    def __init__(self, backend: CacheBackend = None, ttl: Optional[float] = None):
+        self.backend = backend if backend is not None else InMemoryLRUBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, counting the hit or miss
+
+        Args:
+            key (str): Key from make_cache_key
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self.logger.warning(f"Cache read failed, bypassing cache: {e}")
+            value = None
+
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        instrumentation = get_instrumentation()
+        if instrumentation.enabled:
+            instrumentation.count('llm_cache_hits_total' if value is not None else 'llm_cache_misses_total')
+            instrumentation.current_span().set_attribute('cache_hit', value is not None)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response; write failures are logged, never raised
+
+        Args:
+            key (str): Key from make_cache_key
+            value (str): Response text
+        """
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self.logger.warning(f"Cache write failed: {e}")
+
+    def get_or_create(self, key: str, create: Callable[[], str]) -> str:
+        """
+        Return the cached response for key, calling create on a miss
+
+        Args:
+            key (str): Key from make_cache_key
+            create (Callable): Produces the response text when not cached
+
+        Returns:
+            str: Cached or freshly created response text
+        """
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache effectiveness counters
+
+        Returns:
+            Dict with hits, misses, hit_rate, evictions and entries
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'evictions': self.backend.evictions,
+            'entries': len(self.backend)
+        }
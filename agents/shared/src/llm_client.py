@@ -0,0 +1,396 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Dict, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import get_instrumentation, traced
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+
+
+class LLMClientError(Exception):
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ResponseObject(dict):
+    """JSON response with attribute access, e.g. response.choices[0].message.content."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def to_response_object(value):
+    """Convert decoded JSON to ResponseObjects, recursively."""
+    if isinstance(value, dict):
+        return ResponseObject({key: to_response_object(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_response_object(item) for item in value]
+    return value
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float = None):
+        self.rate = rate_per_second
+        self.capacity = capacity if capacity is not None else rate_per_second * 60
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """
+        Block until amount tokens are available, then take them
+
+        Requests larger than the bucket are clamped to its capacity so
+        they wait for a full bucket instead of forever.
+
+        Args:
+            amount (float): Tokens to take
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens once actual usage is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AIMDLimit:
+    """
+    AIMD limit on in-flight requests
+
+    The limit halves when the provider signals overload (429/5xx) and grows
+    by roughly one slot per limit's worth of successful calls. Subclasses
+    decide how callers wait for a slot.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.limit = float(initial)
+        self.in_flight = 0
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _finish(self, overloaded: bool) -> None:
+        self.in_flight -= 1
+        if overloaded:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class AdaptiveConcurrencyLimiter(AIMDLimit):
+    """AIMDLimit whose callers wait on a thread condition."""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        super().__init__(initial=initial, minimum=minimum, maximum=maximum, decrease_factor=decrease_factor)
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            self._condition.wait_for(self._has_slot)
+            self.in_flight += 1
+
+    def release(self, overloaded: bool = False) -> None:
+        with self._condition:
+            self._finish(overloaded)
+            self._condition.notify_all()
+
+
+class CompletionStream:
+    """
+    Iterator over streamed completion chunks; close() drops the connection
+
+    on_usage receives the usage of the closing chunk, sent when the request
+    asked for stream_options.include_usage.
+    """
+
+    def __init__(self, response: requests.Response, on_close, on_usage=None):
+        self._response = response
+        self._on_close = on_close
+        self._on_usage = on_usage
+        self._closed = False
+
+    def __iter__(self) -> Iterator[ResponseObject]:
+        try:
+            for line in self._response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                chunk = to_response_object(json.loads(data))
+                if chunk.get('usage') and self._on_usage is not None:
+                    self._on_usage(chunk['usage'])
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._response.close()
+            self._on_close()
+
+
+class LLMClientBase:
+    """
+    Retry policy, token accounting and counters shared by the chat completion clients
+
+    Subclasses make the HTTP calls and set request_bucket, token_bucket and
+    limiter; this class decides how long to back off, settles estimated
+    tokens against reported usage and keeps the request counters.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 120.0
+    ):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.request_bucket = None
+        self.token_bucket = None
+        self.limiter: AIMDLimit = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'server_errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report request counters and the current adaptive concurrency limit
+
+        Returns:
+            Dict with requests, retries, throttled, server_errors, concurrency_limit and in_flight
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['concurrency_limit'] = int(self.limiter.limit)
+        stats['in_flight'] = self.limiter.in_flight
+        return stats
+
+    def _headers(self) -> Dict[str, str]:
+        return {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def _retry_delay(self, attempt: int, error: LLMClientError, retry_after: Optional[float]) -> float:
+        """Count and log a retry, and return the seconds to wait before it."""
+        self._count('retries')
+        get_instrumentation().current_span().add('retries', 1)
+        get_instrumentation().count('llm_retries_total', status=error.status_code or 'connection')
+        delay = self._backoff(attempt, retry_after)
+        self.logger.warning(f"{error}; retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+        return delay
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps agents that were throttled together from retrying in lockstep
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _retry_after(self, response) -> Optional[float]:
+        try:
+            return min(float(response.headers['Retry-After']), self.backoff_max)
+        except (KeyError, ValueError):
+            return None
+
+    def _estimate_tokens(self, request: Dict) -> float:
+        """Rough prompt size (4 characters per token) plus the completion budget."""
+        prompt_characters = sum(len(str(message.get('content', ''))) for message in request.get('messages', []))
+        return prompt_characters / 4 + request.get('max_tokens', 0)
+
+    def _record_usage(self, model: str, estimated_tokens: float, body: Dict) -> None:
+        self._settle_tokens(estimated_tokens, body)
+        get_instrumentation().record_llm_usage(model, body.get('usage'))
+
+    def _settle_tokens(self, estimated_tokens: float, body: Dict) -> None:
+        if self.token_bucket is None:
+            return
+        usage = body.get('usage') or {}
+        if 'total_tokens' in usage:
+            self.token_bucket.adjust(estimated_tokens - usage['total_tokens'])
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+
+class LLMClient(LLMClientBase):
+    """
+    Chat completion client shared by all agents in a process
+
+    One keep-alive connection pool, request and token rate limits enforced
+    by token buckets, adaptive concurrency and jittered retries on 429/5xx.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        pool_size: int = 32,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        initial_concurrency: int = 8,
+        max_concurrency: int = 64,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 120.0
+    ):
+        super().__init__(api_key, base_url, max_retries, backoff_base, backoff_max, timeout)
+        self.request_bucket = TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60) if tokens_per_minute else None
+        self.limiter = AdaptiveConcurrencyLimiter(initial=initial_concurrency, maximum=max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @traced(attributes=lambda self, stream=False, **request: {'model': request.get('model'), 'stream': stream})
+    def chat_completion(self, stream: bool = False, **request):
+        """
+        Create a chat completion
+
+        Args:
+            stream (bool): Return a CompletionStream of chunks instead of one response
+            **request: Chat completion parameters (model, messages, max_tokens, ...)
+
+        Returns:
+            ResponseObject or CompletionStream
+
+        Raises:
+            LLMClientError: On a non-retryable error or once retries are exhausted
+        """
+        payload = dict(request)
+        if stream:
+            # Without include_usage a stream reports no token counts at all
+            payload.update(stream=True, stream_options=request.get('stream_options') or {'include_usage': True})
+        estimated_tokens = self._estimate_tokens(request)
+
+        for attempt in range(self.max_retries + 1):
+            if self.request_bucket is not None:
+                self.request_bucket.acquire()
+            if self.token_bucket is not None:
+                self.token_bucket.acquire(estimated_tokens)
+            self.limiter.acquire()
+            self._count('requests')
+
+            retry_after = None
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/chat/completions",
+                    json=payload,
+                    headers=self._headers(),
+                    timeout=self.timeout,
+                    stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.limiter.release(overloaded=True)
+                error = LLMClientError(f"LLM request failed: {e}")
+            except Exception:
+                self.limiter.release()
+                raise
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    self._count('throttled' if response.status_code == 429 else 'server_errors')
+                    retry_after = self._retry_after(response)
+                    error = LLMClientError(
+                        f"LLM request failed with status {response.status_code}", response.status_code
+                    )
+                    response.close()
+                    self.limiter.release(overloaded=True)
+                elif response.status_code >= 400:
+                    message = response.text
+                    response.close()
+                    self.limiter.release()
+                    raise LLMClientError(
+                        f"LLM request rejected with status {response.status_code}: {message}",
+                        response.status_code
+                    )
+                elif stream:
+                    return CompletionStream(
+                        response,
+                        self.limiter.release,
+                        lambda usage: self._record_usage(request.get('model'), estimated_tokens, {'usage': usage})
+                    )
+                else:
+                    try:
+                        body = to_response_object(response.json())
+                    finally:
+                        self.limiter.release()
+                    self._record_usage(request.get('model'), estimated_tokens, body)
+                    return body
+
+            if attempt == self.max_retries:
+                raise error
+            time.sleep(self._retry_delay(attempt, error, retry_after))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> LLMClient:
+    """
+    Return the process-wide client, configured from the environment on first use
+
+    Environment: OPENAI_API_KEY, OPENAI_BASE_URL, LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE, LLM_MAX_CONCURRENCY.
+
+    Returns:
+        LLMClient: The shared client
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                base_url=os.getenv('OPENAI_BASE_URL'),
+                requests_per_minute=float(os.getenv('LLM_REQUESTS_PER_MINUTE', 0)) or None,
+                tokens_per_minute=float(os.getenv('LLM_TOKENS_PER_MINUTE', 0)) or None,
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 64))
+            )
+        return _shared_client
+
+
+def set_shared_client(client: LLMClient) -> None:
+    """Replace the process-wide client, e.g. to point agents at a local stand-in server."""
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = client
@@ -0,0 +1,189 @@
+import math
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+from llm_client import LLMClient
+from instrumentation import get_instrumentation
+
+
+class LatencyTracker:
+    """Sliding window of call latencies with a percentile estimate."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Latency below which the given fraction of recent calls finished
+
+        Args:
+            fraction (float): e.g. 0.95 for p95
+
+        Returns:
+            Optional[float]: Seconds, or None until min_samples calls were recorded
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, math.ceil(fraction * len(samples)) - 1)]
+
+
+class HedgedLLMClient:
+    """
+    Chat completion client that hedges slow calls against a second endpoint
+
+    Each call goes to the primary client. If it has not answered within the
+    primary's tracked latency percentile (p95 by default), the same request
+    is also sent to the secondary - another client, another model, or both -
+    and the first successful response wins; a failed response waits for the
+    other. Until enough latencies have been seen, initial_delay is used, and
+    with no initial_delay calls are not hedged.
+
+    The hedge delay runs from the moment a pool thread starts the primary
+    call, so time queued behind other calls never triggers a hedge. The
+    pool is sized from the wrapped clients' concurrency limits unless
+    max_workers is given. The losing call is left to finish in the
+    background, so hedging at p95 costs about 5% extra requests. Streams
+    are never hedged.
+
+    Counts llm_hedged_requests_total and llm_hedge_wins_total (by winner).
+    """
+
+    def __init__(
+        self,
+        primary: LLMClient,
+        secondary: LLMClient = None,
+        secondary_model: str = None,
+        percentile: float = 0.95,
+        initial_delay: float = None,
+        min_delay: float = 0.0,
+        window: int = 200,
+        min_samples: int = 20,
+        max_workers: int = None
+    ):
+        if secondary is None and secondary_model is None:
+            raise ValueError("Hedging needs a secondary client or a secondary model")
+        self.primary = primary
+        self.secondary = secondary if secondary is not None else primary
+        self.secondary_model = secondary_model
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.latency = LatencyTracker(window=window, min_samples=min_samples)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        if max_workers is None:
+            max_workers = self._concurrency_limit(self.primary)
+            if self.secondary is not self.primary:
+                max_workers += self._concurrency_limit(self.secondary)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-hedge')
+        self._stats = {'requests': 0, 'hedged': 0, 'primary_wins': 0, 'secondary_wins': 0, 'failures': 0}
+        self._stats_lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for the primary before hedging, or None to not hedge."""
+        delay = self.latency.percentile(self.percentile)
+        if delay is None:
+            delay = self.initial_delay
+        return max(delay, self.min_delay) if delay is not None else None
+
+    def chat_completion(self, stream: bool = False, **request):
+        """
+        Create a chat completion, hedging it when the primary is slow
+
+        Args:
+            stream (bool): Return the primary's CompletionStream, unhedged
+            **request: Chat completion parameters (model, messages, max_tokens, ...)
+
+        Returns:
+            ResponseObject or CompletionStream
+
+        Raises:
+            LLMClientError: When the primary fails before the hedge, or both calls fail
+        """
+        if stream:
+            return self.primary.chat_completion(stream=True, **request)
+
+        self._count('requests')
+        delay = self.hedge_delay()
+        started = threading.Event()
+        primary = self._submit(self._call_primary, dict(request, _started=started))
+        # A call that never starts (cancelled on close) must not block here
+        primary.add_done_callback(lambda _: started.set())
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count('hedged')
+        instrumentation = get_instrumentation()
+        if instrumentation.enabled:
+            instrumentation.count('llm_hedged_requests_total')
+        secondary_request = dict(request, model=self.secondary_model) if self.secondary_model else request
+        secondary = self._submit(self.secondary.chat_completion, secondary_request)
+
+        pending = {primary, secondary}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = 'primary' if future is primary else 'secondary'
+                    self._count(f"{winner}_wins")
+                    if instrumentation.enabled:
+                        instrumentation.count('llm_hedge_wins_total', winner=winner)
+                    return future.result()
+
+        self._count('failures')
+        self.logger.warning(f"Hedged request failed on both endpoints: {secondary.exception()}")
+        return primary.result()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report hedging counters
+
+        Returns:
+            Dict with requests, hedged, primary_wins, secondary_wins, failures,
+            hedge_rate, hedge_win_rate (secondary wins per hedge) and the current hedge_delay
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['hedge_rate'] = stats['hedged'] / stats['requests'] if stats['requests'] else 0.0
+        stats['hedge_win_rate'] = stats['secondary_wins'] / stats['hedged'] if stats['hedged'] else 0.0
+        stats['hedge_delay'] = self.hedge_delay()
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, function, request: Dict) -> Future:
+        # Each call runs in a copy of the caller's context so its span nests
+        # under the caller's
+        return self._executor.submit(contextvars.copy_context().run, function, **request)
+
+    def _call_primary(self, _started: threading.Event, **request):
+        _started.set()
+        start = time.perf_counter()
+        response = self.primary.chat_completion(**request)
+        # Recorded even when the hedge won, so slow calls keep raising the percentile
+        self.latency.record(time.perf_counter() - start)
+        return response
+
+    def _concurrency_limit(self, client) -> int:
+        # A limiter-less client (a mock, another wrapper) gets a modest default
+        limiter = getattr(client, 'limiter', None)
+        return getattr(limiter, 'maximum', None) or 32
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
@@ -0,0 +1,82 @@
+import os
+import logging
+import threading
+from typing import Dict
+from instrumentation import get_instrumentation
+
+# Model per planner complexity once routing is enabled; anything else (or no
+# complexity) gets DEFAULT_MODEL
+DEFAULT_TIERS = {'LOW': 'gpt-4o-mini', 'MEDIUM': 'gpt-4o', 'HIGH': 'gpt-4-turbo'}
+DEFAULT_MODEL = 'gpt-4-turbo'
+
+
+class ModelRouter:
+    """
+    Chooses the model for an LLM call from the complexity of its task or step
+
+    The planner rates tasks LOW, MEDIUM or HIGH; trivial work can then go to
+    a cheaper, faster tier. Every decision is counted, locally and as the
+    llm_route_decisions_total counter labelled by complexity and model.
+    """
+
+    def __init__(self, tiers: Dict[str, str] = None, default_model: str = DEFAULT_MODEL):
+        self.tiers = {complexity.upper(): model for complexity, model in (DEFAULT_TIERS if tiers is None else tiers).items()}
+        self.default_model = default_model
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._decisions: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'ModelRouter':
+        """
+        Build a router from the environment
+
+        Routing is opt-in: unless LLM_MODEL_ROUTING is set to 1/true/yes,
+        only the tiers named by LLM_MODEL_LOW, LLM_MODEL_MEDIUM and
+        LLM_MODEL_HIGH are routed, and every other call keeps
+        LLM_MODEL_DEFAULT. With routing on, those variables override
+        DEFAULT_TIERS.
+
+        Returns:
+            ModelRouter: The configured router
+        """
+        routing = os.getenv('LLM_MODEL_ROUTING', '').strip().lower() in ('1', 'true', 'yes')
+        tiers = {}
+        for complexity, model in DEFAULT_TIERS.items():
+            model = os.getenv(f"LLM_MODEL_{complexity}") or (model if routing else None)
+            if model:
+                tiers[complexity] = model
+        return cls(tiers=tiers, default_model=os.getenv('LLM_MODEL_DEFAULT') or DEFAULT_MODEL)
+
+    def route(self, complexity: str = None) -> str:
+        """
+        Pick the model for a call
+
+        Args:
+            complexity (str, optional): Task or step complexity, e.g. 'LOW'
+
+        Returns:
+            str: Model name
+        """
+        tier = complexity.strip().upper() if isinstance(complexity, str) else None
+        if tier not in self.tiers:
+            tier = 'DEFAULT'
+        model = self.tiers.get(tier, self.default_model)
+
+        with self._lock:
+            models = self._decisions.setdefault(tier, {})
+            models[model] = models.get(model, 0) + 1
+        instrumentation = get_instrumentation()
+        if instrumentation.enabled:
+            instrumentation.count('llm_route_decisions_total', complexity=tier, model=model)
+        return model
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Report routing decisions
+
+        Returns:
+            Dict: Decision counts per complexity ('DEFAULT' when unknown), then per model
+        """
+        with self._lock:
+            return {tier: dict(models) for tier, models in self._decisions.items()}
@@ -0,0 +1,288 @@
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from instrumentation import get_instrumentation
+
+_WORD = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'to', 'in', 'on', 'with', 'into', 'from',
+    'by', 'as', 'is', 'be', 'that', 'this', 'it', 'its', 'using', 'new',
+))
+
+
+def description_shingles(text: str) -> Set[str]:
+    """
+    Reduce a step description to word unigrams and bigrams
+
+    Case, punctuation, stopwords and plural 's' are dropped, so
+    'Create the User model' and 'create user models' share every shingle.
+
+    Args:
+        text (str): Step description
+
+    Returns:
+        Set[str]: Shingles; empty when the text has no content words
+    """
+    words = [
+        word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+        for word in _WORD.findall(text.lower())
+        if word not in STOPWORDS
+    ]
+    shingles = set(words)
+    shingles.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return shingles
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def _shingles_hash(shingles: Set[str]) -> str:
+    return hashlib.sha256('\0'.join(sorted(shingles)).encode('utf-8')).hexdigest()
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class SnippetIndex:
+    """
+    On-disk near-duplicate index of accepted snippets, keyed by step description
+
+    Descriptions are MinHashed (num_perm 32-bit hashes per shingle, from
+    one seeded SHAKE-128 digest) and the signature split into LSH bands;
+    each band is a bucket row in SQLite, so a lookup is a handful of
+    indexed reads whatever the index size, and inserts are incremental.
+    The max_candidates snippets sharing the most bands are verified with
+    the exact Jaccard similarity of their description shingles. With the
+    default 16 bands of 4 rows, pairs at 0.5 similarity become candidates
+    about half the time and pairs at 0.8 almost always.
+
+    One connection is shared by the index's callers behind a lock; several
+    processes can open the same file.
+    """
+
+    def __init__(
+        self,
+        path: str = ':memory:',
+        threshold: float = 0.6,
+        num_perm: int = 64,
+        bands: int = 16,
+        seed: int = 1,
+        max_candidates: int = 16
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        self.max_candidates = max_candidates
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._salt = seed.to_bytes(8, 'little', signed=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._initialize()
+
+    def _initialize(self) -> None:
+        connection = self._connection
+        with connection:
+            if self.path != ':memory:':
+                connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS snippet_index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS snippets ('
+                'id INTEGER PRIMARY KEY, description TEXT NOT NULL, code TEXT NOT NULL, '
+                'code_hash TEXT NOT NULL, created_at REAL NOT NULL, shingles_hash TEXT)'
+            )
+            columns = {row[1] for row in connection.execute('PRAGMA table_info(snippets)')}
+            if 'shingles_hash' not in columns:
+                # Indexes written before exact matches were looked up by hash
+                connection.execute('ALTER TABLE snippets ADD COLUMN shingles_hash TEXT')
+                connection.executemany('UPDATE snippets SET shingles_hash = ? WHERE id = ?', [
+                    (_shingles_hash(description_shingles(description)), snippet_id)
+                    for snippet_id, description in connection.execute('SELECT id, description FROM snippets').fetchall()
+                ])
+            connection.execute('CREATE INDEX IF NOT EXISTS snippets_shingles ON snippets (shingles_hash)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS snippet_buckets ('
+                'bucket INTEGER NOT NULL, snippet_id INTEGER NOT NULL, '
+                'PRIMARY KEY (bucket, snippet_id)) WITHOUT ROWID'
+            )
+            settings = {'num_perm': str(self.num_perm), 'bands': str(self.bands), 'seed': str(self.seed)}
+            stored = dict(connection.execute('SELECT key, value FROM snippet_index_meta').fetchall())
+            if stored and stored != settings:
+                raise ValueError(f"Snippet index {self.path} was built with {stored}, not {settings}")
+            connection.executemany('INSERT OR IGNORE INTO snippet_index_meta VALUES (?, ?)', settings.items())
+
+    def signature(self, shingles: Iterable[str]) -> List[int]:
+        """
+        MinHash signature of a shingle set
+
+        Args:
+            shingles (Iterable[str]): Description shingles
+
+        Returns:
+            List[int]: num_perm minimum hash values
+        """
+        # One SHAKE digest per shingle supplies num_perm independent 32-bit
+        # hash values; the column minimums are taken in C by map/zip
+        width = 4 * self.num_perm
+        columns = [
+            array('I', hashlib.shake_128(self._salt + shingle.encode('utf-8')).digest(width))
+            for shingle in shingles
+        ]
+        return list(map(min, zip(*columns)))
+
+    def _buckets(self, signature: Sequence[int]) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            rows = array('I', signature[band * self.rows:(band + 1) * self.rows])
+            # Stored as a signed 64-bit SQLite integer
+            buckets.append(_hash64(band.to_bytes(2, 'little') + rows.tobytes()) - (1 << 63))
+        return buckets
+
+    def query(self, description: str, threshold: float = None) -> Optional[Dict]:
+        """
+        Find the most similar indexed snippet
+
+        Args:
+            description (str): Step description to match
+            threshold (float, optional): Minimum Jaccard similarity; defaults to the index threshold
+
+        Returns:
+            Optional[Dict]: {'id', 'description', 'code', 'similarity'} of the best
+            match at or above the threshold, or None
+        """
+        threshold = self.threshold if threshold is None else threshold
+        shingles = description_shingles(description)
+        match = self._best_match(shingles, self._buckets(self.signature(shingles))) if shingles else None
+        if match is not None and match['similarity'] < threshold:
+            match = None
+
+        with self._lock:
+            if match is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        instrumentation = get_instrumentation()
+        if instrumentation.enabled:
+            instrumentation.count('snippet_index_hits_total' if match is not None else 'snippet_index_misses_total')
+        return match
+
+    def _best_match(self, shingles: Set[str], buckets: List[int]) -> Optional[Dict]:
+        placeholders = ','.join('?' * len(buckets))
+        with self._lock:
+            # Candidates sharing the most bands are the likeliest to be similar,
+            # so only those are verified
+            rows = self._connection.execute(
+                f'SELECT id, description, code FROM ('
+                f'SELECT snippet_id, COUNT(*) AS shared FROM snippet_buckets WHERE bucket IN ({placeholders}) '
+                f'GROUP BY snippet_id ORDER BY shared DESC LIMIT ?) JOIN snippets ON id = snippet_id',
+                (*buckets, self.max_candidates)
+            ).fetchall()
+
+        best = None
+        for snippet_id, description, code in rows:
+            similarity = jaccard(shingles, description_shingles(description))
+            if best is None or similarity > best['similarity']:
+                best = {'id': snippet_id, 'description': description, 'code': code, 'similarity': similarity}
+        return best
+
+    def add(self, description: str, code: str) -> Optional[int]:
+        """
+        Index an accepted snippet
+
+        A snippet whose description matches an indexed one exactly (after
+        shingling) replaces its code rather than adding a near-copy.
+
+        Args:
+            description (str): Step description
+            code (str): Accepted code for the step
+
+        Returns:
+            Optional[int]: Snippet id, or None if the description has no content words
+        """
+        ids = self.add_many([(description, code)])
+        return ids[0] if ids else None
+
+    def add_many(self, snippets: Iterable[Tuple[str, str]]) -> List[int]:
+        """
+        Index several accepted snippets in one transaction
+
+        Args:
+            snippets (Iterable[Tuple[str, str]]): (description, code) pairs
+
+        Returns:
+            List[int]: Snippet ids of the pairs that were indexed
+        """
+        prepared = []
+        for description, code in snippets:
+            shingles = description_shingles(description)
+            if not shingles or not code:
+                continue
+            prepared.append((description, code, shingles, self._buckets(self.signature(shingles))))
+
+        ids = []
+        now = time.time()
+        with self._lock, self._connection as connection:
+            for description, code, shingles, buckets in prepared:
+                code_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+                shingles_hash = _shingles_hash(shingles)
+                existing = connection.execute(
+                    'SELECT id FROM snippets WHERE shingles_hash = ? ORDER BY id LIMIT 1', (shingles_hash,)
+                ).fetchone()
+                if existing is not None:
+                    connection.execute(
+                        'UPDATE snippets SET code = ?, code_hash = ?, created_at = ? WHERE id = ?',
+                        (code, code_hash, now, existing[0])
+                    )
+                    ids.append(existing[0])
+                    continue
+                snippet_id = connection.execute(
+                    'INSERT INTO snippets (description, code, code_hash, created_at, shingles_hash) VALUES (?, ?, ?, ?, ?)',
+                    (description, code, code_hash, now, shingles_hash)
+                ).lastrowid
+                connection.executemany(
+                    'INSERT OR IGNORE INTO snippet_buckets (bucket, snippet_id) VALUES (?, ?)',
+                    [(bucket, snippet_id) for bucket in buckets]
+                )
+                ids.append(snippet_id)
+        return ids
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report lookup counters
+
+        Returns:
+            Dict with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': len(self)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM snippets').fetchone()[0]
@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import unittest
+import subprocess
+from unittest.mock import MagicMock
+from agent_daemon import AgentWorkerDaemon, serve_socket, serve_stdio
+
+IMPORT_BUDGET_SECONDS = 10.0
+JOBS = 20
+
+class TestAgentWorkerDaemon(unittest.TestCase):
+    def setUp(self):
+        self.daemon = AgentWorkerDaemon(max_jobs=2)
+        self.addCleanup(self.daemon.drain, 5)
+        self.daemon.planner = MagicMock()
+        self.responses = []
+        self.responded = threading.Condition()
+
+    def respond(self, message):
+        with self.responded:
+            self.responses.append(message)
+            self.responded.notify_all()
+
+    def wait_for_responses(self, count):
+        with self.responded:
+            self.assertTrue(self.responded.wait_for(lambda: len(self.responses) >= count, 5))
+
+    def test_jobs_run_concurrently(self):
+        release = threading.Event()
+        self.daemon.planner.initialize_plan.side_effect = lambda task: release.wait(5) and {'task_id': task['id']}
+
+        self.daemon.submit({'id': 1, 'method': 'initialize_plan', 'params': {'task': {'id': 'a'}}}, self.respond)
+        self.daemon.submit({'id': 2, 'method': 'initialize_plan', 'params': {'task': {'id': 'b'}}}, self.respond)
+        self.daemon.submit({'id': 3, 'method': 'health'}, self.respond)
+        self.wait_for_responses(1)
+        release.set()
+        self.wait_for_responses(3)
+
+        health = self.responses[0]['result']
+        self.assertEqual(health['in_flight'], 2)
+        self.assertEqual(
+            sorted(response['result']['task_id'] for response in self.responses[1:]), ['a', 'b']
+        )
+
+    def test_drain_finishes_in_flight_jobs_and_rejects_new_ones(self):
+        release = threading.Event()
+        self.daemon.planner.initialize_plan.side_effect = lambda task: release.wait(5) and {'status': 'PLANNING_COMPLETE'}
+        self.daemon.submit({'id': 1, 'method': 'initialize_plan', 'params': {'task': {}}}, self.respond)
+
+        drained = []
+        drainer = threading.Thread(target=lambda: drained.append(self.daemon.drain(timeout=5)))
+        drainer.start()
+        while not self.daemon.draining:
+            time.sleep(0.01)
+        self.daemon.submit({'id': 2, 'method': 'initialize_plan', 'params': {'task': {}}}, self.respond)
+        release.set()
+        drainer.join(5)
+
+        self.assertEqual(drained, [True])
+        by_id = {response['id']: response for response in self.responses}
+        self.assertEqual(by_id[1]['result'], {'status': 'PLANNING_COMPLETE'})
+        self.assertEqual(by_id[2], {'id': 2, 'ok': False, 'error': 'Worker is draining'})
+        self.assertEqual(self.daemon.health()['status'], 'draining')
+
+    def test_failed_job_reports_error(self):
+        self.daemon.planner.initialize_plan.side_effect = RuntimeError('boom')
+
+        self.daemon.submit({'id': 7, 'method': 'initialize_plan', 'params': {'task': {}}}, self.respond)
+        self.wait_for_responses(1)
+
+        self.assertEqual(self.responses[0], {'id': 7, 'ok': False, 'error': 'boom'})
+        self.assertEqual(self.daemon.health()['failed'], 1)
+
+    def test_stdio_protocol(self):
+        self.daemon.planner.initialize_plan.return_value = {'status': 'PLANNING_COMPLETE'}
+        stdin = io.StringIO(
+            '{"id": 1, "method": "initialize_plan", "params": {"task": {}}}\n'
+            'not json\n'
+            '{"id": 2, "method": "unknown"}\n'
+        )
+        stdout = io.StringIO()
+
+        serve_stdio(self.daemon, stdin, stdout)
+
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(lines[0]['event'], 'ready')
+        by_id = {line.get('id'): line for line in lines[1:]}
+        self.assertTrue(by_id[1]['ok'])
+        self.assertIn('Invalid JSON', by_id[None]['error'])
+        self.assertEqual(by_id[2]['error'], "Unknown method 'unknown'")
+
+    def test_socket_protocol(self):
+        self.daemon.planner.initialize_plan.side_effect = lambda task: {'task_id': task['id']}
+        server = serve_socket(self.daemon, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with socket.create_connection(server.server_address, timeout=5) as connection:
+            for index in range(3):
+                request = {'id': index, 'method': 'initialize_plan', 'params': {'task': {'id': f"task-{index}"}}}
+                connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            connection.shutdown(socket.SHUT_WR)
+            responses = [json.loads(line) for line in connection.makefile('r')]
+
+        self.assertEqual(sorted(response['result']['task_id'] for response in responses), ['task-0', 'task-1', 'task-2'])
+
+class TestStartupBudget(unittest.TestCase):
+    def test_imports_are_paid_once_per_process(self):
+        daemon_path = os.path.join(
+            os.path.dirname(__file__), '..', '..', 'agents', 'orchestrator', 'src', 'agent_daemon.py'
+        )
+        process = subprocess.Popen(
+            [sys.executable, daemon_path, '--max-jobs', '2'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        self.addCleanup(process.kill)
+        ready = json.loads(process.stdout.readline())
+
+        start = time.perf_counter()
+        for index in range(JOBS):
+            request = {
+                'id': index,
+                'method': 'review_code',
+                'params': {'code': {'generated_code': {'app.py': f"value = {index}\n"}}}
+            }
+            process.stdin.write(json.dumps(request) + '\n')
+        process.stdin.flush()
+        responses = [json.loads(process.stdout.readline()) for _ in range(JOBS)]
+        jobs_seconds = time.perf_counter() - start
+
+        process.stdin.write(json.dumps({'id': 'health', 'method': 'health'}) + '\n')
+        process.stdin.close()
+        health = json.loads(process.stdout.readline())['result']
+        process.wait(10)
+        process.stdout.close()
+
+        self.assertEqual(sorted(response['id'] for response in responses), list(range(JOBS)))
+        self.assertLess(ready['import_seconds'], IMPORT_BUDGET_SECONDS)
+        self.assertEqual(health['pid'], ready['pid'])
+        self.assertEqual(health['modules'], ready['modules'])
+        self.assertLess(jobs_seconds / JOBS, ready['startup_seconds'])
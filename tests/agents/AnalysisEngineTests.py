@@ -0,0 +1,61 @@
+import unittest
+from analysis_engine import CodeAnalysisEngine
+
+class TestCodeAnalysisEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = CodeAnalysisEngine()
+        long_body = "\n".join(f"        value += {n}" for n in range(21))
+        self.sample_code = f'''
+class UserService:
+    def outer(self, value):
+{long_body}
+        return value
+
+def top_level(value):
+{long_body.replace("        ", "    ")}
+    return value
+
+if True:
+    for item in range(3):
+        while item:
+            if item > 1:
+                item -= 1
+'''
+
+    def test_structure_report(self):
+        report = self.engine.analyze_code_structure(self.sample_code)
+
+        self.assertEqual(report['function_count'], 2)
+        self.assertEqual(report['class_count'], 1)
+        self.assertEqual(report['complexity_metrics'], {'total_complexity': 5, 'branch_points': 4})
+
+    def test_code_smells_in_breadth_first_order(self):
+        report = self.engine.analyze_code_structure(self.sample_code)
+
+        self.assertEqual(report['potential_issues'], [
+            'Long method detected: top_level',
+            'Long method detected: outer',
+            'High nested complexity: 4 levels'
+        ])
+
+    def test_syntax_error_reported(self):
+        report = self.engine.analyze_code_structure('def broken(:')
+
+        self.assertIn('error', report)
+
+    def test_snippet_parsed_once_across_analyses(self):
+        context = self.engine.get_context(self.sample_code)
+
+        self.engine.analyze_code_structure(self.sample_code)
+        self.engine.security_vulnerability_scan(self.sample_code)
+
+        self.assertIs(self.engine.get_context(self.sample_code), context)
+        self.assertIs(context.tree, self.engine.get_context(self.sample_code).tree)
+        self.assertTrue(len(context.tokens) > 0)
+
+    def test_context_cache_is_bounded(self):
+        engine = CodeAnalysisEngine(context_cache_size=2)
+        for n in range(5):
+            engine.analyze_code_structure(f'value = {n}')
+
+        self.assertEqual(len(engine.contexts), 2)
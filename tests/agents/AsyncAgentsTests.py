@@ -0,0 +1,218 @@
+import os
+import time
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+from fake_openai_server import FakeOpenAIServer, parse_latency
+from agent_fixtures import STRATEGY, USER_MODEL_CODE
+from async_llm_client import AsyncConcurrencyLimiter, AsyncLLMClient, aclose_loop_client, get_loop_client
+from llm_client import LLMClientError
+from planner import CodePlannerAgent
+from generator import CodeGenerationAgent
+from reviewer import CodeReviewAgent
+from step_scheduler import StepScheduler
+
+PLAN = {
+    'task_id': 'async-task',
+    'implementation_steps': [
+        {'name': 'user_model', 'description': 'Create user model', 'dependencies': []},
+        {'name': 'login_endpoint', 'description': 'Implement login', 'dependencies': ['user_model']}
+    ]
+}
+REQUEST = {'model': 'gpt-4-turbo', 'messages': [{'role': 'user', 'content': 'Create user model'}], 'max_tokens': 50}
+
+class TestAsyncLLMClient(unittest.IsolatedAsyncioTestCase):
+    async def test_throttling_is_retried(self):
+        with FakeOpenAIServer(content='class User: pass', statuses=[429, 503]) as server:
+            async with AsyncLLMClient(base_url=server.base_url, backoff_base=0.01) as client:
+                response = await client.chat_completion(**REQUEST)
+
+        self.assertEqual(response.choices[0].message.content, 'class User: pass')
+        self.assertEqual(client.stats()['retries'], 2)
+        self.assertEqual(client.stats()['in_flight'], 0)
+
+    async def test_client_errors_are_not_retried(self):
+        with FakeOpenAIServer(statuses=[400]) as server:
+            async with AsyncLLMClient(base_url=server.base_url) as client:
+                with self.assertRaises(LLMClientError):
+                    await client.chat_completion(**REQUEST)
+
+        self.assertEqual(client.stats()['requests'], 1)
+
+    async def test_timeout_and_cancellation_free_the_slot(self):
+        with FakeOpenAIServer(latency=parse_latency('constant:0.5')) as server:
+            async with AsyncLLMClient(base_url=server.base_url) as client:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await client.chat_completion(timeout=0.05, **REQUEST)
+
+                call = asyncio.ensure_future(client.chat_completion(**REQUEST))
+                await asyncio.sleep(0.05)
+                call.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await call
+
+                self.assertEqual(client.stats()['in_flight'], 0)
+
+    async def test_concurrent_calls_overlap(self):
+        with FakeOpenAIServer(latency=parse_latency('constant:0.2')) as server:
+            async with AsyncLLMClient(base_url=server.base_url, initial_concurrency=64, max_concurrency=64) as client:
+                start = time.perf_counter()
+                responses = await asyncio.gather(*(client.chat_completion(**REQUEST) for _ in range(64)))
+                elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(responses), 64)
+        self.assertLess(elapsed, 64 * 0.2 / 4)
+
+    async def test_limiter_caps_in_flight_coroutines(self):
+        limiter = AsyncConcurrencyLimiter(initial=2, maximum=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            await limiter.release()
+
+        await asyncio.gather(*(call() for _ in range(10)))
+
+        self.assertEqual(peak, 2)
+
+class TestAsyncAgents(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeOpenAIServer(
+            content='def login(): pass',
+            templates=[('strategy generator', STRATEGY)]
+        ).__enter__()
+        self.client = AsyncLLMClient(base_url=self.server.base_url)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.server.__exit__(None, None, None)
+
+    async def test_async_planning_matches_sync_plan_shape(self):
+        planner = CodePlannerAgent(async_llm_client=self.client)
+
+        plan = await planner.ainitialize_plan({'id': 'async-task', 'title': 'Login'})
+
+        self.assertEqual(plan['status'], 'PLANNING_COMPLETE')
+        self.assertEqual(plan['estimated_complexity'], 'LOW')
+        self.assertEqual(plan['execution_levels'], [['user_model'], ['login_endpoint']])
+        self.assertEqual(self.server.requests[0]['model'], 'gpt-4-turbo')
+
+    async def test_async_generation_passes_dependency_output(self):
+        self.server.content = USER_MODEL_CODE
+        generator = CodeGenerationAgent(async_llm_client=self.client)
+
+        result = await generator.agenerate_code(PLAN)
+
+        self.assertEqual(result['status'], 'CODE_GENERATION_COMPLETE')
+        self.assertEqual(list(result['generated_code']), ['user_model', 'login_endpoint'])
+        login_request = self.server.requests[1]
+        self.assertIn(USER_MODEL_CODE.strip(), login_request['messages'][1]['content'])
+
+    async def test_async_generation_timeout_fails_in_band(self):
+        self.server.latency = parse_latency('constant:0.5')
+        generator = CodeGenerationAgent(async_llm_client=self.client)
+
+        result = await generator.agenerate_code(PLAN, timeout=0.05)
+
+        self.assertEqual(result['status'], 'GENERATION_FAILED')
+        self.assertIn('timed out', result['error'])
+        self.assertEqual(self.client.stats()['in_flight'], 0)
+
+    async def test_async_review_matches_sync_review(self):
+        reviewer = CodeReviewAgent()
+        code = {'task_id': 'async-task', 'generated_code': {'models.py': USER_MODEL_CODE}}
+
+        review = await reviewer.areview_code(code)
+
+        self.assertEqual(review, reviewer.review_code(code))
+
+    async def test_async_review_runs_on_a_process_pool(self):
+        code = {'task_id': 'async-task', 'generated_code': {'models.py': USER_MODEL_CODE}}
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            reviewer = CodeReviewAgent(executor=executor)
+
+            review = await reviewer.areview_code(code)
+
+        self.assertEqual(review, CodeReviewAgent().review_code(code))
+
+    async def test_async_review_executor_errors_fail_in_band(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown()
+
+        review = await CodeReviewAgent(executor=executor).areview_code({'generated_code': {}})
+
+        self.assertEqual(review['status'], 'REVIEW_FAILED')
+
+class TestLoopClients(unittest.TestCase):
+    def test_agents_work_across_event_loops(self):
+        with FakeOpenAIServer(
+            content='def login(): pass',
+            templates=[('strategy generator', STRATEGY)]
+        ) as server, patch.dict(os.environ, {'OPENAI_BASE_URL': server.base_url}):
+            planner = CodePlannerAgent()
+            generator = CodeGenerationAgent()
+
+            for _ in range(2):
+                self.assertEqual(asyncio.run(planner.ainitialize_plan({'id': 'async-task'}))['status'], 'PLANNING_COMPLETE')
+                self.assertEqual(asyncio.run(generator.agenerate_code(PLAN))['status'], 'CODE_GENERATION_COMPLETE')
+
+    def test_loop_clients_close_with_their_loop(self):
+        async def loop_client():
+            return get_loop_client()
+
+        clients = [asyncio.run(loop_client()) for _ in range(2)]
+
+        self.assertIsNot(clients[0], clients[1])
+        self.assertTrue(all(session.is_closed for client in clients for session in client.sessions))
+
+    def test_loop_client_can_be_closed_explicitly(self):
+        async def close_early():
+            client = get_loop_client()
+            await aclose_loop_client()
+            return client, get_loop_client()
+
+        closed, replacement = asyncio.run(close_early())
+
+        self.assertTrue(all(session.is_closed for session in closed.sessions))
+        self.assertIsNot(replacement, closed)
+
+class TestAsyncStepScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_dependencies_finish_first(self):
+        order = []
+
+        async def worker(step):
+            await asyncio.sleep(0.01 if step['name'] == 'a' else 0)
+            order.append(step['name'])
+            return step['name'].upper()
+
+        steps = [
+            {'name': 'c', 'dependencies': ['a', 'b']},
+            {'name': 'a', 'dependencies': []},
+            {'name': 'b', 'dependencies': []}
+        ]
+        results = await StepScheduler(max_concurrency=2).arun(steps, worker)
+
+        self.assertEqual(results, ['C', 'A', 'B'])
+        self.assertEqual(order[-1], 'c')
+
+    async def test_failure_cancels_remaining_steps(self):
+        started = []
+
+        async def worker(step):
+            started.append(step['name'])
+            if step['name'] == 'a':
+                raise RuntimeError('boom')
+            await asyncio.sleep(1)
+
+        steps = [{'name': 'a'}, {'name': 'b'}, {'name': 'c', 'dependencies': ['a']}]
+        with self.assertRaises(RuntimeError):
+            await StepScheduler().arun(steps, worker)
+
+        self.assertNotIn('c', started)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from fake_openai_server import FakeOpenAIServer
+from agent_fixtures import STRATEGY, USER_MODEL_CODE
+from batch_jobs import BatchJob, LocalBatchExecutor, OpenAIBatchExecutor
+from llm_client import LLMClient
+from planner import CodePlannerAgent
+from generator import CodeGenerationAgent
+
+TASKS = [{'id': f"task-{index}", 'title': f"Login {index}"} for index in range(3)]
+PLANS = [
+    {
+        'task_id': f"task-{index}",
+        'implementation_steps': [
+            {'name': 'user_model', 'description': f"Create user model {index}", 'dependencies': []},
+            {'name': 'login_endpoint', 'description': f"Implement login {index}", 'dependencies': ['user_model']}
+        ]
+    }
+    for index in range(2)
+]
+
+
+class CrashingExecutor(LocalBatchExecutor):
+    """Stands in for a process that dies after submitting its first batch."""
+
+    def _start(self, batch_id):
+        pass
+
+    def status(self, batch_id):
+        raise KeyboardInterrupt('process stopped')
+
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.job_directory = os.path.join(self.directory, 'job')
+        self.server = FakeOpenAIServer(
+            content=USER_MODEL_CODE,
+            templates=[('strategy generator', STRATEGY)]
+        ).__enter__()
+        self.client = LLMClient(base_url=self.server.base_url, backoff_base=0.01)
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        shutil.rmtree(self.directory)
+
+    def executor(self, executor_class=LocalBatchExecutor, **kwargs):
+        return executor_class(os.path.join(self.directory, 'batches'), client=self.client, **kwargs)
+
+    def request_files(self):
+        return sorted(name for name in os.listdir(self.job_directory) if name.startswith('requests-'))
+
+    def test_planning_batch_writes_openai_batch_requests(self):
+        planner = CodePlannerAgent(llm_client=self.client)
+
+        plans = planner.initialize_plans_batch(TASKS, self.job_directory, self.executor(), poll_interval=0.01)
+
+        self.assertEqual([plan['status'] for plan in plans], ['PLANNING_COMPLETE'] * 3)
+        self.assertEqual([plan['task_id'] for plan in plans], ['task-0', 'task-1', 'task-2'])
+        self.assertEqual(plans[0]['execution_levels'], [['user_model'], ['login_endpoint']])
+        with open(os.path.join(self.job_directory, self.request_files()[0])) as handle:
+            line = json.loads(handle.readline())
+        self.assertEqual(line['method'], 'POST')
+        self.assertEqual(line['url'], '/v1/chat/completions')
+        self.assertEqual(line['body']['response_format'], {'type': 'json_object'})
+
+    def test_generation_batches_follow_dependency_waves(self):
+        generator = CodeGenerationAgent(llm_client=self.client)
+
+        results = generator.generate_code_batch(PLANS, self.job_directory, self.executor(), poll_interval=0.01)
+
+        self.assertEqual([result['status'] for result in results], ['CODE_GENERATION_COMPLETE'] * 2)
+        self.assertEqual(list(results[1]['generated_code']), ['user_model', 'login_endpoint'])
+        self.assertEqual(len(self.request_files()), 2)
+        login_requests = [request for request in self.server.requests if 'Implement login' in request['messages'][-1]['content']]
+        self.assertEqual(len(login_requests), 2)
+        self.assertIn(USER_MODEL_CODE.strip(), login_requests[0]['messages'][1]['content'])
+
+    def test_restart_polls_submitted_batch_instead_of_resubmitting(self):
+        planner = CodePlannerAgent(llm_client=self.client)
+        with self.assertRaises(KeyboardInterrupt):
+            planner.initialize_plans_batch(TASKS, self.job_directory, self.executor(CrashingExecutor), poll_interval=0.01)
+
+        # The batch had answered one request and was writing another when the process died
+        with open(os.path.join(self.job_directory, 'job.json')) as handle:
+            batch_id = json.load(handle)['active']['batch_id']
+        with open(os.path.join(self.job_directory, self.request_files()[0])) as handle:
+            first = json.loads(handle.readline())
+        with open(os.path.join(self.directory, 'batches', f"{batch_id}.output.jsonl"), 'w') as handle:
+            body = self.client.chat_completion(**first['body'])
+            handle.write(json.dumps({'custom_id': first['custom_id'], 'response': {'status_code': 200, 'body': body}, 'error': None}) + '\n')
+            handle.write('{"custom_id": "1", "resp')
+
+        plans = CodePlannerAgent(llm_client=self.client).initialize_plans_batch(
+            TASKS, self.job_directory, self.executor(), poll_interval=0.01
+        )
+
+        self.assertEqual([plan['status'] for plan in plans], ['PLANNING_COMPLETE'] * 3)
+        self.assertEqual(len(self.request_files()), 1)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_restart_keeps_answers_of_finished_waves(self):
+        generator = CodeGenerationAgent(llm_client=self.client)
+        generator.generate_code_batch(PLANS[:1], self.job_directory, self.executor(), poll_interval=0.01)
+        self.server.requests.clear()
+
+        results = CodeGenerationAgent(llm_client=self.client).generate_code_batch(
+            PLANS[:1], self.job_directory, self.executor(), poll_interval=0.01
+        )
+
+        self.assertEqual(results[0]['status'], 'CODE_GENERATION_COMPLETE')
+        self.assertEqual(self.server.requests, [])
+
+    def test_failed_requests_are_resubmitted(self):
+        self.server.statuses = [400]
+        generator = CodeGenerationAgent(llm_client=self.client)
+
+        results = generator.generate_code_batch(PLANS, self.job_directory, self.executor(max_workers=1), poll_interval=0.01)
+
+        self.assertEqual([result['status'] for result in results], ['CODE_GENERATION_COMPLETE'] * 2)
+        # A retry batch for the rejected request, then the second wave
+        self.assertEqual(len(self.request_files()), 3)
+
+    def test_exhausted_attempts_fail_only_that_plan(self):
+        self.server.statuses = [400]
+        generator = CodeGenerationAgent(llm_client=self.client)
+
+        results = generator.generate_code_batch(
+            PLANS, self.job_directory, self.executor(max_workers=1), poll_interval=0.01, max_attempts=1
+        )
+
+        self.assertEqual(results[0]['status'], 'GENERATION_FAILED')
+        self.assertIn("Step 'user_model' failed", results[0]['error'])
+        self.assertEqual(results[1]['status'], 'CODE_GENERATION_COMPLETE')
+
+    def test_cyclic_plan_fails_without_blocking_others(self):
+        cyclic = {'task_id': 'cyclic', 'implementation_steps': [
+            {'name': 'a', 'description': 'A', 'dependencies': ['b']},
+            {'name': 'b', 'description': 'B', 'dependencies': ['a']}
+        ]}
+        generator = CodeGenerationAgent(llm_client=self.client)
+
+        results = generator.generate_code_batch([cyclic, PLANS[0]], self.job_directory, self.executor(), poll_interval=0.01)
+
+        self.assertEqual(results[0]['status'], 'GENERATION_FAILED')
+        self.assertIn('Circular', results[0]['error'])
+        self.assertEqual(results[1]['status'], 'CODE_GENERATION_COMPLETE')
+
+    def test_unexpected_errors_become_failed_lines(self):
+        client = MagicMock()
+        client.chat_completion.side_effect = ValueError('malformed request body')
+        executor = LocalBatchExecutor(os.path.join(self.directory, 'batches'), client=client)
+        job = BatchJob(self.job_directory, executor, TASKS, poll_interval=0.01, max_attempts=1)
+
+        answers = job.execute({'0': {'model': 'gpt-4o', 'messages': []}})
+
+        self.assertEqual(answers, {'0': {'error': 'malformed request body'}})
+
+    def test_job_directory_rejects_other_inputs(self):
+        BatchJob(self.job_directory, self.executor(), TASKS)
+
+        with self.assertRaises(ValueError):
+            BatchJob(self.job_directory, self.executor(), TASKS[:1])
+
+
+class TestOpenAIBatchExecutor(unittest.TestCase):
+    def test_uploads_file_and_reads_output_and_error_files(self):
+        executor = OpenAIBatchExecutor(api_key='key', base_url='http://batches.test/v1')
+        executor.session = MagicMock()
+        responses = {
+            ('POST', 'http://batches.test/v1/files'): {'id': 'file-in'},
+            ('POST', 'http://batches.test/v1/batches'): {'id': 'batch-1'},
+            ('GET', 'http://batches.test/v1/batches/batch-1'): {
+                'id': 'batch-1', 'status': 'completed', 'output_file_id': 'file-out', 'error_file_id': 'file-err'
+            }
+        }
+        executor.session.request.side_effect = lambda method, url, **kwargs: MagicMock(
+            status_code=200, json=MagicMock(return_value=responses[(method, url)])
+        )
+        executor.session.get.side_effect = lambda url, **kwargs: MagicMock(
+            status_code=200, text='{"custom_id": "0"}\n' if 'file-out' in url else '{"custom_id": "1"}\n'
+        )
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as requests_file:
+            batch_id = executor.submit(requests_file.name)
+        lines = list(executor.results(batch_id))
+
+        self.assertEqual(batch_id, 'batch-1')
+        create = executor.session.request.call_args_list[1]
+        self.assertEqual(create.kwargs['json']['input_file_id'], 'file-in')
+        self.assertEqual(create.kwargs['json']['endpoint'], '/v1/chat/completions')
+        self.assertEqual([line['custom_id'] for line in lines], ['0', '1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from planner import CodePlannerAgent
+
+class TestBulkPlanning(unittest.TestCase):
+    def setUp(self):
+        self.planner = CodePlannerAgent(max_concurrency=3)
+        self.tasks = [
+            {'id': f'task-{n}', 'title': f'Task {n}', 'description': 'Create login and registration system'}
+            for n in range(9)
+        ]
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    def fake_strategy(self, task):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if task['id'] == 'task-4':
+            raise ValueError('malformed strategy')
+        return {'components': {'user_model': {'description': 'User model'}}, 'complexity': 'LOW'}
+
+    def test_plans_every_task_under_concurrency_limit(self):
+        with patch.object(self.planner.strategy_generator, 'generate_strategy', side_effect=self.fake_strategy):
+            results = dict(self.planner.initialize_plans(iter(self.tasks)))
+
+        self.assertEqual(set(results), {task['id'] for task in self.tasks})
+        self.assertLessEqual(self.peak_in_flight, 3)
+        self.assertGreater(self.peak_in_flight, 1)
+
+    def test_failures_are_isolated(self):
+        with patch.object(self.planner.strategy_generator, 'generate_strategy', side_effect=self.fake_strategy):
+            results = dict(self.planner.initialize_plans(self.tasks))
+
+        self.assertEqual(results['task-4']['status'], 'PLANNING_FAILED')
+        self.assertEqual(results['task-0'], {
+            'task_id': 'task-0',
+            'status': 'PLANNING_COMPLETE',
+            'implementation_steps': [{
+                'name': 'user_model',
+                'description': 'User model',
+                'estimated_time': '1-2 hours',
+                'dependencies': [],
+                'estimated_hours': {'min': 1.0, 'max': 2.0}
+            }],
+            'estimated_complexity': 'LOW',
+            'execution_levels': [['user_model']],
+            'max_parallelism': 1,
+            'critical_path': ['user_model'],
+            'critical_path_hours': {'min': 1.0, 'max': 2.0},
+            'total_hours': {'min': 1.0, 'max': 2.0}
+        })
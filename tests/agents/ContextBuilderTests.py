@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import MagicMock
+from context_builder import PromptContextBuilder, TokenCounter, code_outline
+from generator import CodeGenerationAgent
+
+USER_MODEL_CODE = '''class User:
+    def __init__(self, username: str, password_hash: str):
+        self.username = username
+        self.password_hash = password_hash
+
+    def verify(self, password: str) -> bool:
+        return hash_password(password) == self.password_hash
+'''
+
+class TestPromptContextBuilder(unittest.TestCase):
+    def setUp(self):
+        self.steps = [
+            {'name': 'user_model', 'description': 'Create user model', 'estimated_time': '1-2 hours', 'dependencies': []},
+            {'name': 'login_endpoint', 'description': 'Implement login', 'estimated_time': '1-2 hours', 'dependencies': ['user_model']}
+        ]
+
+    def test_description_is_not_repeated(self):
+        context = PromptContextBuilder().build(self.steps[1])
+
+        self.assertNotIn('Implement login', context)
+        self.assertNotIn('estimated_time', context)
+        self.assertNotIn("{'", context)
+        self.assertIn('Depends on: user_model', context)
+
+    def test_dependency_code_is_included_within_budget(self):
+        builder = PromptContextBuilder(token_budget=1000)
+
+        context = builder.build(self.steps[1], self.steps, {'user_model': USER_MODEL_CODE})
+
+        self.assertIn(USER_MODEL_CODE, context)
+        self.assertLessEqual(builder.counter.count(context), 1000)
+
+    def test_tight_budget_falls_back_to_signatures(self):
+        builder = PromptContextBuilder(token_budget=75)
+
+        context = builder.build(self.steps[1], self.steps, {'user_model': USER_MODEL_CODE})
+
+        self.assertIn('def verify(self, password: str) -> bool: ...', context)
+        self.assertNotIn('self.username = username', context)
+
+    def test_plan_overview_leads_the_context(self):
+        builder = PromptContextBuilder()
+
+        contexts = [builder.build(step, self.steps, {'user_model': USER_MODEL_CODE}) for step in self.steps]
+
+        overview = 'Plan steps:\n- user_model: Create user model\n- login_endpoint: Implement login'
+        self.assertTrue(all(context.startswith(overview) for context in contexts))
+
+    def test_overview_is_the_same_for_every_step(self):
+        builder = PromptContextBuilder(token_budget=120)
+
+        contexts = [builder.build(step, self.steps, {'user_model': USER_MODEL_CODE}) for step in self.steps]
+
+        overviews = [context.split('\n\n')[0] for context in contexts]
+        self.assertTrue(overviews[0].startswith('Plan steps:'))
+        self.assertEqual(overviews[0], overviews[1])
+
+    def test_review_feedback_is_truncated_to_keep_dependency_code(self):
+        builder = PromptContextBuilder(token_budget=400)
+        step = dict(self.steps[1], review_feedback={'style_suggestions': ['login_endpoint:1:1: E501 line too long'] * 200})
+
+        context = builder.build(step, self.steps, {'user_model': USER_MODEL_CODE})
+
+        self.assertIn(USER_MODEL_CODE, context)
+        self.assertIn('Fix these review findings:', context)
+        self.assertLessEqual(builder.counter.count(context), 400)
+
+    def test_code_outline_handles_invalid_code(self):
+        self.assertIsNone(code_outline('def broken(:'))
+        self.assertEqual(code_outline('class A(Base):\n    def run(self): pass\n'), 'class A(Base):\n    def run(self): ...')
+
+class TestGenerationPrompts(unittest.TestCase):
+    def setUp(self):
+        self.llm_client = MagicMock()
+        self.llm_client.chat_completion.side_effect = self.respond
+        self.generator = CodeGenerationAgent(llm_client=self.llm_client)
+        self.plan = {
+            'task_id': 'auth-task-001',
+            'implementation_steps': [
+                {'name': 'user_model', 'description': 'Create user model', 'dependencies': []},
+                {'name': 'login_endpoint', 'description': 'Implement login', 'dependencies': ['user_model']}
+            ]
+        }
+
+    def respond(self, **request):
+        response = MagicMock()
+        description = request['messages'][-1]['content']
+        response.choices[0].message.content = USER_MODEL_CODE if description == 'Create user model' else 'def login(): pass'
+        return response
+
+    def test_dependent_step_sees_dependency_output(self):
+        self.generator.generate_code(self.plan)
+
+        login_request = self.llm_client.chat_completion.call_args_list[1].kwargs
+        roles = [message['role'] for message in login_request['messages']]
+        self.assertEqual(roles, ['system', 'user', 'user'])
+        self.assertIn(USER_MODEL_CODE.strip(), login_request['messages'][1]['content'])
+        self.assertEqual(login_request['messages'][2]['content'], 'Implement login')
+
+    def test_prompt_is_smaller_than_raw_step_repr(self):
+        counter = TokenCounter()
+        step = dict(self.plan['implementation_steps'][1], estimated_time='1-2 hours')
+        language_model = self.generator.language_model
+        legacy_prompt = language_model.code_generation_prompt + step['description'] + f"Context: {step}"
+
+        request = language_model.build_request(step['description'], step)
+        prompt = ''.join(message['content'] for message in request['messages'])
+
+        self.assertLess(counter.count(prompt), counter.count(legacy_prompt))
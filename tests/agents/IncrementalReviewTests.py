@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch
+from reviewer import CodeReviewAgent
+
+def fake_review_file(self, filename, snippet):
+    return (
+        [{'file': filename, 'issue': 'eval used', 'severity': 'HIGH'}] if 'eval' in snippet else [],
+        {'time_complexity': 'O(n^2)' if 'for' in snippet else 'O(1)'},
+        [f'{filename}: line too long'] if len(snippet) > 20 else []
+    )
+
+def fake_review_files(self, generated_code):
+    return [fake_review_file(self, filename, snippet) for filename, snippet in generated_code.items()]
+
+@patch.object(CodeReviewAgent, '_review_files', autospec=True, side_effect=fake_review_files)
+class TestIncrementalReview(unittest.TestCase):
+    def setUp(self):
+        self.reviewer = CodeReviewAgent()
+        self.first_cycle = {
+            'task_id': 'auth-task-001',
+            'generated_code': {
+                'user_model': 'class User: pass',
+                'login_endpoint': 'def login(): return eval(x)',
+                'password_hashing': 'for c in p: pass'
+            }
+        }
+
+    def test_only_changed_files_are_reanalyzed(self, mock_review_files):
+        first_review = self.reviewer.review_code(self.first_cycle, incremental=True)
+        mock_review_files.reset_mock()
+
+        second_cycle = {
+            'task_id': 'auth-task-001',
+            'generated_code': {**self.first_cycle['generated_code'], 'login_endpoint': 'def login(): pass'}
+        }
+        second_review = self.reviewer.review_code(second_cycle, previous_review=first_review)
+
+        self.assertEqual([list(call.args[1]) for call in mock_review_files.call_args_list], [['login_endpoint']])
+        self.assertEqual(second_review['security_issues'], [])
+        self.assertEqual(second_review['performance_recommendations']['time_complexity'], 'O(n^2)')
+        self.assertGreater(second_review['quality_score'], first_review['quality_score'])
+
+    def test_incremental_result_matches_full_per_file_review(self, mock_review_files):
+        first_review = self.reviewer.review_code(self.first_cycle, incremental=True)
+        reused_review = self.reviewer.review_code(self.first_cycle, previous_review=first_review)
+
+        self.assertEqual(reused_review, first_review)
+        self.assertEqual([len(call.args[1]) for call in mock_review_files.call_args_list], [3, 0])
+
+class TestBatchedIncrementalReview(unittest.TestCase):
+    def test_changed_files_share_one_security_scan(self):
+        reviewer = CodeReviewAgent()
+        code = {'generated_code': {
+            'runner': 'import subprocess\nsubprocess.call(cmd, shell=True)\n',
+            'loops': 'def f(x):\n    for i in x:\n        for j in x:\n            pass\n',
+            'imports': 'import os\n',
+            # One name is a prefix of the other followed by ':'
+            'a': 'import json\n',
+            'a:b.py': 'def View(): pass\n'
+        }}
+
+        with patch.object(reviewer.security_scanner, 'scan', wraps=reviewer.security_scanner.scan) as scan:
+            review = reviewer.review_code(code, incremental=True)
+
+        self.assertEqual(scan.call_count, 1)
+        for filename, snippet in code['generated_code'].items():
+            file_review = review['file_reviews'][filename]
+            self.assertEqual(
+                (file_review['security_issues'], file_review['performance'], file_review['style_suggestions']),
+                reviewer.review_file(filename, snippet)
+            )
@@ -0,0 +1,160 @@
+import io
+import json
+import asyncio
+import unittest
+import urllib.request
+from unittest.mock import MagicMock
+from fake_openai_server import FakeOpenAIServer
+from instrumentation import JSONLogSink, MetricsSink, PrometheusExporter, get_instrumentation, traced
+from llm_cache import LLMResponseCache
+from llm_client import LLMClient
+from async_llm_client import AsyncLLMClient
+from generator import CodeGenerationAgent
+from reviewer import CodeReviewAgent
+
+class CollectingSink(MetricsSink):
+    def __init__(self):
+        self.spans = []
+        self.metrics = []
+
+    def on_span(self, span):
+        self.spans.append(span)
+
+    def on_metric(self, name, value, labels):
+        self.metrics.append((name, value, labels))
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.sink = CollectingSink()
+        self.instrumentation = get_instrumentation()
+        self.instrumentation.enable(self.sink)
+        self.addCleanup(self.instrumentation.disable)
+        self.plan = {
+            'task_id': 'auth-task-001',
+            'implementation_steps': [
+                {'name': 'user_model', 'description': 'Create user model', 'dependencies': []},
+                {'name': 'login_endpoint', 'description': 'Implement login', 'dependencies': ['user_model']}
+            ]
+        }
+
+    def span_named(self, name):
+        return [span for span in self.sink.spans if span.name == name]
+
+    def test_step_spans_nest_under_generate_code(self):
+        with FakeOpenAIServer(content='x = 1') as server:
+            client = LLMClient(api_key='test-key', base_url=server.base_url)
+            CodeGenerationAgent(llm_client=client).generate_code(self.plan)
+
+        generate, = self.span_named('CodeGenerationAgent.generate_code')
+        steps = self.span_named('CodeGenerationAgent._generate_code_for_step')
+        completions = self.span_named('LLMClient.chat_completion')
+
+        self.assertEqual(generate.attributes['status'], 'CODE_GENERATION_COMPLETE')
+        self.assertEqual(sorted(span.attributes['step'] for span in steps), ['login_endpoint', 'user_model'])
+        self.assertTrue(all(span.parent_id == generate.span_id for span in steps))
+        self.assertEqual({span.parent_id for span in completions}, {span.span_id for span in steps})
+        self.assertTrue(all(span.attributes['prompt_tokens'] > 0 for span in completions))
+        self.assertIn('llm_completion_tokens_total', [name for name, _, _ in self.sink.metrics])
+        self.assertIn('llm_cost_usd_total', [name for name, _, _ in self.sink.metrics])
+
+    def test_async_spans_cover_the_awaited_call(self):
+        async def generate(base_url):
+            async with AsyncLLMClient(base_url=base_url) as client:
+                return await CodeGenerationAgent(async_llm_client=client).agenerate_code(self.plan)
+
+        with FakeOpenAIServer(content='x = 1') as server:
+            asyncio.run(generate(server.base_url))
+
+        generate_span, = self.span_named('CodeGenerationAgent.agenerate_code')
+        completions = self.span_named('AsyncLLMClient.chat_completion')
+
+        self.assertEqual(generate_span.attributes['status'], 'CODE_GENERATION_COMPLETE')
+        self.assertEqual(len(completions), 2)
+        self.assertTrue(all(span.trace_id == generate_span.trace_id for span in completions))
+        self.assertGreaterEqual(generate_span.duration, sum(span.duration for span in completions))
+
+    def test_streamed_completions_record_usage(self):
+        with FakeOpenAIServer(content='x = 1\n' * 10) as server:
+            client = LLMClient(base_url=server.base_url)
+            with self.instrumentation.span('stream'):
+                chunks = list(client.chat_completion(stream=True, model='gpt-4-turbo', messages=[{'role': 'user', 'content': 'x' * 40}]))
+
+        self.assertEqual(server.requests[0]['stream_options'], {'include_usage': True})
+        self.assertEqual(chunks[-1].choices, [])
+        self.assertIn(('llm_completion_tokens_total', 15, {'model': 'gpt-4-turbo'}), self.sink.metrics)
+        self.assertEqual(self.span_named('stream')[0].attributes['prompt_tokens'], 10)
+
+    def test_cache_hits_are_counted(self):
+        cache = LLMResponseCache()
+        generator = CodeGenerationAgent(cache=cache, llm_client=MagicMock())
+        generator.language_model.client.chat_completion.return_value.choices[0].message.content = 'x = 1'
+
+        generator.generate_code(self.plan)
+        generator.generate_code(self.plan)
+
+        counters = [name for name, _, _ in self.sink.metrics]
+        self.assertEqual(counters.count('llm_cache_misses_total'), 2)
+        self.assertEqual(counters.count('llm_cache_hits_total'), 2)
+
+    def test_review_stages_are_traced(self):
+        CodeReviewAgent().review_code({'task_id': 'auth-task-001', 'generated_code': {'app.py': 'x = 1\n'}})
+
+        review, = self.span_named('CodeReviewAgent.review_code')
+        security, = self.span_named('CodeReviewAgent._run_security_checks')
+        self.assertEqual(security.parent_id, review.span_id)
+        self.assertEqual(security.attributes['files'], 1)
+        self.assertIn('status', review.attributes)
+
+    def test_exceptions_are_recorded(self):
+        @traced('failing')
+        def failing():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            failing()
+
+        self.assertEqual(self.span_named('failing')[0].error, 'ValueError: boom')
+
+    def test_disabled_instrumentation_emits_nothing(self):
+        self.instrumentation.disable()
+
+        @traced('quiet')
+        def quiet():
+            return {'status': 'OK'}
+
+        self.assertEqual(quiet(), {'status': 'OK'})
+        self.assertEqual(self.sink.spans, [])
+
+class TestExporters(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation = get_instrumentation()
+        self.addCleanup(self.instrumentation.disable)
+
+    def test_prometheus_endpoint(self):
+        exporter = PrometheusExporter()
+        self.instrumentation.enable(exporter)
+
+        with self.instrumentation.span('CodeReviewAgent.review_code'):
+            self.instrumentation.record_llm_usage('gpt-4-turbo', {'prompt_tokens': 100, 'completion_tokens': 50})
+
+        server = exporter.serve(port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            text = response.read().decode('utf-8')
+
+        self.assertIn('agent_workflow_span_duration_seconds_count{error="false",span="CodeReviewAgent.review_code"} 1', text)
+        self.assertIn('agent_workflow_llm_prompt_tokens_total{model="gpt-4-turbo"} 100', text)
+        self.assertIn('agent_workflow_llm_cost_usd_total{model="gpt-4-turbo"} 0.0025', text)
+
+    def test_json_log_sink(self):
+        stream = io.StringIO()
+        self.instrumentation.enable(JSONLogSink(stream))
+
+        with self.instrumentation.span('outer'):
+            with self.instrumentation.span('inner', step='user_model'):
+                pass
+
+        inner, outer = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(inner['parent_id'], outer['span_id'])
+        self.assertEqual(inner['attributes'], {'step': 'user_model'})
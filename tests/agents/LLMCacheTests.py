@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from llm_cache import DiskCacheBackend, InMemoryLRUBackend, LLMResponseCache, make_cache_key
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.messages = [
+            {'role': 'system', 'content': 'You are a code generator'},
+            {'role': 'user', 'content': 'Create user model'}
+        ]
+
+    def test_key_depends_on_model_messages_and_params(self):
+        key = make_cache_key('gpt-4-turbo', self.messages, max_tokens=500)
+
+        self.assertEqual(key, make_cache_key('gpt-4-turbo', list(self.messages), max_tokens=500))
+        self.assertNotEqual(key, make_cache_key('gpt-3.5-turbo', self.messages, max_tokens=500))
+        self.assertNotEqual(key, make_cache_key('gpt-4-turbo', self.messages, max_tokens=100))
+        self.assertNotEqual(key, make_cache_key('gpt-4-turbo', self.messages[1:], max_tokens=500))
+
+    def test_hit_and_miss_counters(self):
+        cache = LLMResponseCache()
+        calls = []
+
+        for _ in range(3):
+            cache.get_or_create('key', lambda: calls.append(1) or 'class User: pass')
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_lru_evicts_least_recently_used(self):
+        backend = InMemoryLRUBackend(max_entries=2)
+        backend.set('a', '1')
+        backend.set('b', '2')
+        backend.get('a')
+        backend.set('c', '3')
+
+        self.assertEqual(backend.get('a'), '1')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.evictions, 1)
+
+    def test_expired_entries_are_not_returned(self):
+        backend = InMemoryLRUBackend()
+        backend.set('a', '1', ttl=0.01)
+        time.sleep(0.02)
+
+        self.assertIsNone(backend.get('a'))
+
+    def test_len_skips_expired_entries(self):
+        backend = InMemoryLRUBackend()
+        backend.set('a', '1', ttl=0.01)
+        backend.set('b', '2')
+        time.sleep(0.02)
+
+        self.assertEqual(len(backend), 1)
+
+    def test_disk_backend_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'llm_cache.sqlite3')
+            DiskCacheBackend(path).set('a', 'def login(): pass')
+            backend = DiskCacheBackend(path, max_entries=1)
+            backend.set('b', 'def logout(): pass')
+
+            self.assertEqual(backend.get('b'), 'def logout(): pass')
+            self.assertIsNone(backend.get('a'))
+            self.assertEqual(len(backend), 1)
+
+    def test_disk_backend_evicts_least_recently_used_by_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = DiskCacheBackend(os.path.join(directory, 'llm_cache.sqlite3'), max_bytes=10)
+            backend.set('a', '1234')
+            backend.set('b', '5678')
+            backend.set('c', '90')
+            backend.get('a')
+            backend.set('b', '56')
+            backend.set('d', '1234')
+
+            self.assertIsNone(backend.get('c'))
+            self.assertEqual([backend.get(key) for key in 'abd'], ['1234', '56', '1234'])
+            self.assertEqual(backend.evictions, 1)
+            # The totals follow inserts, resizes and deletes without rescanning the table
+            totals = backend._connection().execute('SELECT entries, size FROM llm_cache_totals').fetchone()
+            self.assertEqual(totals, (3, 10))
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from fake_openai_server import FakeOpenAIServer
+from llm_client import AdaptiveConcurrencyLimiter, LLMClient, LLMClientError, TokenBucket
+from language_models import LanguageModelService
+
+class TestLLMClient(unittest.TestCase):
+    def setUp(self):
+        self.request = {
+            'model': 'gpt-4-turbo',
+            'messages': [{'role': 'user', 'content': 'Create user model'}],
+            'max_tokens': 50
+        }
+
+    def make_client(self, server, **options):
+        return LLMClient(api_key='test-key', base_url=server.base_url, backoff_base=0.01, **options)
+
+    def test_completion_reuses_pooled_connection(self):
+        with FakeOpenAIServer(content='class User: pass') as server:
+            client = self.make_client(server)
+            responses = [client.chat_completion(**self.request) for _ in range(5)]
+
+        self.assertEqual(responses[-1].choices[0].message.content, 'class User: pass')
+        self.assertEqual(server.connections, 1)
+
+    def test_throttling_is_retried_and_shrinks_concurrency(self):
+        with FakeOpenAIServer(statuses=[429, 503]) as server:
+            client = self.make_client(server, initial_concurrency=8)
+            response = client.chat_completion(**self.request)
+
+        self.assertEqual(response.choices[0].finish_reason, 'stop')
+        self.assertEqual(client.stats()['retries'], 2)
+        self.assertEqual(client.stats()['throttled'], 1)
+        self.assertLess(client.stats()['concurrency_limit'], 8)
+
+    def test_client_errors_are_not_retried(self):
+        with FakeOpenAIServer(statuses=[400]) as server:
+            client = self.make_client(server)
+            with self.assertRaises(LLMClientError) as raised:
+                client.chat_completion(**self.request)
+
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_gives_up_after_max_retries(self):
+        with FakeOpenAIServer(statuses=[500] * 3) as server:
+            client = self.make_client(server, max_retries=2)
+            with self.assertRaises(LLMClientError):
+                client.chat_completion(**self.request)
+
+        self.assertEqual(len(server.requests), 3)
+
+    def test_language_model_service_streams_through_client(self):
+        code = 'def login(user):\n    return user.is_active\n'
+        with FakeOpenAIServer(content=code) as server:
+            service = LanguageModelService(client=self.make_client(server))
+            chunks = list(service.stream_code_snippet('Implement login endpoint', syntax_check=True))
+
+        self.assertEqual(''.join(chunks), code)
+        self.assertTrue(server.requests[0]['stream'])
+
+class TestRateLimiting(unittest.TestCase):
+    def test_token_bucket_paces_requests(self):
+        bucket = TokenBucket(rate_per_second=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_concurrency_limit_is_enforced(self):
+        limiter = AdaptiveConcurrencyLimiter(initial=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        waiter.start()
+
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release()
+        self.assertTrue(acquired.wait(1))
+        waiter.join()
@@ -0,0 +1,164 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from fake_openai_server import FakeOpenAIServer
+from llm_client import LLMClient, LLMClientError
+from llm_hedging import HedgedLLMClient, LatencyTracker
+from model_routing import ModelRouter
+from generator import CodeGenerationAgent
+from strategy_generator import StrategyGenerator
+
+REQUEST = {
+    'model': 'gpt-4-turbo',
+    'messages': [{'role': 'user', 'content': 'Create user model'}],
+    'max_tokens': 50
+}
+
+def scripted(*delays):
+    delays = iter(delays)
+    return lambda: next(delays, 0.0)
+
+def make_client(server):
+    return LLMClient(api_key='test-key', base_url=server.base_url, backoff_base=0.01)
+
+class TestModelRouter(unittest.TestCase):
+    def test_complexity_selects_tier(self):
+        router = ModelRouter(tiers={'LOW': 'small', 'HIGH': 'large'}, default_model='medium')
+
+        self.assertEqual(router.route('LOW'), 'small')
+        self.assertEqual(router.route(' high '), 'large')
+        self.assertEqual(router.route('MEDIUM'), 'medium')
+        self.assertEqual(router.route(None), 'medium')
+        self.assertEqual(router.stats(), {'LOW': {'small': 1}, 'HIGH': {'large': 1}, 'DEFAULT': {'medium': 2}})
+
+    def test_tiers_are_configurable_from_environment(self):
+        with patch.dict(os.environ, {'LLM_MODEL_ROUTING': 'true', 'LLM_MODEL_LOW': 'local-coder', 'LLM_MODEL_DEFAULT': 'gpt-4o'}):
+            router = ModelRouter.from_env()
+
+        self.assertEqual(router.route('LOW'), 'local-coder')
+        self.assertEqual(router.route('HIGH'), 'gpt-4-turbo')
+        self.assertEqual(router.route('unknown'), 'gpt-4o')
+
+    def test_routing_is_off_by_default(self):
+        with patch.dict(os.environ, {'LLM_MODEL_ROUTING': ''}):
+            router = ModelRouter.from_env()
+
+        self.assertEqual([router.route(tier) for tier in ('LOW', 'MEDIUM', 'HIGH', None)], ['gpt-4-turbo'] * 4)
+
+    def test_a_configured_tier_is_routed_without_the_switch(self):
+        with patch.dict(os.environ, {'LLM_MODEL_ROUTING': '', 'LLM_MODEL_LOW': 'local-coder'}):
+            router = ModelRouter.from_env()
+
+        self.assertEqual([router.route(tier) for tier in ('LOW', 'MEDIUM')], ['local-coder', 'gpt-4-turbo'])
+
+    @patch.dict(os.environ, {'LLM_MODEL_ROUTING': '1'})
+    def test_generation_routes_by_step_then_plan_complexity(self):
+        llm_client = MagicMock()
+        llm_client.chat_completion.return_value.choices[0].message.content = 'def step(): pass'
+        generator = CodeGenerationAgent(llm_client=llm_client, max_concurrency=1)
+        plan = {
+            'task_id': 'routing-task',
+            'estimated_complexity': 'LOW',
+            'implementation_steps': [
+                {'name': 'schema', 'description': 'Design schema', 'complexity': 'HIGH', 'dependencies': []},
+                {'name': 'fixtures', 'description': 'Write fixtures', 'dependencies': ['schema']}
+            ]
+        }
+
+        generator.generate_code(plan)
+
+        requests = [call.kwargs for call in llm_client.chat_completion.call_args_list]
+        self.assertEqual([request['model'] for request in requests], ['gpt-4-turbo', 'gpt-4o-mini'])
+        self.assertNotIn('complexity', requests[0]['messages'][1]['content'])
+
+    @patch.dict(os.environ, {'LLM_MODEL_ROUTING': '1'})
+    def test_strategy_routes_by_task_complexity(self):
+        llm_client = MagicMock()
+        llm_client.chat_completion.return_value.choices[0].message.content = '{"complexity": "LOW"}'
+
+        StrategyGenerator(client=llm_client).generate_strategy({'title': 'Fix typo', 'complexity': 'LOW'})
+
+        self.assertEqual(llm_client.chat_completion.call_args.kwargs['model'], 'gpt-4o-mini')
+
+class TestHedgedLLMClient(unittest.TestCase):
+    def test_slow_primary_is_hedged_to_secondary(self):
+        with FakeOpenAIServer(content='primary', latency=scripted(0.5)) as primary, \
+                FakeOpenAIServer(content='secondary') as secondary:
+            client = HedgedLLMClient(make_client(primary), make_client(secondary), initial_delay=0.05)
+            response = client.chat_completion(**REQUEST)
+
+        self.assertEqual(response.choices[0].message.content, 'secondary')
+        stats = client.stats()
+        self.assertEqual((stats['hedged'], stats['secondary_wins']), (1, 1))
+        self.assertEqual(stats['hedge_win_rate'], 1.0)
+
+    def test_fast_primary_is_not_hedged(self):
+        with FakeOpenAIServer(content='primary') as primary, FakeOpenAIServer() as secondary:
+            client = HedgedLLMClient(make_client(primary), make_client(secondary), initial_delay=1.0)
+            response = client.chat_completion(**REQUEST)
+
+        self.assertEqual(response.choices[0].message.content, 'primary')
+        self.assertEqual(secondary.requests, [])
+        self.assertEqual(client.stats()['hedged'], 0)
+
+    def test_failed_hedge_waits_for_primary(self):
+        with FakeOpenAIServer(content='primary', latency=scripted(0.2)) as primary, \
+                FakeOpenAIServer(statuses=[400]) as secondary:
+            client = HedgedLLMClient(make_client(primary), make_client(secondary), initial_delay=0.05)
+            response = client.chat_completion(**REQUEST)
+
+        self.assertEqual(response.choices[0].message.content, 'primary')
+        self.assertEqual(client.stats()['primary_wins'], 1)
+
+    def test_primary_failure_before_hedge_is_raised(self):
+        with FakeOpenAIServer(statuses=[400]) as primary, FakeOpenAIServer() as secondary:
+            client = HedgedLLMClient(make_client(primary), make_client(secondary), initial_delay=1.0)
+            with self.assertRaises(LLMClientError):
+                client.chat_completion(**REQUEST)
+
+        self.assertEqual(secondary.requests, [])
+
+    def test_hedge_to_secondary_model_on_same_endpoint(self):
+        with FakeOpenAIServer(latency=scripted(0.5)) as server:
+            client = HedgedLLMClient(make_client(server), secondary_model='gpt-4o-mini', initial_delay=0.05)
+            response = client.chat_completion(**REQUEST)
+
+        self.assertEqual(response.model, 'gpt-4o-mini')
+        self.assertEqual([request['model'] for request in server.requests], ['gpt-4-turbo', 'gpt-4o-mini'])
+
+    def test_time_queued_for_a_worker_does_not_trigger_hedges(self):
+        with FakeOpenAIServer(latency=scripted(0.1, 0.1, 0.1)) as primary, FakeOpenAIServer() as secondary:
+            client = HedgedLLMClient(make_client(primary), make_client(secondary), initial_delay=0.25, max_workers=1)
+            with ThreadPoolExecutor(max_workers=3) as callers:
+                list(callers.map(lambda _: client.chat_completion(**REQUEST), range(3)))
+
+        self.assertEqual(secondary.requests, [])
+        self.assertEqual(client.stats()['hedged'], 0)
+
+    def test_pool_is_sized_from_client_concurrency(self):
+        with FakeOpenAIServer() as server:
+            client = HedgedLLMClient(LLMClient(base_url=server.base_url, max_concurrency=100), secondary_model='gpt-4o-mini')
+
+        self.assertEqual(client._executor._max_workers, 100)
+
+    def test_hedge_delay_tracks_primary_percentile(self):
+        with FakeOpenAIServer() as server:
+            client = HedgedLLMClient(make_client(server), secondary_model='gpt-4o-mini', min_samples=5)
+            self.assertIsNone(client.hedge_delay())
+            for _ in range(5):
+                client.chat_completion(**REQUEST)
+
+        self.assertIsNotNone(client.hedge_delay())
+        self.assertEqual(client.stats()['hedged'], 0)
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(min_samples=1)
+        for seconds in range(1, 101):
+            tracker.record(seconds)
+
+        self.assertEqual(tracker.percentile(0.95), 95)
+        self.assertEqual(tracker.percentile(0.5), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from reviewer import CodeReviewAgent
+from review_merge import merge_performance_reports
+
+def fake_security_checks(self, code):
+    return [{'file': name, 'issue': 'eval used', 'severity': 'HIGH'}
+            for name, snippet in code['generated_code'].items() if 'eval' in snippet]
+
+def fake_performance(self, code):
+    return {
+        'time_complexity': 'O(n^2)' if any('for' in s for s in code['generated_code'].values()) else 'O(1)',
+        'functions': list(code['generated_code'])
+    }
+
+def fake_style(self, code):
+    return [f'{name}: missing docstring' for name in code['generated_code']]
+
+class FakeReviewAgent(CodeReviewAgent):
+    """Module level, so worker processes import it by name whatever the start method."""
+    _run_security_checks = fake_security_checks
+    _evaluate_performance = fake_performance
+    _check_code_style = fake_style
+
+class TestParallelReview(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = {
+            'task_id': 'auth-task-001',
+            'generated_code': {
+                f'step_{n}': 'eval(x)' if n % 3 == 0 else 'for x in y: pass'
+                for n in range(10)
+            }
+        }
+
+    def test_parallel_review_matches_serial_review(self):
+        parallel_agent = FakeReviewAgent(max_workers=2, chunk_size=3, parallel_threshold=4)
+        try:
+            parallel_result = parallel_agent.review_code(self.sample_code)
+        finally:
+            parallel_agent.close()
+
+        self.assertEqual(parallel_result['status'], 'REVIEW_COMPLETE')
+        self.assertEqual(parallel_result['security_issues'], fake_security_checks(None, self.sample_code))
+        self.assertEqual(parallel_result['style_suggestions'], fake_style(None, self.sample_code))
+        self.assertEqual(parallel_result['performance_recommendations']['time_complexity'], 'O(n^2)')
+        self.assertEqual(parallel_result['performance_recommendations']['functions'], list(self.sample_code['generated_code']))
+
+    def test_small_reviews_stay_serial(self):
+        agent = FakeReviewAgent(max_workers=2, parallel_threshold=100)
+
+        agent.review_code(self.sample_code)
+
+        self.assertIsNone(agent.parallel_runner._executor)
+
+class TestMergePerformanceReports(unittest.TestCase):
+    def test_worst_complexity_wins(self):
+        merged = merge_performance_reports([
+            {'time_complexity': 'O(n)', 'issues': ['a']},
+            {'time_complexity': 'O(n^3)', 'issues': ['b']},
+            {'time_complexity': 'O(n log n)'}
+        ])
+
+        self.assertEqual(merged, {'time_complexity': 'O(n^3)', 'issues': ['a', 'b']})
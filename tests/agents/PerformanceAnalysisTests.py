@@ -0,0 +1,141 @@
+import unittest
+from analysis_engine import CodeAnalysisEngine
+from review_merge import complexity_rank
+from reviewer import CodeReviewAgent
+
+def analyze(code):
+    return CodeAnalysisEngine().analyze_performance({'module.py': code})
+
+def rules(report):
+    return [(issue['rule'], issue['line']) for issue in report['issues']]
+
+class TestComplexityEstimates(unittest.TestCase):
+    def test_loop_nesting_sets_function_complexity(self):
+        report = analyze(
+            'def flat(items):\n'
+            '    return [item * 2 for item in items]\n'
+            '\n'
+            'def pairs(left, right):\n'
+            '    for a in left:\n'
+            '        for b in right:\n'
+            '            print(a, b)\n'
+            '\n'
+            'def fixed(items):\n'
+            '    for attempt in range(3):\n'
+            '        print(items)\n'
+        )
+
+        estimates = {record['function']: record['time_complexity'] for record in report['functions']}
+        self.assertEqual(estimates, {'flat': 'O(n)', 'pairs': 'O(n^2)', 'fixed': 'O(1)'})
+        self.assertEqual(report['time_complexity'], 'O(n^2)')
+
+    def test_records_carry_locations_and_qualified_names(self):
+        report = analyze(
+            'class Repository:\n'
+            '    def find(self, rows):\n'
+            '        return sorted(rows)\n'
+        )
+
+        self.assertEqual(report['functions'], [{
+            'file': 'module.py', 'function': 'Repository.find', 'line': 2, 'end_line': 3,
+            'time_complexity': 'O(n log n)', 'loop_depth': 0
+        }])
+
+    def test_recursion_estimates(self):
+        report = analyze(
+            'def fib(n):\n'
+            '    if n < 2:\n'
+            '        return n\n'
+            '    return fib(n - 1) + fib(n - 2)\n'
+            '\n'
+            'def walk(node):\n'
+            '    for child in node.children:\n'
+            '        walk(child)\n'
+        )
+
+        estimates = {record['function']: record['time_complexity'] for record in report['functions']}
+        self.assertEqual(estimates, {'fib': 'O(2^n)', 'walk': 'O(n)'})
+        self.assertEqual(report['issues'], [])
+
+class TestSlowPatterns(unittest.TestCase):
+    def test_nested_iteration_over_same_collection(self):
+        report = analyze(
+            'def duplicates(users):\n'
+            '    for i in range(len(users)):\n'
+            '        for other in users:\n'
+            '            print(i, other)\n'
+        )
+
+        self.assertEqual(rules(report), [('nested_iteration', 3)])
+
+    def test_list_membership_in_loop(self):
+        report = analyze(
+            'def unique(items):\n'
+            '    seen = []\n'
+            '    allowed = {1, 2}\n'
+            '    for item in items:\n'
+            '        if item not in seen and item in allowed and item in [1, 2]:\n'
+            '            seen.append(item)\n'
+        )
+
+        self.assertEqual(rules(report), [('list_membership', 5)])
+        self.assertEqual(report['time_complexity'], 'O(n^2)')
+
+    def test_string_concatenation_in_loop(self):
+        report = analyze(
+            'def render(rows):\n'
+            '    html = ""\n'
+            '    total = 0\n'
+            '    for row in rows:\n'
+            '        html += f"<td>{row}</td>"\n'
+            '        total += row\n'
+            '    return html\n'
+        )
+
+        self.assertEqual(rules(report), [('string_concatenation', 5)])
+
+    def test_loop_invariant_len_and_attribute_lookups(self):
+        report = analyze(
+            'import os\n'
+            'def paths(names, rows, queue):\n'
+            '    for name in names:\n'
+            '        os.path.join(name, str(len(rows)))\n'
+            '        len(name)\n'
+            '    while len(queue) > 0:\n'
+            '        queue.pop()\n'
+        )
+
+        self.assertEqual(rules(report), [('repeated_attribute_lookup', 4), ('repeated_len', 4)])
+        self.assertTrue(all(issue['severity'] == 'low' for issue in report['issues']))
+
+    def test_unbounded_recursion(self):
+        report = analyze(
+            'def countdown(n):\n'
+            '    print(n)\n'
+            '    countdown(n - 1)\n'
+            '\n'
+            'def bounded(n):\n'
+            '    if n > 0:\n'
+            '        bounded(n - 1)\n'
+        )
+
+        self.assertEqual(rules(report), [('unbounded_recursion', 1)])
+
+class TestPerformanceReport(unittest.TestCase):
+    def test_syntax_errors_are_reported_per_file(self):
+        report = CodeAnalysisEngine().analyze_performance({'ok.py': 'x = 1\n', 'broken.py': 'def broken(:'})
+
+        self.assertEqual([error['file'] for error in report['parse_errors']], ['broken.py'])
+        self.assertEqual(report['time_complexity'], 'O(1)')
+
+    def test_log_factor_ranks_between_polynomials(self):
+        self.assertLess(complexity_rank('O(n^2)'), complexity_rank('O(n^2 log n)'))
+        self.assertLess(complexity_rank('O(n^2 log n)'), complexity_rank('O(n^3)'))
+
+    def test_quadratic_or_worse_lowers_quality_score(self):
+        reviewer = CodeReviewAgent()
+
+        linear = reviewer._calculate_quality_score([], {'time_complexity': 'O(n)'}, [])
+        cubic = reviewer._calculate_quality_score([], {'time_complexity': 'O(n^3)'}, [])
+
+        self.assertEqual((linear, cubic), (1.0, 0.9))
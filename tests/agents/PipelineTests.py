@@ -0,0 +1,165 @@
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+from pipeline import PipelineOrchestrator
+
+def plan_for(task):
+    return {
+        'task_id': task['id'],
+        'status': 'PLANNING_COMPLETE',
+        'implementation_steps': [{'name': 'user_model', 'description': 'Create user model', 'dependencies': []}]
+    }
+
+def code_for(plan):
+    return {
+        'task_id': plan['task_id'],
+        'status': 'CODE_GENERATION_COMPLETE',
+        'generated_code': {'user_model': 'class User: pass'},
+        'language': 'python'
+    }
+
+def review_with_score(score):
+    return {'status': 'REVIEW_COMPLETE', 'quality_score': score, 'security_issues': [], 'style_suggestions': []}
+
+class TestPipelineOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.planner = MagicMock()
+        self.planner.initialize_plan.side_effect = plan_for
+        self.generator = MagicMock()
+        self.generator.generate_code.side_effect = code_for
+        self.reviewer = MagicMock()
+        self.reviewer.review_code.return_value = review_with_score(0.9)
+        self.tasks = [{'id': f"task-{index}", 'title': 'Auth'} for index in range(6)]
+
+    def orchestrator(self, **options):
+        return PipelineOrchestrator(
+            planner=self.planner,
+            generator=self.generator,
+            reviewer_factory=lambda: self.reviewer,
+            **options
+        )
+
+    def test_every_task_passes_review(self):
+        outcomes = self.orchestrator().run_all(self.tasks)
+
+        self.assertEqual(sorted(outcome['task_id'] for outcome in outcomes), [task['id'] for task in self.tasks])
+        self.assertTrue(all(outcome['status'] == 'REVIEW_PASSED' and outcome['cycles'] == 1 for outcome in outcomes))
+
+    def test_low_score_loops_back_to_generation_with_feedback(self):
+        self.reviewer.review_code.side_effect = [review_with_score(0.4), review_with_score(0.9)]
+
+        outcome, = self.orchestrator().run_all(self.tasks[:1])
+
+        self.assertEqual(outcome['status'], 'REVIEW_PASSED')
+        self.assertEqual(outcome['cycles'], 2)
+        regenerated_plan = self.generator.generate_code.call_args_list[1].args[0]
+        self.assertEqual(regenerated_plan['implementation_steps'][0]['review_feedback']['quality_score'], 0.4)
+        self.assertEqual(self.reviewer.review_code.call_args_list[1].kwargs['previous_review'], review_with_score(0.4))
+
+    def test_feedback_goes_only_to_steps_with_findings(self):
+        steps = [
+            {'name': 'user_model', 'description': 'Create user model', 'dependencies': []},
+            {'name': 'login_endpoint', 'description': 'Implement login', 'dependencies': ['user_model']}
+        ]
+        self.planner.initialize_plan.side_effect = lambda task: dict(plan_for(task), implementation_steps=steps)
+        self.generator.generate_code.side_effect = lambda plan: dict(
+            code_for(plan), generated_code={'user_model': 'class User: pass', 'login_endpoint': 'import os'}
+        )
+        review = dict(
+            review_with_score(0.4),
+            security_issues=[{'file': 'login_endpoint', 'issue': 'eval', 'severity': 'HIGH'}],
+            performance_recommendations={
+                'time_complexity': 'O(n^2)',
+                'functions': [{'file': 'user_model', 'function': 'f'}],
+                'issues': [{'file': 'login_endpoint', 'rule': 'nested_iteration'}],
+                'parse_errors': []
+            },
+            style_suggestions=["login_endpoint:1:1: F401 'os' imported but unused"],
+            file_reviews={
+                'user_model': {'style_suggestions': []},
+                'login_endpoint': {'style_suggestions': ["login_endpoint:1:1: F401 'os' imported but unused"]}
+            }
+        )
+        self.reviewer.review_code.side_effect = [review, review_with_score(0.9)]
+
+        self.orchestrator().run_all(self.tasks[:1])
+
+        user_model, login_endpoint = self.generator.generate_code.call_args_list[1].args[0]['implementation_steps']
+        self.assertEqual(user_model['previous_code'], 'class User: pass')
+        self.assertNotIn('review_feedback', user_model)
+        feedback = login_endpoint['review_feedback']
+        self.assertEqual(len(feedback['security_issues']), 1)
+        self.assertEqual(feedback['performance_recommendations']['functions'], [])
+        self.assertEqual(feedback['performance_recommendations']['issues'], [{'file': 'login_endpoint', 'rule': 'nested_iteration'}])
+        self.assertEqual(len(feedback['style_suggestions']), 1)
+
+    def test_gives_up_after_max_cycles(self):
+        self.reviewer.review_code.return_value = review_with_score(0.4)
+
+        outcome, = self.orchestrator(max_cycles=3).run_all(self.tasks[:1])
+
+        self.assertEqual(outcome['status'], 'REQUIRES_MODIFICATION')
+        self.assertEqual(outcome['cycles'], 3)
+        self.assertEqual(self.generator.generate_code.call_count, 3)
+
+    def test_failed_stage_ends_the_task(self):
+        self.planner.initialize_plan.side_effect = lambda task: {'status': 'PLANNING_FAILED', 'error': 'bad task'}
+
+        outcome, = self.orchestrator().run_all(self.tasks[:1])
+
+        self.assertEqual(outcome['status'], 'PLANNING_FAILED')
+        self.assertEqual(outcome['error'], 'bad task')
+        self.generator.generate_code.assert_not_called()
+
+    def test_stages_overlap(self):
+        active = set()
+        overlap = []
+        lock = threading.Lock()
+
+        def slow(stage, function):
+            def run(*args, **kwargs):
+                with lock:
+                    active.add(stage)
+                    overlap.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.discard(stage)
+                return function(*args, **kwargs)
+            return run
+
+        self.planner.initialize_plan.side_effect = slow('plan', plan_for)
+        self.generator.generate_code.side_effect = slow('generate', code_for)
+        self.reviewer.review_code.side_effect = slow('review', lambda *args, **kwargs: review_with_score(0.9))
+
+        outcomes = self.orchestrator(plan_workers=1, generate_workers=1, review_workers=1).run_all(self.tasks)
+
+        self.assertEqual(len(outcomes), len(self.tasks))
+        self.assertEqual(max(overlap), 3)
+
+    def test_slow_review_applies_backpressure_to_intake(self):
+        release = threading.Event()
+        pulled = []
+
+        def tasks():
+            for index in range(100):
+                pulled.append(index)
+                yield {'id': f"task-{index}"}
+
+        def blocked_review(*args, **kwargs):
+            release.wait()
+            return review_with_score(0.9)
+
+        self.reviewer.review_code.side_effect = blocked_review
+        orchestrator = self.orchestrator(plan_workers=1, generate_workers=1, review_workers=1, queue_size=1)
+        outcomes = orchestrator.run(tasks())
+        consumer = threading.Thread(target=lambda: pulled.append(len(list(outcomes))))
+
+        consumer.start()
+        time.sleep(0.2)
+        pulled_while_blocked = len(pulled)
+        release.set()
+        consumer.join(5)
+
+        self.assertLessEqual(pulled_while_blocked, 7)
+        self.assertEqual(pulled[-1], 100)
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import patch
+from plan_graph import PlanGraph, parse_estimated_time
+from planner import CodePlannerAgent
+
+def step(name, dependencies=(), estimated_time='1-2 hours'):
+    return {'name': name, 'description': f'Build {name}', 'estimated_time': estimated_time, 'dependencies': list(dependencies)}
+
+class TestEstimateParsing(unittest.TestCase):
+    def test_parses_ranges_units_and_compounds(self):
+        cases = {
+            '1-2 hours': (1.0, 2.0),
+            '3 to 5 days': (24.0, 40.0),
+            '1 hour 30 minutes': (1.5, 1.5),
+            '45 min': (0.75, 0.75),
+            'half a day': (4.0, 4.0),
+            '2h': (2.0, 2.0),
+            'about 2 hours, maybe 3': (2.0, 3.0),
+            '2 days, maybe 3': (16.0, 24.0),
+            3: (3.0, 3.0),
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_estimated_time(text), expected, text)
+
+    def test_unreadable_estimates(self):
+        for value in ('soon', None, '', True, -1):
+            self.assertIsNone(parse_estimated_time(value))
+
+class TestPlanGraph(unittest.TestCase):
+    def setUp(self):
+        self.steps = [
+            step('database', estimated_time='1 day'),
+            step('user_model', ['Database'], '2-3 hours'),
+            step('login_endpoint', ['user model', 'database'], '4 hours'),
+            step('signup_form', estimated_time='1-2 hours'),
+            step('integration_tests', ['login_endpoint, signup_form'], '2 hours'),
+        ]
+
+    def test_dependency_names_are_resolved(self):
+        graph = PlanGraph(self.steps)
+
+        self.assertTrue(graph.is_valid)
+        self.assertEqual(graph.steps[2]['dependencies'], ['user_model', 'database'])
+        self.assertEqual(graph.steps[4]['dependencies'], ['login_endpoint', 'signup_form'])
+        self.assertEqual(graph.steps[1]['estimated_hours'], {'min': 2.0, 'max': 3.0})
+        self.assertEqual(self.steps[1]['dependencies'], ['Database'])
+
+    def test_step_names_containing_separators_are_not_split(self):
+        graph = PlanGraph([
+            step('Authentication and Authorization'),
+            step('Search, Sort'),
+            step('api', ['Authentication and Authorization', 'search sort'])
+        ])
+
+        self.assertTrue(graph.is_valid, graph.problems)
+        self.assertEqual(graph.steps[2]['dependencies'], ['Authentication and Authorization', 'Search, Sort'])
+
+    def test_schedule_levels_and_critical_path(self):
+        schedule = PlanGraph(self.steps).schedule()
+
+        self.assertEqual(schedule['execution_levels'], [
+            ['database', 'signup_form'], ['user_model'], ['login_endpoint'], ['integration_tests']
+        ])
+        self.assertEqual(schedule['max_parallelism'], 2)
+        self.assertEqual(schedule['critical_path'], ['database', 'user_model', 'login_endpoint', 'integration_tests'])
+        self.assertEqual(schedule['critical_path_hours'], {'min': 16.0, 'max': 17.0})
+        self.assertEqual(schedule['total_hours'], {'min': 17.0, 'max': 19.0})
+
+    def test_cycles_are_reported_with_their_path(self):
+        graph = PlanGraph([step('a', ['b']), step('b', ['c']), step('c', ['a'])])
+
+        self.assertEqual(graph.problems, ['Circular dependency: a -> b -> c -> a'])
+        with self.assertRaises(ValueError):
+            graph.levels()
+
+    def test_unknown_and_duplicate_steps_are_reported(self):
+        graph = PlanGraph([step('a', ['payments']), step('a')])
+
+        self.assertEqual(graph.problems, [
+            "Duplicate step name 'a'",
+            "Step 'a' depends on unknown step 'payments'"
+        ])
+
+class TestPlannerGraph(unittest.TestCase):
+    def setUp(self):
+        self.planner = CodePlannerAgent()
+
+    def plan(self, components):
+        strategy = {'components': components, 'complexity': 'MEDIUM'}
+        with patch.object(self.planner.strategy_generator, 'generate_strategy', return_value=strategy):
+            return self.planner.initialize_plan({'id': 'graph-task'})
+
+    def test_plan_includes_schedule(self):
+        plan = self.plan({
+            'user_model': {'description': 'User model', 'estimated_time': '2 hours'},
+            'login': {'description': 'Login', 'estimated_time': '3 hours', 'dependencies': ['User Model']},
+        })
+
+        self.assertEqual(plan['execution_levels'], [['user_model'], ['login']])
+        self.assertEqual(plan['critical_path_hours'], {'min': 5.0, 'max': 5.0})
+        self.assertTrue(self.planner.validate_plan(plan))
+
+    def test_validate_plan_rejects_cycles_and_dangling_references(self):
+        cyclic = self.plan({
+            'a': {'description': 'A', 'dependencies': ['b']},
+            'b': {'description': 'B', 'dependencies': ['a']},
+        })
+        dangling = self.plan({'a': {'description': 'A', 'dependencies': ['missing']}})
+
+        self.assertEqual(cyclic['dependency_errors'], ['Circular dependency: a -> b -> a'])
+        self.assertNotIn('execution_levels', cyclic)
+        with self.assertLogs('planner', 'WARNING'):
+            self.assertFalse(self.planner.validate_plan(cyclic))
+            self.assertFalse(self.planner.validate_plan(dangling))
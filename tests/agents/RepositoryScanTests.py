@@ -0,0 +1,131 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+from repository_scan import RepositoryScanner, drop_partial_line, read_source
+
+FILES = {
+    'app/models.py': 'class User:\n    def save(self):\n        return True\n',
+    'app/views.py': 'def login(request):\n    return eval(request.body)\n',
+    'app/empty.py': '',
+    'scripts/broken.py': 'def broken(:\n',
+    'README.md': '# not python\n',
+    'node_modules/pkg/index.py': 'x = 1\n',
+    'app/__pycache__/models.py': 'x = 1\n',
+}
+
+class TestRepositoryScanner(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for path, content in FILES.items():
+            self.write(path, content)
+        self.output = os.path.join(self.root, 'scan.jsonl')
+        self.checkpoint = os.path.join(self.root, 'scan.checkpoint.json')
+
+    def write(self, path, content):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as source_file:
+            source_file.write(content)
+
+    def read_output(self):
+        with open(self.output) as output:
+            return [json.loads(line) for line in output]
+
+    def test_walk_honours_include_and_ignore_globs(self):
+        scanner = RepositoryScanner(max_workers=1, ignore=RepositoryScanner().ignore + ('scripts/*',))
+
+        paths = [entry['path'] for entry in scanner.iter_files(self.root)]
+
+        self.assertEqual(paths, ['app/empty.py', 'app/models.py', 'app/views.py'])
+
+    def test_records_match_engine_analysis(self):
+        records = {record['path']: record for record in RepositoryScanner(max_workers=1).scan(self.root)}
+
+        self.assertEqual(set(records), {'app/empty.py', 'app/models.py', 'app/views.py', 'scripts/broken.py'})
+        self.assertEqual(records['app/models.py']['structure']['class_count'], 1)
+        self.assertEqual(records['app/models.py']['lines'], 3)
+        self.assertEqual([finding['rule'] for finding in records['app/views.py']['security_findings']], ['unsafe_eval'])
+        self.assertIn('error', records['scripts/broken.py']['structure'])
+        self.assertEqual(records['app/empty.py']['lines'], 0)
+
+    def test_process_pool_matches_serial_scan(self):
+        serial = sorted(RepositoryScanner(max_workers=1).scan(self.root), key=lambda record: record['path'])
+        pooled = sorted(RepositoryScanner(max_workers=2, chunk_size=1).scan(self.root), key=lambda record: record['path'])
+
+        self.assertEqual(pooled, serial)
+
+    def test_resume_skips_unchanged_files(self):
+        scanner = RepositoryScanner(max_workers=1)
+        first = scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+        self.write('app/views.py', 'def login(request):\n    return request.body\n')
+        self.write('app/forms.py', 'FIELDS = []\n')
+
+        second = scanner.scan_to_jsonl(self.root, self.output, self.checkpoint, resume=True)
+
+        self.assertEqual(first['scanned'], 4)
+        self.assertEqual((second['scanned'], second['skipped']), (2, 3))
+        records = self.read_output()
+        self.assertEqual([record['path'] for record in records[4:]], ['app/forms.py', 'app/views.py'])
+        self.assertEqual(records[-1]['security_findings'], [])
+
+    def test_resume_drops_a_half_written_record(self):
+        scanner = RepositoryScanner(max_workers=1)
+        scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+        with open(self.output, 'a') as output:
+            output.write('{"path":"app/forms.py","si')
+        self.write('app/forms.py', 'FIELDS = []\n')
+
+        scanner.scan_to_jsonl(self.root, self.output, self.checkpoint, resume=True)
+
+        records = self.read_output()
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[-1]['path'], 'app/forms.py')
+
+    def test_drop_partial_line_reads_back_across_blocks(self):
+        path = os.path.join(self.root, 'lines.jsonl')
+        with open(path, 'w') as handle:
+            handle.write('{"a":1}\n' + 'x' * 20)
+
+        drop_partial_line(path, block_size=4)
+
+        with open(path) as handle:
+            self.assertEqual(handle.read(), '{"a":1}\n')
+
+    def test_resume_retries_failed_files(self):
+        scanner = RepositoryScanner(max_workers=1)
+        with patch('repository_scan.read_source', side_effect=OSError('device not ready')):
+            first = scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+
+        second = scanner.scan_to_jsonl(self.root, self.output, self.checkpoint, resume=True)
+
+        self.assertEqual((first['failed'], second['scanned'], second['skipped']), (4, 4, 0))
+        self.assertFalse(any('error' in record for record in self.read_output()[4:]))
+
+    def test_oversized_files_get_skipped_records(self):
+        scanner = RepositoryScanner(max_workers=1, max_file_bytes=50)
+
+        summary = scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+
+        records = {record['path']: record for record in self.read_output()}
+        self.assertEqual(summary['oversized'], 1)
+        self.assertIn('exceeds max_file_bytes', records['app/models.py']['skipped'])
+        self.assertNotIn('structure', records['app/models.py'])
+        self.assertEqual(len(records), 4)
+
+    def test_fresh_scan_replaces_previous_output(self):
+        scanner = RepositoryScanner(max_workers=1)
+        scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+        scanner.scan_to_jsonl(self.root, self.output, self.checkpoint)
+
+        self.assertEqual(len(self.read_output()), 4)
+
+    def test_read_source_uses_replacement_for_bad_bytes(self):
+        path = os.path.join(self.root, 'latin1.py')
+        with open(path, 'wb') as source_file:
+            source_file.write(b'name = "caf\xe9"\n')
+
+        self.assertEqual(read_source(path), 'name = "caf�"\n')
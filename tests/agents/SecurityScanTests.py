@@ -0,0 +1,65 @@
+import unittest
+from bandit_scanner import BatchedBanditScanner
+from analysis_engine import CodeAnalysisEngine
+
+class TestBatchedBanditScanner(unittest.TestCase):
+    def setUp(self):
+        self.scanner = BatchedBanditScanner()
+        self.sample_code = {
+            'user_model': 'class User:\n    pass\n',
+            'run_command': 'import subprocess\nsubprocess.call(cmd, shell=True)\n',
+            'broken': 'def broken(:\n',
+            'parse_input': 'value = eval(raw)\n'
+        }
+
+    def test_findings_mapped_to_files_in_order(self):
+        issues = self.scanner.scan(self.sample_code)
+
+        self.assertEqual([issue['file'] for issue in issues], ['run_command', 'run_command', 'parse_input'])
+        self.assertEqual(set(issues[0]), {'file', 'issue', 'severity'})
+        self.assertEqual(issues[1]['severity'], 'HIGH')
+
+    def test_repeated_scans_do_not_accumulate_results(self):
+        first = self.scanner.scan(self.sample_code)
+        second = self.scanner.scan(self.sample_code)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.scanner.scan({'user_model': self.sample_code['user_model']}), [])
+
+class TestSecurityRuleScanner(unittest.TestCase):
+    def setUp(self):
+        self.engine = CodeAnalysisEngine()
+        self.sample_code = (
+            "user = load_user()\n"
+            "cursor.execute('SELECT * FROM users WHERE id=' + sql_id)\n"
+            "password = plain_text; eval(raw)\n"
+        )
+
+    def test_categories_and_messages(self):
+        vulnerabilities = self.engine.security_vulnerability_scan(self.sample_code)
+
+        self.assertEqual(vulnerabilities, {
+            'input_validation': ['Potential unsafe input handling'],
+            'potential_injection_risks': ['Potential SQL injection risk'],
+            'authentication_issues': ['Potential plaintext password storage']
+        })
+
+    def test_findings_report_line_and_column(self):
+        findings = self.engine.security_findings(self.sample_code)
+
+        self.assertEqual(
+            [(finding['rule'], finding['line'], finding['column']) for finding in findings],
+            [('sql_injection', 2, 7), ('plaintext_password', 3, 0), ('unsafe_eval', 3, 23)]
+        )
+
+    def test_fragments_must_share_a_line(self):
+        findings = self.engine.security_findings("cursor.execute(query)\nsql = 'SELECT 1'\n")
+
+        self.assertEqual(findings, [])
+
+    def test_streams_lines(self):
+        lines = iter(["x = 1\n", "value = eval(data)\n"])
+
+        findings = list(self.engine.iter_security_findings(lines))
+
+        self.assertEqual(findings[0]['line'], 2)
@@ -0,0 +1,172 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from agent_fixtures import USER_MODEL_CODE
+from snippet_index import SnippetIndex, description_shingles, jaccard
+from generator import CodeGenerationAgent
+
+class TestSnippetIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SnippetIndex()
+        self.index.add('Create the user model with username and email fields', USER_MODEL_CODE)
+        self.index.add('Implement the login endpoint with session tokens', 'def login(): pass')
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_shingles_ignore_case_stopwords_and_plurals(self):
+        self.assertEqual(description_shingles('Create the User model'), description_shingles('create user models'))
+        self.assertEqual(jaccard(set(), {'user'}), 0.0)
+
+    def test_near_duplicate_description_matches(self):
+        match = self.index.query('Create a user model with username and email field')
+
+        self.assertEqual(match['code'], USER_MODEL_CODE)
+        self.assertEqual(match['similarity'], 1.0)
+
+        match = self.index.query('Create the user model with username, email and password fields')
+        self.assertEqual(match['code'], USER_MODEL_CODE)
+        self.assertGreater(match['similarity'], 0.6)
+        self.assertLess(match['similarity'], 1.0)
+
+    def test_unrelated_description_misses(self):
+        self.assertIsNone(self.index.query('Configure nightly database backups'))
+        self.assertIsNone(self.index.query('Create the user model', threshold=0.9))
+        self.assertIsNone(self.index.query('the and of'))
+        self.assertEqual(self.index.stats()['misses'], 3)
+
+    def test_identical_description_replaces_code(self):
+        first = self.index.query('Create user models with username and email field')['id']
+
+        second = self.index.add('create the user model with username & email fields', 'class User: pass')
+
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.query('Create user model with username and email fields')['code'], 'class User: pass')
+
+    def test_identical_description_found_past_a_crowded_bucket(self):
+        index = SnippetIndex(max_candidates=1)
+        decoy = index.add('Delete inactive accounts', 'def purge(): pass')
+        description = 'Create the order model'
+        first_bucket = index._buckets(index.signature(description_shingles(description)))[0]
+        index._connection.execute('INSERT INTO snippet_buckets VALUES (?, ?)', (first_bucket, decoy))
+        first = index.add(description, 'class Order: pass')
+
+        second = index.add(description, 'class Order:\n    pass\n')
+
+        self.assertEqual(second, first)
+        self.assertEqual(len(index), 2)
+
+class TestSnippetIndexPersistence(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'snippets.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_snippets_survive_reopening(self):
+        index = SnippetIndex(self.path)
+        index.add_many([('Create user model', USER_MODEL_CODE), ('Implement login endpoint', 'def login(): pass')])
+        index.close()
+
+        reopened = SnippetIndex(self.path)
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(reopened.query('create the user model')['code'], USER_MODEL_CODE)
+        reopened.close()
+
+    def test_older_index_is_migrated(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            'CREATE TABLE snippets (id INTEGER PRIMARY KEY, description TEXT NOT NULL, code TEXT NOT NULL, '
+            'code_hash TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        connection.execute("INSERT INTO snippets VALUES (1, 'Create user model', 'class User: pass', '', 0)")
+        connection.commit()
+        connection.close()
+
+        index = SnippetIndex(self.path)
+        snippet_id = index.add('create the user models', USER_MODEL_CODE)
+        index.close()
+
+        self.assertEqual(snippet_id, 1)
+
+    def test_mismatched_settings_are_rejected(self):
+        SnippetIndex(self.path).close()
+
+        with self.assertRaises(ValueError):
+            SnippetIndex(self.path, num_perm=128)
+
+class TestGeneratorSnippetReuse(unittest.TestCase):
+    def setUp(self):
+        self.llm_client = MagicMock()
+        self.llm_client.chat_completion.side_effect = self.respond
+        self.index = SnippetIndex()
+        self.generator = CodeGenerationAgent(llm_client=self.llm_client, snippet_index=self.index)
+        self.plan = {
+            'task_id': 'auth-task-001',
+            'implementation_steps': [
+                {'name': 'user_model', 'description': 'Create user model with username field', 'dependencies': []},
+                {'name': 'login_endpoint', 'description': 'Implement login endpoint', 'dependencies': ['user_model']}
+            ]
+        }
+
+    def tearDown(self):
+        self.index.close()
+
+    def respond(self, **request):
+        response = MagicMock()
+        response.choices[0].message.content = 'def login(): pass'
+        return response
+
+    def test_matching_step_reuses_code_without_llm_call(self):
+        self.index.add('Create the user model with a username field', USER_MODEL_CODE)
+
+        result = self.generator.generate_code(self.plan)
+
+        self.assertEqual(result['generated_code']['user_model'], USER_MODEL_CODE)
+        self.assertEqual(result['reused_steps'], ['user_model'])
+        self.assertEqual(self.llm_client.chat_completion.call_count, 1)
+
+    def test_weaker_match_seeds_the_prompt(self):
+        self.index.add('Implement login endpoint for admins', 'def admin_login(): pass')
+
+        result = self.generator.generate_code(self.plan)
+
+        self.assertEqual(result['reused_steps'], [])
+        login_request = self.llm_client.chat_completion.call_args_list[-1].kwargs
+        self.assertIn('def admin_login(): pass', login_request['messages'][1]['content'])
+
+    def test_regenerated_steps_do_not_reuse(self):
+        self.index.add('Create the user model with a username field', USER_MODEL_CODE)
+        for step in self.plan['implementation_steps']:
+            step['review_feedback'] = {'quality_score': 40}
+
+        result = self.generator.generate_code(self.plan)
+
+        self.assertEqual(result['reused_steps'], [])
+        self.assertEqual(self.llm_client.chat_completion.call_count, 2)
+
+    def test_previous_code_is_kept_without_llm_call(self):
+        self.plan['implementation_steps'][0]['previous_code'] = USER_MODEL_CODE
+        self.plan['implementation_steps'][1]['review_feedback'] = {'quality_score': 40}
+
+        result = self.generator.generate_code(self.plan)
+
+        self.assertEqual(result['generated_code']['user_model'], USER_MODEL_CODE)
+        self.assertEqual(result['reused_steps'], [])
+        self.assertEqual(self.llm_client.chat_completion.call_count, 1)
+        login_request = self.llm_client.chat_completion.call_args_list[0].kwargs
+        self.assertIn(USER_MODEL_CODE.strip(), login_request['messages'][1]['content'])
+
+    def test_accepted_code_is_remembered(self):
+        result = self.generator.generate_code(self.plan)
+
+        self.assertEqual(self.generator.remember_accepted_code(self.plan, result), 2)
+        self.assertEqual(self.index.query('implement the login endpoints')['code'], 'def login(): pass')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+from step_scheduler import StepScheduler
+
+class TestStepScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = StepScheduler(max_concurrency=4)
+        self.sample_steps = [
+            {'name': 'user_model', 'dependencies': []},
+            {'name': 'login_endpoint', 'dependencies': ['user_model']},
+            {'name': 'password_hashing', 'dependencies': []},
+            {'name': 'jwt_tokens', 'dependencies': ['login_endpoint', 'password_hashing']}
+        ]
+
+    def test_results_keep_step_order(self):
+        def worker(step):
+            time.sleep(0.01 if step['name'] == 'user_model' else 0)
+            return step['name'].upper()
+
+        results = self.scheduler.run(self.sample_steps, worker)
+
+        self.assertEqual(results, ['USER_MODEL', 'LOGIN_ENDPOINT', 'PASSWORD_HASHING', 'JWT_TOKENS'])
+
+    def test_dependencies_finish_before_dependents_start(self):
+        finished = set()
+        lock = threading.Lock()
+
+        def worker(step):
+            with lock:
+                self.assertTrue(set(step['dependencies']) <= finished)
+            time.sleep(0.005)
+            with lock:
+                finished.add(step['name'])
+
+        self.scheduler.run(self.sample_steps, worker)
+
+        self.assertEqual(len(finished), 4)
+
+    def test_independent_steps_run_concurrently(self):
+        steps = [{'name': f'step_{i}', 'dependencies': []} for i in range(4)]
+        barrier = threading.Barrier(4, timeout=2)
+
+        results = self.scheduler.run(steps, lambda step: barrier.wait() is not None)
+
+        self.assertTrue(all(results))
+
+    def test_levels_group_steps_into_dependency_waves(self):
+        self.assertEqual(self.scheduler.levels(self.sample_steps), [[0, 2], [1], [3]])
+
+    def test_circular_dependencies_rejected(self):
+        steps = [
+            {'name': 'a', 'dependencies': ['b']},
+            {'name': 'b', 'dependencies': ['a']}
+        ]
+
+        with self.assertRaises(ValueError):
+            self.scheduler.run(steps, lambda step: None)
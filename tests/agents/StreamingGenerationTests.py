@@ -0,0 +1,82 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from generator import CodeGenerationAgent
+from incremental_syntax import IncrementalSyntaxChecker
+
+def completion_stream(text, chunk_size=8):
+    return iter([
+        SimpleNamespace(choices=[SimpleNamespace(delta={'content': text[start:start + chunk_size]})])
+        for start in range(0, len(text), chunk_size)
+    ] + [SimpleNamespace(choices=[], usage={'prompt_tokens': 20, 'completion_tokens': 20, 'total_tokens': 40})])
+
+VALID_CODE = 'def create_user(username):\n    """Create a user."""\n    return {"name": username}\n'
+BROKEN_CODE = 'def create_user(username:\n    return username\n\nx = 1\ny = 2\nz = 3\n'
+
+class TestIncrementalSyntaxChecker(unittest.TestCase):
+    def test_unfinished_code_is_not_flagged(self):
+        checker = IncrementalSyntaxChecker()
+
+        for chunk in ['def f(x):\n', '    s = """doc\n', 'more\n', '"""\n', '    return (x,\n', '      1)\n']:
+            self.assertIsNone(checker.feed(chunk))
+
+    def test_broken_code_flagged_after_grace_lines(self):
+        checker = IncrementalSyntaxChecker(grace_lines=2)
+
+        self.assertIsNone(checker.feed('x = 1\n)\n'))
+        self.assertIsNone(checker.feed('y = 2\n'))
+        self.assertIsInstance(checker.feed('z = 3\n'), SyntaxError)
+
+    def test_markdown_fence_is_ignored(self):
+        checker = IncrementalSyntaxChecker(grace_lines=0)
+
+        self.assertIsNone(checker.feed('```python\nx = 1\n```\nThis explains the code.\n'))
+
+    def test_prose_before_the_fence_is_skipped(self):
+        checker = IncrementalSyntaxChecker(grace_lines=0)
+        reply = 'Here is the user model you asked for.\nIt stores the username.\n\n```python\nclass User:\n    pass\n```\n'
+
+        self.assertIsNone(checker.feed(reply))
+
+    def test_broken_code_after_prose_is_flagged(self):
+        checker = IncrementalSyntaxChecker(grace_lines=0)
+
+        self.assertIsInstance(checker.feed('Here it is:\n```python\ndef f(:\n    pass\n'), SyntaxError)
+
+class TestStreamingGeneration(unittest.TestCase):
+    def setUp(self):
+        self.llm_client = MagicMock()
+        self.generator = CodeGenerationAgent(llm_client=self.llm_client)
+        self.sample_plan = {
+            'task_id': 'auth-task-001',
+            'implementation_steps': [
+                {'name': 'user_model', 'description': 'Create user model', 'dependencies': []},
+                {'name': 'login_endpoint', 'description': 'Implement login', 'dependencies': ['user_model']}
+            ]
+        }
+
+    def test_broken_attempt_is_cancelled_and_retried(self):
+        self.llm_client.chat_completion.side_effect = [
+            completion_stream(BROKEN_CODE),
+            completion_stream(VALID_CODE)
+        ]
+
+        events = list(self.generator.stream_code_for_step(self.sample_plan['implementation_steps'][0]))
+
+        self.assertEqual([event['type'] for event in events if event['type'] != 'chunk'], ['retry', 'step_complete'])
+        self.assertEqual(events[-1]['code'], VALID_CODE.strip())
+        first_attempt = ''.join(event['content'] for event in events if event.get('attempt') == 0 and event['type'] == 'chunk')
+        self.assertLess(len(first_attempt), len(BROKEN_CODE))
+
+    def test_stream_ends_with_generate_code_result(self):
+        self.llm_client.chat_completion.side_effect = lambda **kwargs: completion_stream(VALID_CODE)
+
+        events = list(self.generator.generate_code_stream(self.sample_plan))
+
+        self.assertEqual(events[-1]['type'], 'complete')
+        self.assertEqual(events[-1]['result'], {
+            'task_id': 'auth-task-001',
+            'status': 'CODE_GENERATION_COMPLETE',
+            'generated_code': {'user_model': VALID_CODE.strip(), 'login_endpoint': VALID_CODE.strip()},
+            'language': 'python'
+        })
@@ -0,0 +1,93 @@
+import unittest
+from analysis_engine import CodeAnalysisEngine
+from reviewer import CodeReviewAgent
+
+def codes(findings):
+    return [(finding['line'], finding['code']) for finding in findings]
+
+class TestStyleChecker(unittest.TestCase):
+    def setUp(self):
+        self.engine = CodeAnalysisEngine(max_line_length=40)
+
+    def test_line_length_includes_multiline_strings(self):
+        code = 'TEXT = """\n' + 'x' * 50 + '\n"""\nshort = 1\nvalue = 1  # ' + 'y' * 40 + '\n'
+
+        self.assertEqual(codes(self.engine.style_findings(code)), [(2, 'E501'), (5, 'E501')])
+
+    def test_naming_conventions(self):
+        code = (
+            'class user_store:\n'
+            '    def setUp(self): pass\n'
+            '    def visit_For(self, node): pass\n'
+            '    def Save(self, userId):\n'
+            '        tempValue = userId\n'
+            '        MAX_RETRIES = 3\n'
+            '        return tempValue, MAX_RETRIES\n'
+        )
+
+        self.assertEqual(codes(self.engine.style_findings(code)), [
+            (1, 'N801'), (4, 'N802'), (4, 'N803'), (5, 'N806')
+        ])
+
+    def test_unused_imports(self):
+        code = (
+            'import os\n'
+            'import os.path\n'
+            'import json as serializer\n'
+            'from typing import Dict, List, Optional\n'
+            'from __future__ import annotations\n'
+            'def load(path) -> "Dict":\n'
+            '    return serializer.loads(path)\n'
+            'def names(p: "Optional[List[str]]"):\n'
+            '    return p\n'
+        )
+
+        findings = self.engine.style_findings(code)
+
+        self.assertEqual([finding['message'] for finding in findings], ["'os' imported but unused"])
+        self.assertEqual(self.engine.style_findings('import os\n', '__init__.py'), [])
+
+    def test_bare_except_and_mutable_defaults(self):
+        code = (
+            'def run(items=[], options=None, *, cache=dict()):\n'
+            '    try:\n'
+            '        return items\n'
+            '    except:\n'
+            '        return None\n'
+        )
+
+        findings = CodeAnalysisEngine().style_findings(code)
+
+        self.assertEqual(codes(findings), [(1, 'B006'), (1, 'B006'), (4, 'E722')])
+
+    def test_noqa_suppresses_a_line(self):
+        self.assertEqual(self.engine.style_findings('import os  # noqa\n'), [])
+
+    def test_syntax_error_is_reported(self):
+        self.assertEqual(codes(self.engine.style_findings('def broken(:\n')), [(1, 'E999')])
+
+    def test_review_formats_suggestions_per_file(self):
+        suggestions = self.engine.check_code_style({
+            'models.py': 'import os\n',
+            'views.py': 'def View(): pass\n'
+        })
+
+        self.assertEqual(suggestions, [
+            "models.py:1:1: F401 'os' imported but unused",
+            "views.py:1:1: N802 function name 'View' should be lowercase"
+        ])
+
+    def test_suggestions_keyed_by_file(self):
+        suggestions = self.engine.check_code_style_by_file({'a': 'import os\n', 'a:b.py': 'x = 1\n'})
+
+        self.assertEqual(suggestions, {'a': ["a:1:1: F401 'os' imported but unused"], 'a:b.py': []})
+
+    def test_review_code_completes_with_style_and_performance(self):
+        review = CodeReviewAgent().review_code({
+            'task_id': 'style-task',
+            'generated_code': {'module.py': 'def total(values):\n    return sum(values)\n'}
+        })
+
+        self.assertEqual(review['status'], 'REVIEW_COMPLETE')
+        self.assertEqual(review['style_suggestions'], [])
+        self.assertEqual(review['performance_recommendations']['time_complexity'], 'O(1)')
@@ -0,0 +1,218 @@
+"""
+Microbenchmarks for the code analysis path on synthetic scaling corpora.
+
+Each corpus is a generated Python module controlled by its function count,
+nesting depth and statements per function. Every benchmark target is timed
+cold (analysis contexts cleared, best-of-N wall time) and then run once more
+under tracemalloc for peak memory. Results are written as JSON so runs from
+different commits can be compared:
+
+    PYTHONPATH=agents/shared/src:agents/code-reviewer/src python tests/benchmarks/AnalysisMicrobenchmarks.py --output before.json
+    ... change code ...
+    PYTHONPATH=agents/shared/src:agents/code-reviewer/src python tests/benchmarks/AnalysisMicrobenchmarks.py --baseline before.json
+
+With --baseline the script prints per-benchmark time ratios and exits
+non-zero if any benchmark slowed down by more than --max-regression.
+"""
+import ast
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from analysis_engine import CodeAnalysisEngine
+from reviewer import CodeReviewAgent
+
+FUNCTION_COUNTS = [10, 100, 1000]
+NESTING_DEPTHS = [1, 4, 8]
+STATEMENTS_PER_FUNCTION = [5, 25]
+QUICK_FUNCTION_COUNTS = [10, 100]
+REPEATS = 5
+MAX_REGRESSION = 1.25
+
+
+def synthetic_corpus(function_count: int, nesting_depth: int, statements: int) -> str:
+    """
+    Build a module of function_count functions, each nesting nesting_depth
+    control-flow blocks around statements simple assignments.
+    """
+    headers = ['if value > {level}:', 'for item in range({level}):', 'while value < {level}:']
+    lines = ['import os', '', '']
+    for index in range(function_count):
+        if index % 10 == 0:
+            lines.append(f"class Component{index}:")
+            lines.append(f"    limit = {index}")
+            lines.append('')
+        lines.append(f"def handler_{index}(value, items=None):")
+        indent = '    '
+        for level in range(nesting_depth):
+            lines.append(indent + headers[level % len(headers)].format(level=level))
+            indent += '    '
+        for statement in range(statements):
+            lines.append(f"{indent}value = value + {statement}")
+        lines.append(f"{indent}pass")
+        lines.append('    return value')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def benchmark_targets(engine: CodeAnalysisEngine, agent: CodeReviewAgent):
+    """
+    Map benchmark name to (setup, run): setup prepares the input outside the
+    timed region, run is the measured call.
+    """
+    def cold(code: str) -> str:
+        engine.contexts.clear()
+        agent.analysis_engine.contexts.clear()
+        return code
+
+    return {
+        'analyze_code_structure': (cold, engine.analyze_code_structure),
+        '_calculate_cyclomatic_complexity': (ast.parse, engine._calculate_cyclomatic_complexity),
+        '_check_nested_complexity': (ast.parse, engine._check_nested_complexity),
+        'security_vulnerability_scan': (cold, engine.security_vulnerability_scan),
+        'analyze_performance': (lambda code: {'module.py': cold(code)}, engine.analyze_performance),
+        'check_code_style': (lambda code: {'module.py': cold(code)}, engine.check_code_style),
+        'review_code': (
+            lambda code: {'task_id': 'benchmark', 'generated_code': {'module.py': cold(code)}},
+            agent.review_code
+        ),
+    }
+
+
+def measure(setup, run, code: str, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        argument = setup(code)
+        gc.collect()
+        start = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - start)
+
+    # Peak memory is taken in a separate run: tracemalloc slows allocation
+    # enough to distort the timings above.
+    argument = setup(code)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_time_s': {
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings)
+        },
+        'peak_memory_bytes': peak
+    }
+
+
+def corpus_grid(quick: bool):
+    function_counts = QUICK_FUNCTION_COUNTS if quick else FUNCTION_COUNTS
+    for function_count in function_counts:
+        for nesting_depth in NESTING_DEPTHS:
+            for statements in STATEMENTS_PER_FUNCTION:
+                yield {'function_count': function_count, 'nesting_depth': nesting_depth, 'statements': statements}
+
+
+def run_suite(repeats: int, quick: bool, only: list = None) -> dict:
+    engine = CodeAnalysisEngine()
+    agent = CodeReviewAgent()
+    targets = benchmark_targets(engine, agent)
+    results = []
+
+    for corpus in corpus_grid(quick):
+        code = synthetic_corpus(**corpus)
+        for name, (setup, run) in targets.items():
+            if only and name not in only:
+                continue
+            result = {
+                'benchmark': name,
+                'corpus': dict(corpus, lines=code.count('\n'), bytes=len(code)),
+            }
+            result.update(measure(setup, run, code, repeats))
+            results.append(result)
+            print(
+                f"{name:<34} {corpus['function_count']:>5}f {corpus['nesting_depth']:>2}d "
+                f"{corpus['statements']:>3}s {result['wall_time_s']['min']:>10.5f}s "
+                f"{result['peak_memory_bytes'] / 1024:>10.1f} KiB",
+                file=sys.stderr
+            )
+
+    return {'metadata': run_metadata(repeats), 'results': results}
+
+
+def run_metadata(repeats: int) -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats
+    }
+
+
+def result_key(result: dict) -> tuple:
+    corpus = result['corpus']
+    return (result['benchmark'], corpus['function_count'], corpus['nesting_depth'], corpus['statements'])
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> int:
+    """Print current/baseline time ratios; return 1 if any exceeds max_regression."""
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = 0
+    print(f"{'benchmark':<34} {'corpus':>14} {'baseline (s)':>13} {'current (s)':>12} {'ratio':>7}")
+    for result in current['results']:
+        key = result_key(result)
+        if key not in previous:
+            continue
+        before = previous[key]['wall_time_s']['min']
+        after = result['wall_time_s']['min']
+        ratio = after / before if before else float('inf')
+        flag = ' REGRESSION' if ratio > max_regression else ''
+        regressions += bool(flag)
+        corpus = f"{key[1]}f/{key[2]}d/{key[3]}s"
+        print(f"{key[0]:<34} {corpus:>14} {before:>13.5f} {after:>12.5f} {ratio:>6.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='Compare against a previous JSON result file')
+    parser.add_argument('--max-regression', type=float, default=MAX_REGRESSION)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--quick', action='store_true', help='Skip the largest corpora')
+    parser.add_argument('--only', nargs='+', help='Run only the named benchmarks')
+    args = parser.parse_args()
+
+    report = run_suite(args.repeats, args.quick, args.only)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            return compare(json.load(baseline), report, args.max_regression)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
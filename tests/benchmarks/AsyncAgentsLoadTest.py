@@ -0,0 +1,98 @@
+"""
+Hold thousands of in-flight async generation tasks in one process.
+
+For each task count, that many CodeGenerationAgent.agenerate_code calls
+are started at once on one event loop against a local stand-in server
+(run in a subprocess, so its threads are not counted). The report gives
+wall time, peak traced memory per in-flight task and the thread count; a
+flat bytes/task column across task counts means memory grows linearly
+with load, with no per-task thread.
+
+Run with the shared and generator sources and test support on the path:
+
+    PYTHONPATH=agents/shared/src:agents/code-generator/src:tests/support \\
+        python tests/benchmarks/AsyncAgentsLoadTest.py --tasks 500 2000 --latency constant:1.0
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import tracemalloc
+import subprocess
+from async_llm_client import AsyncLLMClient
+from generator import CodeGenerationAgent
+
+SERVER = os.path.join(os.path.dirname(__file__), '..', 'support', 'fake_openai_server.py')
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def plan(index: int) -> dict:
+    return {
+        'task_id': f"load-{index}",
+        'implementation_steps': [{'name': 'handler', 'description': f"Implement handler {index}", 'dependencies': []}]
+    }
+
+
+async def run_tasks(base_url: str, tasks: int, concurrency: int) -> dict:
+    async with AsyncLLMClient(
+        base_url=base_url, initial_concurrency=concurrency, max_concurrency=concurrency, timeout=300
+    ) as client:
+        generator = CodeGenerationAgent(async_llm_client=client)
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = await asyncio.gather(*(generator.agenerate_code(plan(index)) for index in range(tasks)))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    failed = sum(result['status'] != 'CODE_GENERATION_COMPLETE' for result in results)
+    return {'elapsed': elapsed, 'peak': peak, 'failed': failed, 'threads': threading.active_count()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--concurrency', type=int, default=256, help='HTTP requests in flight at once')
+    parser.add_argument('--latency', default='constant:1.0')
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, SERVER, '--port', str(port), '--latency', args.latency],
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+        print(f"concurrency: {args.concurrency}, latency: {args.latency}")
+        print(f"{'tasks':>7} {'wall (s)':>9} {'tasks/s':>8} {'peak (MB)':>10} {'bytes/task':>11} {'threads':>8} {'failed':>7}")
+        failures = 0
+        for tasks in args.tasks:
+            report = asyncio.run(run_tasks(f"http://127.0.0.1:{port}/v1", tasks, args.concurrency))
+            failures += report['failed']
+            print(
+                f"{tasks:>7} {report['elapsed']:>9.2f} {tasks / report['elapsed']:>8.1f} "
+                f"{report['peak'] / 2 ** 20:>10.1f} {report['peak'] / tasks:>11.0f} "
+                f"{report['threads']:>8} {report['failed']:>7}"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    return 0 if failures == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
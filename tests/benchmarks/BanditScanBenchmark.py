@@ -0,0 +1,90 @@
+"""
+Compare per-snippet Bandit runs (a fresh manager per file) against one
+batched run over all files. Pass --with-cli to also time one Bandit
+command-line process per file, the usual out-of-process fallback.
+
+Run with the reviewer sources on the path:
+
+    PYTHONPATH=agents/code-reviewer/src python tests/benchmarks/BanditScanBenchmark.py
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from bandit_scanner import BatchedBanditScanner
+
+FILE_COUNTS = [1, 10, 100]
+REPEATS = 5
+
+SNIPPET = '''
+import subprocess
+
+def run_command_{n}(command, password="hunter{n}"):
+    if not command:
+        return None
+    result = subprocess.call(command, shell=True)
+    return eval(str(result))
+'''
+
+
+def per_snippet_scan(snippets: dict) -> list:
+    issues = []
+    for filename, snippet in snippets.items():
+        issues.extend(BatchedBanditScanner().scan({filename: snippet}))
+    return issues
+
+
+def cli_per_file_scan(snippets: dict) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for filename, snippet in snippets.items():
+            path = os.path.join(directory, f"{filename}.py")
+            with open(path, 'w') as handle:
+                handle.write(snippet)
+            subprocess.run(
+                [sys.executable, '-m', 'bandit', '-q', '-f', 'json', path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+
+
+def batched_scan(snippets: dict, scanner: BatchedBanditScanner) -> list:
+    return scanner.scan(snippets)
+
+
+def best_of(function) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    with_cli = '--with-cli' in sys.argv
+    scanner = BatchedBanditScanner()
+    scanner.scan({'warmup': SNIPPET.format(n=0)})
+
+    header = f"{'files':>6} {'per-snippet (s)':>16} {'batched (s)':>12} {'speedup':>8}"
+    print(header + (f" {'cli/file (s)':>13}" if with_cli else ''))
+    for file_count in FILE_COUNTS:
+        snippets = {f"step_{n}": SNIPPET.format(n=n) for n in range(file_count)}
+
+        if batched_scan(snippets, scanner) != per_snippet_scan(snippets):
+            print(f"Result mismatch at {file_count} files")
+            return 1
+
+        per_snippet = best_of(lambda: per_snippet_scan(snippets))
+        batched = best_of(lambda: batched_scan(snippets, scanner))
+        row = f"{file_count:>6} {per_snippet:>16.4f} {batched:>12.4f} {per_snippet / batched:>7.2f}x"
+        if with_cli:
+            start = time.perf_counter()
+            cli_per_file_scan(snippets)
+            row += f" {time.perf_counter() - start:>13.4f}"
+        print(row)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
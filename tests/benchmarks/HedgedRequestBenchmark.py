@@ -0,0 +1,86 @@
+"""
+Compare tail latency of plain and hedged chat completions against a local
+stand-in server with heavy-tailed injected latency.
+
+The same request sequence runs through an LLMClient and through a
+HedgedLLMClient that re-sends calls slower than the tracked p95 to a
+second stand-in endpoint with the same latency distribution. The report
+gives p50/p95/p99 per mode, the extra requests hedging cost and the hedge
+win rate.
+
+Run with the shared sources and test support on the path:
+
+    PYTHONPATH=agents/shared/src:tests/support \\
+        python tests/benchmarks/HedgedRequestBenchmark.py --requests 400 --latency lognormal:0.05,0.8
+"""
+import sys
+import math
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from fake_openai_server import FakeOpenAIServer, parse_latency
+from llm_client import LLMClient
+from llm_hedging import HedgedLLMClient
+
+PERCENTILES = [50, 95, 99]
+REQUEST = {
+    'model': 'gpt-4-turbo',
+    'messages': [{'role': 'user', 'content': 'Create user model'}],
+    'max_tokens': 50
+}
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered), math.ceil(rank / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def run(client, requests: int, concurrency: int) -> List[float]:
+    def timed(_) -> float:
+        start = time.perf_counter()
+        client.chat_completion(**REQUEST)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, range(requests)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', default='lognormal:0.05,0.8')
+    args = parser.parse_args()
+
+    latency = parse_latency(args.latency)
+    with FakeOpenAIServer(latency=latency) as primary_server, FakeOpenAIServer(latency=latency) as secondary_server:
+        def client(server) -> LLMClient:
+            return LLMClient(base_url=server.base_url, initial_concurrency=64)
+
+        plain = run(client(primary_server), args.requests, args.concurrency)
+        hedged_client = HedgedLLMClient(client(primary_server), client(secondary_server))
+        # Seed the latency window so hedging starts from a measured p95
+        for seconds in plain:
+            hedged_client.latency.record(seconds)
+        hedged = run(hedged_client, args.requests, args.concurrency)
+        stats = hedged_client.stats()
+        hedged_client.close()
+
+    print(f"requests: {args.requests}, concurrency: {args.concurrency}, latency: {args.latency}")
+    print(f"{'mode':>8} " + ' '.join(f"{f'p{rank} (ms)':>10}" for rank in PERCENTILES))
+    for name, timings in (('plain', plain), ('hedged', hedged)):
+        print(f"{name:>8} " + ' '.join(f"{percentile(timings, rank) * 1000:>10.1f}" for rank in PERCENTILES))
+    print(
+        f"hedged: {stats['hedged']} ({stats['hedge_rate']:.1%} extra requests), "
+        f"hedge win rate: {stats['hedge_win_rate']:.1%}, hedge delay: {stats['hedge_delay'] * 1000:.1f}ms"
+    )
+    return 0 if percentile(hedged, 99) < percentile(plain, 99) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Check that the static performance analyzer scales linearly with code size.
+
+Synthetic modules are doubled from 2k to 64k lines; each is parsed outside
+the timed region and then walked by a fresh PerformanceVisitor (best of N).
+The scaling exponent is the slope of log(time) against log(lines); the script
+exits non-zero if it exceeds --max-exponent.
+
+Run with the reviewer sources on the path:
+
+    PYTHONPATH=agents/code-reviewer/src python tests/benchmarks/PerformanceAnalysisBenchmark.py
+"""
+import ast
+import sys
+import math
+import time
+import argparse
+from performance_visitor import PerformanceVisitor
+
+LINE_COUNTS = [2000, 4000, 8000, 16000, 32000, 64000]
+REPEATS = 5
+MAX_EXPONENT = 1.15
+
+
+def synthetic_module(line_count: int) -> str:
+    """Build a module of roughly line_count lines that triggers every detected pattern."""
+    block = [
+        "def report_{i}(users, names: list, depth):",
+        "    seen = []",
+        "    text = ''",
+        "    for user in users:",
+        "        for other in users:",
+        "            if other not in seen:",
+        "                seen.append(other)",
+        "        text += str(user)",
+        "        path = os.path.join(user, str(len(names)))",
+        "    if depth > 0:",
+        "        report_{i}(users, names, depth - 1)",
+        "    return sorted(seen)",
+        "",
+        "class Handler{i}:",
+        "    def run(self, rows):",
+        "        return [self.rows.get(row) for row in rows if row]",
+        "",
+    ]
+    lines = ['import os', '']
+    index = 0
+    while len(lines) < line_count:
+        lines.extend(line.format(i=index) for line in block)
+        index += 1
+    return "\n".join(lines) + "\n"
+
+
+def time_analysis(tree: ast.Module, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        PerformanceVisitor().visit(tree)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scaling_exponent(points) -> float:
+    """Least-squares slope of log(seconds) over log(lines)."""
+    xs = [math.log(lines) for lines, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    return numerator / denominator
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--max-exponent', type=float, default=MAX_EXPONENT)
+    args = parser.parse_args()
+
+    points = []
+    print(f"{'lines':>8} {'issues':>8} {'time (s)':>10} {'us/line':>8}")
+    for line_count in LINE_COUNTS:
+        code = synthetic_module(line_count)
+        tree = ast.parse(code)
+        visitor = PerformanceVisitor()
+        visitor.visit(tree)
+        seconds = time_analysis(tree, args.repeats)
+        lines = code.count('\n')
+        points.append((lines, seconds))
+        print(f"{lines:>8} {len(visitor.issues):>8} {seconds:>10.4f} {seconds / lines * 1e6:>8.2f}")
+
+    exponent = scaling_exponent(points)
+    print(f"scaling exponent: {exponent:.3f} (linear = 1.0, limit {args.max_exponent})")
+    return 0 if exponent <= args.max_exponent else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+End-to-end load test of the planner -> generator -> reviewer pipeline
+against a local OpenAI-compatible stand-in server.
+
+N synthetic tasks are pushed through CodePlannerAgent.initialize_plan,
+CodeGenerationAgent.generate_code and CodeReviewAgent.review_code by a
+pool of task workers, once per concurrency level. The report gives
+p50/p95/p99 latency per stage, failures per stage, overall tasks per
+second and the LLM client's retry counters.
+
+Run with the agent sources and test support on the path:
+
+    PYTHONPATH=agents/shared/src:agents/code-planner/src:agents/code-generator/src:agents/code-reviewer/src:tests/support \\
+        python tests/benchmarks/PipelineLoadTest.py --tasks 200 --concurrency 1 8 32 --latency lognormal:0.2,0.5
+"""
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from fake_openai_server import FakeOpenAIServer, parse_latency
+from llm_client import LLMClient
+from planner import CodePlannerAgent
+from generator import CodeGenerationAgent
+from reviewer import CodeReviewAgent
+
+STAGES = ['plan', 'generate', 'review']
+PERCENTILES = [50, 95, 99]
+
+STRATEGY_TEMPLATE = json.dumps({
+    'components': {
+        'user_model': {'description': 'Create the user model', 'dependencies': []},
+        'password_hashing': {'description': 'Hash and verify passwords', 'dependencies': []},
+        'login_endpoint': {
+            'description': 'Implement the login endpoint',
+            'dependencies': ['user_model', 'password_hashing']
+        }
+    },
+    'complexity': 'MEDIUM',
+    'recommended_technologies': ['flask']
+})
+
+CODE_TEMPLATE = '''import hashlib
+
+
+class User:
+    def __init__(self, username, password_hash):
+        self.username = username
+        self.password_hash = password_hash
+
+    def verify(self, password):
+        return hashlib.sha256(password.encode()).hexdigest() == self.password_hash
+
+
+def login(users, username, password):
+    user = users.get(username)
+    if user is None or not user.verify(password):
+        return None
+    return user
+'''
+
+TEMPLATES = [
+    ('strategy generator', STRATEGY_TEMPLATE),
+    ('code generation assistant', CODE_TEMPLATE),
+]
+
+SUCCESS_STATUSES = {
+    'plan': 'PLANNING_COMPLETE',
+    'generate': 'CODE_GENERATION_COMPLETE',
+    'review': 'REVIEW_COMPLETE',
+}
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered), math.ceil(rank / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+class PipelineDriver:
+    def __init__(self, llm_client: LLMClient, concurrency: int):
+        self.planner = CodePlannerAgent(llm_client=llm_client, max_concurrency=concurrency)
+        self.generator = CodeGenerationAgent(llm_client=llm_client)
+        # The reviewer's Bandit manager is stateful, so each worker thread gets its own
+        self._reviewers = threading.local()
+
+    @property
+    def reviewer(self) -> CodeReviewAgent:
+        if not hasattr(self._reviewers, 'agent'):
+            self._reviewers.agent = CodeReviewAgent()
+        return self._reviewers.agent
+
+    def run_task(self, task: Dict) -> Dict[str, Dict]:
+        """
+        Push one task through all three stages, timing each
+
+        Returns:
+            Dict: stage name -> {'seconds', 'ok'}; later stages are skipped after a failure
+        """
+        timings = {}
+        stage_input = task
+        for stage, run in (
+            ('plan', self.planner.initialize_plan),
+            ('generate', self.generator.generate_code),
+            ('review', lambda code: self.reviewer.review_code(code)),
+        ):
+            start = time.perf_counter()
+            result = run(stage_input)
+            ok = result.get('status') == SUCCESS_STATUSES[stage]
+            timings[stage] = {'seconds': time.perf_counter() - start, 'ok': ok}
+            if not ok:
+                break
+            stage_input = result
+        return timings
+
+
+def run_level(base_url: str, tasks: List[Dict], concurrency: int) -> Dict:
+    client = LLMClient(
+        api_key='load-test',
+        base_url=base_url,
+        pool_size=max(concurrency * 2, 8),
+        initial_concurrency=concurrency * 3,
+        max_concurrency=concurrency * 3,
+        backoff_base=0.05
+    )
+    driver = PipelineDriver(client, concurrency)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        task_timings = list(executor.map(driver.run_task, tasks))
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    stages = {}
+    for stage in STAGES:
+        samples = [timings[stage] for timings in task_timings if stage in timings]
+        seconds = [sample['seconds'] for sample in samples if sample['ok']]
+        report = {f"p{rank}_s": percentile(seconds, rank) for rank in PERCENTILES}
+        report.update({
+            'completed': len(seconds),
+            'failed': sum(1 for sample in samples if not sample['ok'])
+        })
+        stages[stage] = report
+
+    completed = sum(1 for timings in task_timings if all(timings.get(stage, {}).get('ok') for stage in STAGES))
+    return {
+        'concurrency': concurrency,
+        'tasks': len(tasks),
+        'tasks_completed': completed,
+        'elapsed_s': elapsed,
+        'tasks_per_second': completed / elapsed if elapsed else 0.0,
+        'stages': stages,
+        'llm_client': client.stats()
+    }
+
+
+def print_level(level: Dict) -> None:
+    print(
+        f"concurrency {level['concurrency']}: {level['tasks_completed']}/{level['tasks']} tasks in "
+        f"{level['elapsed_s']:.2f}s ({level['tasks_per_second']:.2f} tasks/s), "
+        f"retries {level['llm_client']['retries']}",
+        file=sys.stderr
+    )
+    for stage, report in level['stages'].items():
+        print(
+            f"  {stage:<9} p50 {report['p50_s']:.3f}s  p95 {report['p95_s']:.3f}s  "
+            f"p99 {report['p99_s']:.3f}s  failed {report['failed']}",
+            file=sys.stderr
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--latency', default='lognormal:0.1,0.5', help="Server latency spec, e.g. 'uniform:0.05,0.3'")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--base-url', help='Use an already running server instead of starting one')
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+    args = parser.parse_args()
+
+    # Agents log every failed stage; the report already counts them
+    logging.basicConfig(level=logging.CRITICAL)
+
+    tasks = [
+        {'id': f"load-{index}", 'title': f"Authentication service {index}", 'description': 'User login with hashed passwords'}
+        for index in range(args.tasks)
+    ]
+    server_options = {'latency': parse_latency(args.latency), 'error_rate': args.error_rate, 'templates': TEMPLATES}
+
+    levels = []
+    for concurrency in args.concurrency:
+        if args.base_url:
+            level = run_level(args.base_url, tasks, concurrency)
+        else:
+            with FakeOpenAIServer(**server_options) as server:
+                level = run_level(server.base_url, tasks, concurrency)
+        print_level(level)
+        levels.append(level)
+
+    report = {
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'levels': levels
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
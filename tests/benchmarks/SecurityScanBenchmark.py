@@ -0,0 +1,73 @@
+"""
+Guard the rule-table security scanner against regex backtracking blowups.
+
+Pathological single lines (many 'execute' or 'password =' prefixes with
+no closing fragment) make the old /execute.*sql/ and /password.*=.*plain/
+searches quadratic or worse. The rule-table scanner must stay linear:
+the script exits non-zero if doubling the input more than triples its time.
+
+Run with the reviewer sources on the path:
+
+    PYTHONPATH=agents/code-reviewer/src python tests/benchmarks/SecurityScanBenchmark.py
+"""
+import re
+import sys
+import time
+from analysis_engine import CodeAnalysisEngine
+
+LEGACY_SIZES = [125, 250, 500]
+SIZES = [20000, 40000, 80000]
+MAX_DOUBLING_RATIO = 3.0
+REPEATS = 3
+
+PATHOLOGICAL_LINES = {
+    'execute without sql': lambda n: 'execute ' * n,
+    'password = without plain': lambda n: 'password = ' * n,
+}
+
+
+def legacy_scan(code: str) -> None:
+    re.search(r'input\(', code) or re.search(r'eval\(', code)
+    re.search(r'execute.*sql', code, re.IGNORECASE)
+    re.search(r'password.*=.*plain', code, re.IGNORECASE)
+
+
+def timed(function, code: str) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function(code)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    engine = CodeAnalysisEngine()
+    failed = False
+
+    def cold_scan(code: str) -> None:
+        engine.contexts.clear()
+        engine.security_vulnerability_scan(code)
+
+    print(f"{'legacy regexes':<26} {'copies':>8} {'time (s)':>12}")
+    for name, build in PATHOLOGICAL_LINES.items():
+        for size in LEGACY_SIZES:
+            print(f"{name:<26} {size:>8} {timed(legacy_scan, build(size)):>12.4f}")
+
+    print(f"\n{'rule table':<26} {'copies':>8} {'time (s)':>12}")
+    for name, build in PATHOLOGICAL_LINES.items():
+        previous = None
+        for size in SIZES:
+            current = timed(cold_scan, build(size))
+            print(f"{name:<26} {size:>8} {current:>12.4f}")
+
+            if previous is not None and current / previous > MAX_DOUBLING_RATIO:
+                print(f"  super-linear scaling: {current / previous:.2f}x for 2x input")
+                failed = True
+            previous = current
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Measure snippet index lookup latency at 100k indexed step descriptions.
+
+Descriptions are synthesised from a vocabulary of plan-step phrases, so
+many share words and land in common LSH buckets, as real plans do. Half
+the queries are perturbed copies of indexed descriptions, half are new.
+
+Run with the shared sources on the path:
+
+    PYTHONPATH=agents/shared/src python tests/benchmarks/SnippetIndexBenchmark.py
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+from snippet_index import SnippetIndex
+
+ENTRIES = 100_000
+QUERIES = 2_000
+BATCH = 5_000
+
+ACTIONS = ['create', 'implement', 'add', 'build', 'write', 'define', 'refactor', 'validate', 'expose', 'test']
+SUBJECTS = [
+    'user', 'order', 'invoice', 'payment', 'session', 'product', 'cart', 'report', 'audit log', 'notification',
+    'account', 'profile', 'token', 'shipment', 'inventory', 'review', 'comment', 'tenant', 'webhook', 'schedule',
+]
+KINDS = ['model', 'endpoint', 'serializer', 'repository', 'service', 'migration', 'form', 'handler', 'cache', 'worker']
+DETAILS = [
+    'pagination', 'rate limiting', 'soft delete', 'retry', 'caching', 'email field', 'timestamps', 'validation',
+    'permission check', 'search filter', 'bulk import', 'csv export', 'sorting', 'batching', 'audit trail',
+]
+
+
+def description(rng: random.Random) -> str:
+    details = ' and '.join(rng.sample(DETAILS, rng.randint(1, 3)))
+    return f"{rng.choice(ACTIONS)} the {rng.choice(SUBJECTS)} {rng.choice(KINDS)} with {details} ({rng.randrange(10 ** 6)})"
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=ENTRIES)
+    parser.add_argument('--queries', type=int, default=QUERIES)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    descriptions = [description(rng) for _ in range(args.entries)]
+    with tempfile.TemporaryDirectory() as directory:
+        index = SnippetIndex(os.path.join(directory, 'snippets.db'))
+        start = time.perf_counter()
+        for offset in range(0, len(descriptions), BATCH):
+            index.add_many((text, f"def step_{offset + n}(): pass") for n, text in enumerate(descriptions[offset:offset + BATCH]))
+        build = time.perf_counter() - start
+
+        queries = [
+            rng.choice(descriptions).replace(' the ', ' a ', 1) if n % 2 else description(rng)
+            for n in range(args.queries)
+        ]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.query(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        stats = index.stats()
+        index.close()
+
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    print(f"entries: {stats['entries']}, build: {build:.1f}s ({build / args.entries * 1e6:.0f}us/insert)")
+    print(f"queries: {args.queries}, hit rate: {stats['hit_rate']:.2f}")
+    print(f"{'p50 (ms)':>10} {'p99 (ms)':>10} {'mean (ms)':>10}")
+    print(f"{p50:>10.3f} {p99:>10.3f} {sum(latencies) / len(latencies):>10.3f}")
+    return 0 if p50 < 1.0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
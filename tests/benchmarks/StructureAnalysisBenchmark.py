@@ -0,0 +1,116 @@
+"""
+Compare the single-pass structure analysis against the previous
+multi-walk implementation on synthetic modules of 1k to 100k lines.
+
+Run with the reviewer sources on the path:
+
+    PYTHONPATH=agents/code-reviewer/src python tests/benchmarks/StructureAnalysisBenchmark.py
+"""
+import ast
+import sys
+import time
+from analysis_engine import CodeAnalysisEngine
+
+LINE_COUNTS = [1000, 10000, 100000]
+
+
+def legacy_analyze_code_structure(code: str) -> dict:
+    """The pre-visitor implementation: four ast.walk passes plus a recursive depth scan."""
+    tree = ast.parse(code)
+
+    complexity_metrics = {'total_complexity': 1, 'branch_points': 0}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.If, ast.While, ast.For, ast.Try, ast.ExceptHandler)):
+            complexity_metrics['total_complexity'] += 1
+            complexity_metrics['branch_points'] += 1
+
+    code_smells = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and len(node.body) > 20:
+            code_smells.append(f"Long method detected: {node.name}")
+
+    def _depth_traverse(node, current_depth=0):
+        max_found = current_depth
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.If, ast.For, ast.While)):
+                max_found = max(max_found, _depth_traverse(child, current_depth + 1))
+        return max_found
+
+    nested_depth = _depth_traverse(tree)
+    if nested_depth > 3:
+        code_smells.append(f"High nested complexity: {nested_depth} levels")
+
+    return {
+        'function_count': len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]),
+        'class_count': len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]),
+        'complexity_metrics': complexity_metrics,
+        'potential_issues': code_smells
+    }
+
+
+def synthetic_module(line_count: int) -> str:
+    """Build a module of roughly line_count lines mixing classes, long functions and nesting."""
+    block = [
+        "class Service{i}:",
+        "    def handle(self, items):",
+        "        total = 0",
+        "        for item in items:",
+        "            if item > 0:",
+        "                while item > 10:",
+        "                    item -= 1",
+        "            try:",
+        "                total += item",
+        "            except ValueError:",
+        "                pass",
+        "        return total",
+        "",
+        "def long_function_{i}(value):",
+    ] + [f"    value += {n}" for n in range(22)] + [
+        "    return value",
+        "",
+        "if True:",
+        "    for _ in range(1):",
+        "        if _ == 0:",
+        "            while False:",
+        "                pass",
+        "",
+    ]
+    lines = []
+    index = 0
+    while len(lines) < line_count:
+        lines.extend(line.format(i=index) for line in block)
+        index += 1
+    return "\n".join(lines) + "\n"
+
+
+def best_of(function, code: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(code)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    engine = CodeAnalysisEngine()
+    print(f"{'lines':>8} {'legacy (s)':>12} {'visitor (s)':>12} {'speedup':>8}")
+    for line_count in LINE_COUNTS:
+        code = synthetic_module(line_count)
+        if engine.analyze_code_structure(code) != legacy_analyze_code_structure(code):
+            print(f"Output mismatch at {line_count} lines")
+            return 1
+
+        def cold_analyze(code: str) -> dict:
+            engine.contexts.clear()
+            return engine.analyze_code_structure(code)
+
+        repeats = 5 if line_count < 100000 else 2
+        legacy = best_of(legacy_analyze_code_structure, code, repeats)
+        visitor = best_of(cold_analyze, code, repeats)
+        print(f"{line_count:>8} {legacy:>12.4f} {visitor:>12.4f} {legacy / visitor:>7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Compare the in-process style checker against one linter subprocess per file.
+
+The baseline runs flake8 on each file when it is installed, otherwise
+`python -m py_compile` - the interpreter start-up that any out-of-process
+linter pays at minimum, so the reported speedup is then a lower bound.
+
+Run with the shared and reviewer sources on the path:
+
+    PYTHONPATH=agents/shared/src:agents/code-reviewer/src python tests/benchmarks/StyleCheckBenchmark.py
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import importlib.util
+import subprocess
+from analysis_engine import CodeAnalysisEngine
+
+FILE_COUNT = 100
+REPEATS = 3
+
+SNIPPET = '''import os
+import json
+
+
+class OrderService{n}:
+    def __init__(self, repository, cache={{}}):
+        self.repository = repository
+        self.cache = cache
+
+    def Load(self, orderId):
+        try:
+            record = self.repository.get(orderId)
+        except:
+            return None
+        totalPrice = sum(line['price'] * line['quantity'] for line in record['lines'])
+        return {{'id': orderId, 'total': totalPrice, 'path': os.path.join('orders', str(orderId)), 'items': len(record['lines'])}}
+'''
+
+
+def baseline_command() -> list:
+    if importlib.util.find_spec('flake8') is not None:
+        return [sys.executable, '-m', 'flake8', '--max-line-length', '99']
+    return [sys.executable, '-m', 'py_compile']
+
+
+def subprocess_per_file(paths: list, command: list) -> None:
+    for path in paths:
+        subprocess.run(command + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def in_process(snippets: dict) -> list:
+    # A fresh engine per run, so parsing and tokenizing are part of the timing
+    return CodeAnalysisEngine().check_code_style(snippets)
+
+
+def best_of(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=FILE_COUNT)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    snippets = {f"order_service_{n}.py": SNIPPET.format(n=n) for n in range(args.files)}
+    command = baseline_command()
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for filename, snippet in snippets.items():
+            path = os.path.join(directory, filename)
+            with open(path, 'w') as handle:
+                handle.write(snippet)
+            paths.append(path)
+
+        suggestions = in_process(snippets)
+        baseline = best_of(lambda: subprocess_per_file(paths, command), args.repeats)
+        builtin = best_of(lambda: in_process(snippets), args.repeats)
+
+    print(f"files: {args.files}, suggestions: {len(suggestions)}")
+    print(f"{'subprocess/file (s)':>20} {'in-process (s)':>15} {'speedup':>8}   baseline: {' '.join(command[1:3])}")
+    print(f"{baseline:>20.4f} {builtin:>15.4f} {baseline / builtin:>7.1f}x")
+    return 0 if builtin < baseline else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
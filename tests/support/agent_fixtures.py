@@ -0,0 +1,16 @@
+"""
+Canned planner and generator responses shared by the agent test suites.
+
+STRATEGY is a strategy generator answer with two dependent components;
+USER_MODEL_CODE is the code generated for its first one.
+"""
+import json
+
+STRATEGY = json.dumps({
+    'components': {
+        'user_model': {'description': 'Create the user model', 'dependencies': []},
+        'login_endpoint': {'description': 'Implement the login endpoint', 'dependencies': ['user_model']}
+    },
+    'complexity': 'LOW'
+})
+USER_MODEL_CODE = 'class User:\n    def __init__(self, username):\n        self.username = username\n'
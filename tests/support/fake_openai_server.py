@@ -0,0 +1,239 @@
+"""
+Local OpenAI-compatible stand-in server for tests and load tests.
+
+Serves POST /chat/completions (with or without a /v1 prefix), both as a
+single JSON response and as a server-sent event stream. Behaviour is
+configurable per server:
+
+- statuses: scripted status codes, one popped per request (tests)
+- latency: seconds to wait before responding, drawn per request from a
+  distribution (see parse_latency)
+- error_rate / error_statuses: random failures once the script runs out
+- templates: (pattern, content) pairs; the first pattern found in the
+  request's system prompt picks the response content
+
+Run standalone to point agents at it through OPENAI_BASE_URL:
+
+    python tests/support/fake_openai_server.py --port 8089 --latency lognormal:0.4,0.5 --error-rate 0.02
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_CONTENT = 'def generated():\n    return True\n'
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Build a latency sampler from a spec string
+
+    Specs: 'constant:S', 'uniform:LOW,HIGH', 'normal:MEAN,STDDEV',
+    'lognormal:MEDIAN,SIGMA' and 'exponential:MEAN', all in seconds.
+    Samples are clamped at zero.
+
+    Args:
+        spec (str): Distribution spec
+
+    Returns:
+        Callable[[], float]: Draws one latency in seconds
+    """
+    name, _, arguments = spec.partition(':')
+    values = [float(value) for value in arguments.split(',') if value]
+    distributions = {
+        'constant': lambda seconds: lambda: seconds,
+        'uniform': lambda low, high: lambda: random.uniform(low, high),
+        'normal': lambda mean, stddev: lambda: random.gauss(mean, stddev),
+        'lognormal': lambda median, sigma: lambda: median * random.lognormvariate(0, sigma),
+        'exponential': lambda mean: lambda: random.expovariate(1 / mean),
+    }
+    if name not in distributions:
+        raise ValueError(f"Unknown latency distribution '{name}'")
+    sample = distributions[name](*values)
+    return lambda: max(0.0, sample())
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # socketserver's default backlog of 5 drops connection bursts from async load tests
+    request_queue_size = 1024
+
+
+class FakeOpenAIServer:
+    def __init__(
+        self,
+        content: str = DEFAULT_CONTENT,
+        statuses: List[int] = None,
+        latency: Callable[[], float] = None,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (429, 500, 503),
+        templates: Sequence[Tuple[str, str]] = (),
+        stream_chunk_size: int = 8,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        self.content = content
+        self.statuses = list(statuses or [])
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.templates = list(templates)
+        self.stream_chunk_size = stream_chunk_size
+        self.requests: List[Dict] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _HTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> 'FakeOpenAIServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def response_content(self, request: Dict) -> str:
+        system_prompt = ' '.join(
+            str(message.get('content', '')) for message in request.get('messages', [])
+            if message.get('role') == 'system'
+        )
+        for pattern, content in self.templates:
+            if pattern in system_prompt:
+                return content
+        return self.content
+
+    def completion_body(self, request: Dict) -> Dict:
+        content = self.response_content(request)
+        prompt_tokens = sum(len(str(message.get('content', ''))) for message in request.get('messages', [])) // 4
+        completion_tokens = len(content) // 4
+        return {
+            'id': f"chatcmpl-{len(self.requests)}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+    def next_status(self, request: Dict) -> int:
+        with self._lock:
+            self.requests.append(request)
+            if self.statuses:
+                return self.statuses.pop(0)
+        if self.error_rate and random.random() < self.error_rate:
+            return random.choice(self.error_statuses)
+        return 200
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+                    return self._send_json(404, {'error': {'message': 'not found'}})
+
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                status = server.next_status(request)
+                if server.latency is not None:
+                    time.sleep(server.latency())
+                if status != 200:
+                    return self._send_json(status, {'error': {'message': f"scripted status {status}"}})
+
+                body = server.completion_body(request)
+                if request.get('stream'):
+                    return self._send_stream(request, body)
+                return self._send_json(200, body)
+
+            def _send_json(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_stream(self, request: Dict, body: Dict) -> None:
+                content = body['choices'][0]['message']['content']
+                size = server.stream_chunk_size
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                for start in range(0, len(content), size):
+                    chunk = {
+                        'id': body['id'],
+                        'object': 'chat.completion.chunk',
+                        'choices': [{'index': 0, 'delta': {'content': content[start:start + size]}, 'finish_reason': None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                if (request.get('stream_options') or {}).get('include_usage'):
+                    chunk = {'id': body['id'], 'object': 'chat.completion.chunk', 'choices': [], 'usage': body['usage']}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='OpenAI-compatible stand-in server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', help="Latency spec, e.g. 'lognormal:0.4,0.5'")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--content-file', help='Default response content')
+    args = parser.parse_args()
+
+    content = DEFAULT_CONTENT
+    if args.content_file:
+        with open(args.content_file) as content_file:
+            content = content_file.read()
+
+    server = FakeOpenAIServer(
+        content=content,
+        latency=parse_latency(args.latency) if args.latency else None,
+        error_rate=args.error_rate,
+        host=args.host,
+        port=args.port
+    )
+    print(f"Serving on {server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())